@@ -0,0 +1,93 @@
+"""
+Compare the PyTorch and ONNX Runtime (int8) embedding backends:
+accuracy parity, single-query latency and batched ingestion throughput.
+
+Usage: python benchmarks/bench_embedding_backends.py --queries 200 --batch-texts 2000
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+from sentence_transformers import SentenceTransformer
+from vector_db.onnx_backend import OnnxEmbeddingModel, compare_embeddings
+
+SAMPLE_QUERIES = [
+    "What are the biggest risks facing Tesla right now?",
+    "Compare Apple vs Microsoft fundamentals",
+    "P/E of JPM",
+    "Which tech stocks show bullish momentum this week?",
+    "NVDA data center revenue growth",
+    "Total Revenue and operating income for Visa"
+]
+
+
+def load_corpus_texts(limit: int):
+    """Chunk texts from the processed corpus, padded with synthetic text if small"""
+    texts = []
+    path = os.path.join(Settings.PROCESSED_DATA_DIR, "all_chunks.json")
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            texts = [chunk['text'] for chunk in json.load(f)]
+    rng = np.random.default_rng(0)
+    words = " ".join(texts + SAMPLE_QUERIES).split()
+    while len(texts) < limit:
+        n = int(rng.integers(8, 200))
+        texts.append(" ".join(rng.choice(words, size=n)))
+    return texts[:limit]
+
+
+def latency(encode, queries, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            encode(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding backend benchmark")
+    parser.add_argument("--queries", type=int, default=100, help="Single-query encodes per backend")
+    parser.add_argument("--batch-texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--fp32", action="store_true", help="Also benchmark the unquantized ONNX model")
+    args = parser.parse_args()
+
+    texts = load_corpus_texts(args.batch_texts)
+    queries = (SAMPLE_QUERIES * (args.queries // len(SAMPLE_QUERIES) + 1))[:args.queries]
+
+    backends = {'torch': SentenceTransformer(Settings.EMBEDDING_MODEL, device='cpu')}
+    backends['onnx-int8'] = OnnxEmbeddingModel(Settings.EMBEDDING_MODEL, quantize=True)
+    if args.fp32:
+        backends['onnx-fp32'] = OnnxEmbeddingModel(Settings.EMBEDDING_MODEL, quantize=False)
+
+    reference = None
+    print(f"{'backend':>10} {'p50 ms':>8} {'p99 ms':>8} {'texts/s':>9} {'cos min':>8} {'cos mean':>9} {'NN agree':>9}")
+    for name, model in backends.items():
+        encode = lambda text: model.encode(text, convert_to_numpy=True, show_progress_bar=False)
+        encode(queries[0])  # warm-up
+        p50, p99 = latency(encode, queries, repeat=1)
+
+        start = time.perf_counter()
+        embeddings = model.encode(texts, batch_size=args.batch_size, convert_to_numpy=True, show_progress_bar=False)
+        throughput = len(texts) / (time.perf_counter() - start)
+
+        if reference is None:
+            reference = embeddings
+        parity = compare_embeddings(reference, embeddings)
+        print(f"{name:>10} {p50:>8.2f} {p99:>8.2f} {throughput:>9.1f} "
+              f"{parity['cosine_min']:>8.4f} {parity['cosine_mean']:>9.4f} "
+              f"{parity['nearest_neighbour_agreement']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare fixed-size embedding batches (input order) with length-bucketed,
+token-budget batches: padding efficiency, encode throughput, and that the
+output order and values are unchanged.
+
+Chunk texts come from the processed corpus (JSONL or JSON). If the corpus is
+smaller than --texts, it is topped up with a mix shaped like ingestion output:
+headline-length news, mid-size technical summaries and full-size overview chunks.
+
+Usage: python benchmarks/bench_embedding_batching.py --texts 2000 --budgets 4096 8192 16384
+"""
+
+import sys
+import os
+import argparse
+import json
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+from data_collection.data_preprocessor import iter_jsonl
+from vector_db.embeddings import LocalEmbeddings
+
+# (share of chunks, word-count range) per kind of chunk the pipeline produces
+LENGTH_MIX = ((0.45, (6, 20)), (0.35, (40, 120)), (0.20, (300, 500)))
+
+
+def load_chunk_texts(limit: int):
+    texts = []
+    if os.path.exists(Settings.PROCESSED_CHUNKS_FILE):
+        texts = [chunk['text'] for chunk in iter_jsonl(Settings.PROCESSED_CHUNKS_FILE)]
+    else:
+        path = os.path.join(Settings.PROCESSED_DATA_DIR, "all_chunks.json")
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                texts = [chunk['text'] for chunk in json.load(f)]
+    real = min(len(texts), limit)
+
+    rng = np.random.default_rng(0)
+    words = (" ".join(texts) or "revenue growth margin guidance quarter outlook").split()
+    shares = np.array([share for share, _ in LENGTH_MIX])
+    while len(texts) < limit:
+        low, high = LENGTH_MIX[rng.choice(len(LENGTH_MIX), p=shares / shares.sum())][1]
+        texts.append(" ".join(rng.choice(words, size=int(rng.integers(low, high)))))
+    rng.shuffle(texts)
+    return texts[:limit], real
+
+
+def padding_efficiency(embedder: LocalEmbeddings, texts, batches) -> float:
+    """Real tokens / padded tokens the model actually processes"""
+    lengths = embedder._token_lengths(texts)
+    padded = sum(len(rows) * int(lengths[rows].max()) for rows in batches)
+    return float(lengths.sum()) / padded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding batching benchmark")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for 'fixed' batching")
+    parser.add_argument("--budgets", type=int, nargs='+', default=[4096, 8192, 16384],
+                        help="Token budgets for 'tokens' batching")
+    parser.add_argument("--backend", choices=["torch", "onnx"], default=None)
+    args = parser.parse_args()
+
+    texts, real = load_chunk_texts(args.texts)
+    print(f"{len(texts):,} texts ({real:,} from the processed corpus)\n")
+
+    embedder = LocalEmbeddings(use_cache=False, backend=args.backend, batching='fixed')
+    embedder.model.encode(texts[:8], show_progress_bar=False)  # warm-up
+
+    runs = [('fixed', args.batch_size)] + [('tokens', budget) for budget in args.budgets]
+    reference = None
+
+    print(f"{'batching':>16} {'batches':>8} {'padding eff':>12} {'seconds':>8} {'texts/s':>9} {'max |diff|':>11}")
+    for mode, size in runs:
+        embedder.batching = mode
+        embedder.max_batch_tokens = size
+        if mode == 'tokens':
+            batches = embedder._token_budget_batches(texts, size)
+        else:
+            batches = [np.arange(i, min(i + size, len(texts))) for i in range(0, len(texts), size)]
+
+        start = time.perf_counter()
+        embeddings = embedder.generate_embeddings_batch(texts, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = embeddings
+        label = f"{mode} ({size})"
+        print(f"{label:>16} {len(batches):>8} {padding_efficiency(embedder, texts, batches):>12.1%} "
+              f"{elapsed:>8.2f} {len(texts) / elapsed:>9.1f} {np.abs(embeddings - reference).max():>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the hand-off from LocalEmbeddings to ChromaDBManager:
+Python lists of floats (the old `.tolist()` path) vs. contiguous NumPy matrices.
+
+Measures conversion/batching time and peak Python heap for synthetic
+model-shaped output, and optionally a real ChromaDB ingest in a temp dir.
+
+Usage: python benchmarks/bench_embedding_transfer.py --vectors 50000 [--chroma 10000]
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from chromadb.api.types import normalize_embeddings
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+
+
+def list_path(embeddings: np.ndarray, batch_size: int):
+    """Old path: tolist() per vector, re-sliced into per-batch lists, re-parsed by ChromaDB"""
+    vectors = embeddings.tolist()
+    for i in range(0, len(vectors), batch_size):
+        batch = []
+        for vector in vectors[i:i + batch_size]:
+            batch.append(vector)
+        normalize_embeddings(batch)
+    return vectors
+
+
+def array_path(embeddings: np.ndarray, batch_size: int, dtype):
+    """New path: one contiguous matrix, batches are row views"""
+    matrix = np.ascontiguousarray(embeddings, dtype=dtype)
+    for i in range(0, len(matrix), batch_size):
+        normalize_embeddings(matrix[i:i + batch_size].astype(np.float32, copy=False))
+    return matrix
+
+
+def measure(fn, *args):
+    """Wall time (untraced run) and peak Python heap (traced run)"""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, peak / (1024 * 1024)
+
+
+def chroma_ingest(embeddings: np.ndarray, as_lists: bool) -> float:
+    """Time ChromaDBManager.add_documents into a throwaway persistent collection"""
+    from vector_db.chroma_manager import ChromaDBManager
+
+    persist_dir = tempfile.mkdtemp(prefix="bench_chroma_")
+    Settings.CHROMA_PERSIST_DIR = persist_dir
+    try:
+        manager = ChromaDBManager()
+        documents = [{'text': f"chunk {i}", 'ticker': f"T{i % 500:03d}", 'type': 'News', 'chunk_id': i}
+                     for i in range(len(embeddings))]
+        payload = embeddings.tolist() if as_lists else embeddings
+        start = time.perf_counter()
+        manager.add_documents(documents, payload, batch_size=1000)
+        return time.perf_counter() - start
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding transfer benchmark")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--chroma", type=int, default=0,
+                        help="Also time a real ChromaDB ingest of this many vectors")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.vectors, Settings.EMBEDDING_DIMENSION), dtype=np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    print(f"{args.vectors:,} x {Settings.EMBEDDING_DIMENSION} vectors "
+          f"({embeddings.nbytes / 1024 / 1024:.0f} MB as float32)\n")
+    print(f"{'path':>14} {'seconds':>9} {'peak MB':>9}")
+    for label, fn, extra in (("lists", list_path, ()),
+                             ("ndarray f32", array_path, (np.float32,)),
+                             ("ndarray f16", array_path, (np.float16,))):
+        elapsed, peak = measure(fn, embeddings, args.batch_size, *extra)
+        print(f"{label:>14} {elapsed:>9.3f} {peak:>9.1f}")
+
+    if args.chroma:
+        subset = embeddings[:args.chroma]
+        print(f"\nChromaDB ingest of {len(subset):,} vectors")
+        print(f"{'lists':>14} {chroma_ingest(subset, as_lists=True):>9.2f}s")
+        print(f"{'ndarray f32':>14} {chroma_ingest(subset, as_lists=False):>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+HNSW parameter sweep for the Chroma store: recall@k against exact brute-force
+search vs. query latency and index size.
+
+For every (M, construction_ef) pair an index is built in a temp directory;
+each search_ef is then applied to it and held-out queries are timed in a fresh
+process (Chroma keeps the search_ef an index was loaded with for the life of
+the process). Ground truth is the exact top-k by cosine similarity over the
+same vectors. Index size is the on-disk size of the HNSW segment files, which
+Chroma keeps fully in memory while serving.
+
+Corpora:
+    synthetic  clustered unit vectors; raise --noise for a harder corpus
+    real       processed chunks (--chunks, default Settings.PROCESSED_CHUNKS_FILE)
+               embedded with the configured model; skipped if too small
+
+Usage: python benchmarks/bench_hnsw_params.py --docs 50000 --m 8 16 32 --construction-ef 100 200 --search-ef 10 50 100 200
+"""
+
+import sys
+import os
+import argparse
+import itertools
+import json
+import multiprocessing
+import shutil
+import tempfile
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+
+
+def synthetic_corpus(n_docs: int, n_tickers: int, noise: float, seed: int = 0):
+    """Unit vectors scattered around one center per ticker"""
+    rng = np.random.default_rng(seed)
+    dim = Settings.EMBEDDING_DIMENSION
+    centers = rng.standard_normal((n_tickers, dim), dtype=np.float32)
+    ticker_idx = rng.integers(0, n_tickers, n_docs)
+    vectors = centers[ticker_idx] + noise * rng.standard_normal((n_docs, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [{
+        'text': f"synthetic chunk {i}",
+        'ticker': f"T{ticker_idx[i]:04d}",
+        'company_name': f"Company {ticker_idx[i]}",
+        'type': "News",
+        'chunk_id': i,
+        'date': "2025-06-01T00:00:00",
+        'metadata': {'sector': 'Technology'}
+    } for i in range(n_docs)]
+    return documents, vectors
+
+
+def real_corpus(path: str, max_chunks: int):
+    """Processed chunks and their embeddings (JSONL stream or legacy JSON list)"""
+    from vector_db.embeddings import LocalEmbeddings
+
+    if not os.path.exists(path):
+        return [], None
+    with open(path, 'r') as f:
+        if path.endswith('.jsonl'):
+            documents = [json.loads(line) for line in itertools.islice(f, max_chunks) if line.strip()]
+        else:
+            documents = json.load(f)[:max_chunks]
+    documents = [doc for doc in documents if doc.get('text')]
+    if not documents:
+        return [], None
+    vectors = LocalEmbeddings(use_cache=False).generate_embeddings_batch([doc['text'] for doc in documents])
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return documents, vectors
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    """Brute-force top-k row indices by cosine similarity (vectors are unit length)"""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def index_bytes(persist_dir: str) -> int:
+    """Size of the HNSW segment files (everything but the SQLite metadata DB)"""
+    total = 0
+    for entry in os.scandir(persist_dir):
+        if entry.is_dir():
+            for root, _, files in os.walk(entry.path):
+                total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def measure(overrides: dict, queries: np.ndarray, truth_ids: list, top_k: int):
+    """Runs in a fresh process so the index is loaded with the configured search_ef"""
+    for key, value in overrides.items():
+        setattr(Settings, key, value)
+    from vector_db.chroma_manager import ChromaDBManager
+
+    store = ChromaDBManager()  # applies HNSW_SEARCH_EF before the index is loaded
+    store.search(queries[0], None, top_k)  # warm-up (loads the index)
+    timings, recalls = [], []
+    for query, want in zip(queries, truth_ids):
+        start = time.perf_counter()
+        results = store.search(query, None, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+        recalls.append(len({doc['id'] for doc in results} & want) / len(want))
+    return np.array(timings), float(np.mean(recalls))
+
+
+def sweep(name: str, documents, vectors, args, tmp_root: str):
+    from vector_db.chroma_manager import ChromaDBManager
+
+    # Hold out the last --queries vectors as queries so they follow the corpus distribution
+    n_index = len(documents) - args.queries
+    index_docs, index_vectors = documents[:n_index], vectors[:n_index]
+    queries = vectors[n_index:]
+    top_k = min(args.top_k, n_index)
+
+    print(f"\n[{name}] {n_index:,} vectors, {len(queries)} queries, dim={vectors.shape[1]}, "
+          f"top_k={top_k}, space={Settings.HNSW_SPACE}")
+    start = time.perf_counter()
+    truth = exact_top_k(index_vectors, queries, top_k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"exact brute force: {exact_ms:.2f} ms/query\n")
+    print(f"{'M':>4} {'constr_ef':>9} {'search_ef':>9} {'build s':>8} {'index MB':>9} "
+          f"{'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+
+    for m, construction_ef in itertools.product(args.m, args.construction_ef):
+        Settings.HNSW_M = m
+        Settings.HNSW_CONSTRUCTION_EF = construction_ef
+        Settings.HNSW_SEARCH_EF = max(args.search_ef)
+        Settings.CHROMA_PERSIST_DIR = os.path.join(tmp_root, f"{name}_m{m}_ef{construction_ef}")
+
+        store = ChromaDBManager()
+        start = time.perf_counter()
+        store.add_documents(index_docs, index_vectors, batch_size=1000)
+        build_seconds = time.perf_counter() - start
+        truth_ids = [{store.document_id(index_docs[i]) for i in row} for row in truth]
+        index_mb = index_bytes(Settings.CHROMA_PERSIST_DIR) / 1e6
+
+        for search_ef in args.search_ef:
+            overrides = {key: getattr(Settings, key) for key in (
+                'CHROMA_PERSIST_DIR', 'CHROMA_SHARDING', 'SEARCH_CACHE_SIZE', 'HYBRID_SEARCH',
+                'HNSW_SPACE', 'HNSW_M', 'HNSW_CONSTRUCTION_EF')}
+            overrides['HNSW_SEARCH_EF'] = search_ef
+            with multiprocessing.get_context("spawn").Pool(1) as pool:
+                timings, recall = pool.apply(measure, (overrides, queries, truth_ids, top_k))
+            print(f"{m:>4} {construction_ef:>9} {search_ef:>9} {build_seconds:>8.1f} {index_mb:>9.1f} "
+                  f"{recall:>9.3f} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 99):>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall/latency benchmark")
+    parser.add_argument("--corpus", choices=["synthetic", "real", "both"], default="both")
+    parser.add_argument("--docs", type=int, default=50000, help="synthetic corpus size")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.5, help="synthetic spread around each ticker center")
+    parser.add_argument("--chunks", default=Settings.PROCESSED_CHUNKS_FILE, help="processed chunks file")
+    parser.add_argument("--max-chunks", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--space", choices=["cosine", "l2", "ip"], default=Settings.HNSW_SPACE)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[10, 50, 100, 200])
+    args = parser.parse_args()
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_hnsw_")
+    Settings.HNSW_SPACE = args.space
+    Settings.CHROMA_SHARDING = 'none'
+    Settings.SEARCH_CACHE_SIZE = 0  # measure the index, not the result cache
+    Settings.HYBRID_SEARCH = False
+
+    try:
+        if args.corpus in ("synthetic", "both"):
+            documents, vectors = synthetic_corpus(args.docs + args.queries, args.tickers, args.noise)
+            sweep("synthetic", documents, vectors, args, tmp_root)
+        if args.corpus in ("real", "both"):
+            documents, vectors = real_corpus(args.chunks, args.max_chunks + args.queries)
+            if len(documents) < args.queries + args.top_k:
+                print(f"\n[real] skipped: {len(documents)} chunks in {args.chunks}, "
+                      f"need at least {args.queries + args.top_k} (run the ingestion pipeline first)")
+            else:
+                sweep("real", documents, vectors, args, tmp_root)
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
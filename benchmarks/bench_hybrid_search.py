@@ -0,0 +1,133 @@
+"""
+Vector-only vs. hybrid (BM25 + vector, reciprocal rank fusion) retrieval:
+recall@k on ticker- and number-heavy questions, and the latency the lexical
+arm adds.
+
+The corpus mimics ingestion output (overview, financials, technicals, news
+and signals per ticker) for --tickers synthetic companies. Each question
+("P/E of ABCD", "ABCD Total Revenue", ...) has one relevant chunk: the
+matching document type for that ticker. Embeddings come from the configured
+model, so run with the real EMBEDDING_MODEL for meaningful recall numbers.
+
+Usage: python benchmarks/bench_hybrid_search.py --tickers 200 --top-k 5 --backend chroma
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import string
+import tempfile
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+
+SECTORS = ["Technology", "Financial Services", "Healthcare", "Energy", "Consumer Cyclical"]
+
+# (document type, text template, question templates)
+TEMPLATES = (
+    ("Company Overview",
+     "Company: {name} ({ticker}) Sector: {sector} Business Summary: {name} designs and sells products "
+     "worldwide. Key Metrics: - Market Cap: ${market_cap:,.0f} - P/E Ratio: {pe:.2f} - Current Price: ${price:.2f}",
+     ["P/E of {ticker}", "What is the market cap of {ticker}?"]),
+    ("Financial Performance",
+     "Financial Performance for {name}: Total Revenue: ${revenue:,.0f} Net Income: ${income:,.0f} "
+     "Gross margin expanded as operating expenses were held flat.",
+     ["{ticker} Total Revenue", "Net Income of {ticker}"]),
+    ("Technical Analysis",
+     "Technical Analysis for {ticker}: RSI (14): {rsi:.1f} MACD: {macd:.2f} Price is trading above the "
+     "50-day moving average with rising volume.",
+     ["{ticker} RSI", "MACD for {ticker}"]),
+    ("News",
+     "{name} shares moved after the company updated its full-year outlook and announced a new buyback.",
+     ["Latest news on {ticker}"]),
+    ("Trading Signals",
+     "Trading Signals for {ticker}: - BULLISH: Strong momentum - BEARISH: Valuation stretched versus peers",
+     ["Trading signals for {ticker}"]),
+)
+
+
+def synthetic_corpus(n_tickers: int, seed: int = 0):
+    """Chunks per ticker plus (question, relevant chunk index) pairs"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(string.ascii_uppercase))
+    tickers = set()
+    while len(tickers) < n_tickers:
+        tickers.add("".join(rng.choice(letters, size=int(rng.integers(3, 5)))))
+
+    documents, questions = [], []
+    for ticker in sorted(tickers):
+        name = ticker.capitalize() + " " + rng.choice(["Holdings", "Systems", "Corp", "Group", "Labs"])
+        values = {
+            'ticker': ticker, 'name': name, 'sector': rng.choice(SECTORS),
+            'market_cap': rng.uniform(1e9, 2e12), 'pe': rng.uniform(5, 60), 'price': rng.uniform(5, 900),
+            'revenue': rng.uniform(1e8, 4e11), 'income': rng.uniform(1e7, 9e10),
+            'rsi': rng.uniform(10, 90), 'macd': rng.normal(0, 3)
+        }
+        for doc_type, template, question_templates in TEMPLATES:
+            for question in question_templates:
+                questions.append((question.format(**values), len(documents)))
+            documents.append({
+                'text': template.format(**values),
+                'ticker': ticker,
+                'company_name': name,
+                'type': doc_type,
+                'chunk_id': 0,
+                'date': "2025-06-01T00:00:00",
+                'metadata': {'sector': values['sector'], 'market_cap': values['market_cap'], 'pe_ratio': values['pe']}
+            })
+    return documents, questions
+
+
+def run(store, query_embeddings, questions, documents, top_k: int, hybrid: bool):
+    Settings.HYBRID_SEARCH = hybrid
+    timings, hits = [], []
+    for embedding, (question, relevant) in zip(query_embeddings, questions):
+        start = time.perf_counter()
+        results = store.search(embedding, None, top_k, query_text=question)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits.append(store.document_id(documents[relevant]) in {doc['id'] for doc in results})
+    return np.array(timings), float(np.mean(hits))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval benchmark")
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default=None)
+    args = parser.parse_args()
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_hybrid_")
+    Settings.CHROMA_PERSIST_DIR = os.path.join(tmp_root, "chroma")
+    Settings.NUMPY_STORE_DIR = os.path.join(tmp_root, "numpy")
+    Settings.SEARCH_CACHE_SIZE = 0  # measure retrieval, not the result cache
+
+    from vector_db.embeddings import LocalEmbeddings
+    from vector_db.vector_store import create_vector_store
+
+    try:
+        documents, questions = synthetic_corpus(args.tickers)
+        embedder = LocalEmbeddings(use_cache=False)
+        embeddings = embedder.generate_embeddings_batch([doc['text'] for doc in documents])
+        query_embeddings = embedder.generate_embeddings_batch([question for question, _ in questions])
+
+        store = create_vector_store(args.backend)
+        store.add_documents(documents, embeddings, batch_size=1000)
+        store.search(query_embeddings[0], None, args.top_k, query_text=questions[0][0])  # warm-up
+
+        print(f"\n{len(documents):,} chunks, {len(questions):,} questions, top_k={args.top_k}, "
+              f"backend={args.backend or Settings.VECTOR_STORE_BACKEND}\n")
+        print(f"{'retrieval':>10} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for label, hybrid in (("vector", False), ("hybrid", True)):
+            timings, recall = run(store, query_embeddings, questions, documents, args.top_k, hybrid)
+            print(f"{label:>10} {recall:>9.3f} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 99):>8.2f}")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
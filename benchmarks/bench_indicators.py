@@ -0,0 +1,65 @@
+"""
+Benchmark the vectorized indicator engine on synthetic price panels.
+
+Usage: python benchmarks/bench_indicators.py --tickers 5000 --bars 252
+"""
+
+import sys
+import os
+import argparse
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.indicators import compute_indicators, generate_technical_documents
+
+
+def synthetic_panel(n_tickers: int, n_bars: int, seed: int = 0):
+    """Random-walk OHLCV panel with a few ragged (short-history) tickers"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.02, size=(n_tickers, n_bars))
+    close = 100 * np.exp(np.cumsum(returns, axis=1))
+    spread = np.abs(rng.normal(0, 0.01, size=close.shape)) * close
+    panel = {
+        'Open': close * (1 + rng.normal(0, 0.005, size=close.shape)),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.lognormal(15, 0.5, size=close.shape)
+    }
+    # Recent IPOs: left-pad 10% of tickers with NaN
+    short = rng.choice(n_tickers, size=n_tickers // 10, replace=False)
+    for values in panel.values():
+        values[short, :n_bars // 2] = np.nan
+    return [f"T{i:05d}" for i in range(n_tickers)], panel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indicator engine benchmark")
+    parser.add_argument("--tickers", type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'indicators (s)':>15} {'documents (s)':>14} {'tickers/s':>12}")
+    for n in args.tickers:
+        tickers, panel = synthetic_panel(n, args.bars)
+
+        best_ind = best_docs = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            compute_indicators(panel)
+            best_ind = min(best_ind, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            docs = generate_technical_documents(tickers, panel)
+            best_docs = min(best_docs, time.perf_counter() - start)
+
+        assert len(docs) == n
+        print(f"{n:>8} {best_ind:>15.3f} {best_docs:>14.3f} {n / best_docs:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
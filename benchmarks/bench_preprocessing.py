@@ -0,0 +1,73 @@
+"""
+Benchmark DocumentPreprocessor throughput, single process vs. process pool.
+
+Usage: python benchmarks/bench_preprocessing.py --stocks 500 --words 20000 --workers 1 2 4
+"""
+
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collection.data_preprocessor import DocumentPreprocessor, throughput_stats
+
+VOCABULARY = ("revenue growth margin guidance quarter fiscal risk factors liquidity debt "
+              "competition regulatory supply chain demand outlook segment operating income "
+              "$1.2B 15% Q3 (net) EPS* — cash-flow; capex: buybacks!").split()
+
+
+def synthetic_stocks(n_stocks: int, words_per_doc: int, docs_per_stock: int = 3, seed: int = 0):
+    """Filing-sized synthetic documents with messy whitespace and symbols"""
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(n_stocks):
+        documents = []
+        for d in range(docs_per_stock):
+            words = [rng.choice(VOCABULARY) for _ in range(words_per_doc)]
+            documents.append({
+                'type': 'Financial Performance',
+                'content': "  \n".join(" ".join(words[j:j + 12]) for j in range(0, len(words), 12)),
+                'date': '2025-01-01T00:00:00'
+            })
+        stocks.append({
+            'ticker': f"T{i:04d}",
+            'company_name': f"Company {i}",
+            'sector': 'Technology',
+            'industry': 'Software',
+            'market_cap': 1e9,
+            'pe_ratio': 20.0,
+            'documents': documents
+        })
+    return stocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing throughput benchmark")
+    parser.add_argument("--stocks", type=int, default=200)
+    parser.add_argument("--words", type=int, default=20000, help="Words per document")
+    parser.add_argument("--workers", type=int, nargs='+', default=[1, 2, os.cpu_count() or 4])
+    args = parser.parse_args()
+
+    stocks = synthetic_stocks(args.stocks, args.words)
+    preprocessor = DocumentPreprocessor()
+    baseline = None
+
+    print(f"{'workers':>8} {'chunks':>9} {'seconds':>8} {'docs/s':>9} {'MB/s':>8} {'same output':>12}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        chunks = list(preprocessor.iter_chunks(stocks, workers=workers))
+        stats = throughput_stats(stocks, time.perf_counter() - start)
+
+        if baseline is None:
+            baseline = chunks
+        print(f"{workers:>8} {len(chunks):>9,} {stats['seconds']:>8.2f} "
+              f"{stats['docs_per_second']:>9,.1f} {stats['mb_per_second']:>8.2f} "
+              f"{str(chunks == baseline):>12}")
+
+
+if __name__ == "__main__":
+    main()
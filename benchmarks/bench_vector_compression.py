@@ -0,0 +1,120 @@
+"""
+Compressed vectors in the NumPy store: memory saved vs. recall lost.
+
+Builds one store per compression setting (none, PCA at each --pca-dims, PQ at
+each --pq-subvectors) over the same synthetic corpus and times held-out
+queries at several re-rank depths (top_k x --rerank approximate candidates are
+re-scored exactly from the full vectors on disk; --rerank 1 shows the raw
+recall of the codes). Recall@k is measured against exact brute-force top-k.
+"memory MB" is what the store scans per query: the codes, or the full
+float32 matrix without compression.
+
+Usage: python benchmarks/bench_vector_compression.py --docs 100000 --pca-dims 48 96 --pq-subvectors 24 48 --rerank 1 4 10
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+
+
+def synthetic_corpus(n_docs: int, n_tickers: int, noise: float, seed: int = 0):
+    """Unit vectors scattered around one center per ticker"""
+    rng = np.random.default_rng(seed)
+    dim = Settings.EMBEDDING_DIMENSION
+    centers = rng.standard_normal((n_tickers, dim), dtype=np.float32)
+    ticker_idx = rng.integers(0, n_tickers, n_docs)
+    vectors = centers[ticker_idx] + noise * rng.standard_normal((n_docs, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [{
+        'text': f"synthetic chunk {i}",
+        'ticker': f"T{ticker_idx[i]:04d}",
+        'company_name': f"Company {ticker_idx[i]}",
+        'type': "News",
+        'chunk_id': i,
+        'date': "2025-06-01T00:00:00",
+        'metadata': {'sector': 'Technology'}
+    } for i in range(n_docs)]
+    return documents, vectors
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector compression benchmark")
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.5, help="spread around each ticker center")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--pca-dims", type=int, nargs="*", default=[48, 96])
+    parser.add_argument("--pq-subvectors", type=int, nargs="*", default=[24, 48])
+    parser.add_argument("--rerank", type=int, nargs="+", default=[1, 4, 10])
+    args = parser.parse_args()
+
+    documents, vectors = synthetic_corpus(args.docs + args.queries, args.tickers, args.noise)
+    documents, queries, vectors = documents[:args.docs], vectors[args.docs:], vectors[:args.docs]
+    truth = exact_top_k(vectors, queries, args.top_k)
+
+    tmp_root = tempfile.mkdtemp(prefix="bench_compression_")
+    Settings.SEARCH_CACHE_SIZE = 0  # measure retrieval, not the result cache
+    Settings.HYBRID_SEARCH = False
+    Settings.COMPRESSION_TRAIN_ROWS = min(Settings.COMPRESSION_TRAIN_ROWS, args.docs)
+
+    from vector_db.numpy_store import NumpyVectorStore
+
+    configs = [('none', None)]
+    configs += [('pca', dims) for dims in args.pca_dims]
+    configs += [('pq', subvectors) for subvectors in args.pq_subvectors]
+    full_mb = args.docs * vectors.shape[1] * 4 / (1024 * 1024)
+
+    try:
+        print(f"{args.docs:,} vectors, dim={vectors.shape[1]}, {args.queries} queries, top_k={args.top_k}\n")
+        print(f"{'method':>6} {'param':>6} {'build s':>8} {'memory MB':>10} {'saved':>6} "
+              f"{'rerank':>6} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for method, param in configs:
+            Settings.VECTOR_COMPRESSION = method
+            if method == 'pca':
+                Settings.PCA_DIMENSIONS = param
+            elif method == 'pq':
+                Settings.PQ_SUBVECTORS = param
+            Settings.NUMPY_STORE_DIR = os.path.join(tmp_root, f"{method}_{param}")
+
+            store = NumpyVectorStore()
+            start = time.perf_counter()
+            store.add_documents(documents, vectors, batch_size=5000)
+            build_seconds = time.perf_counter() - start
+            truth_ids = [{store.document_id(documents[i]) for i in row} for row in truth]
+            memory_mb = store.get_stats()['codes_mb'] if store.compressor else full_mb
+
+            for rerank in (args.rerank if store.compressor else [1]):
+                Settings.COMPRESSION_RERANK = rerank
+                store.search(queries[0], None, args.top_k)  # warm-up
+                timings, recalls = [], []
+                for query, want in zip(queries, truth_ids):
+                    start = time.perf_counter()
+                    results = store.search(query, None, args.top_k)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    recalls.append(len({doc['id'] for doc in results} & want) / len(want))
+                print(f"{method:>6} {param or '-':>6} {build_seconds:>8.1f} {memory_mb:>10.1f} "
+                      f"{1 - memory_mb / full_mb:>6.0%} {rerank if store.compressor else '-':>6} "
+                      f"{np.mean(recalls):>9.3f} {np.percentile(timings, 50):>8.2f} {np.percentile(timings, 99):>8.2f}")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Head-to-head query latency: ChromaDB (HNSW over SQLite) vs. the NumPy exact-search store.
+
+Both stores are filled with the same synthetic corpus in temp directories and
+queried with a mix of unfiltered, single-ticker, multi-ticker and doc-type
+filters. Also reports Chroma's recall@k against the exact NumPy results.
+
+Usage: python benchmarks/bench_vector_stores.py --docs 50000 --queries 200 --top-k 5
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import Settings
+
+DOC_TYPES = ["Company Overview", "Financial Performance", "Technical Analysis", "Trading Signals", "News"]
+
+
+def synthetic_corpus(n_docs: int, n_tickers: int, seed: int = 0):
+    """Clustered unit vectors (one cluster per ticker) with ticker/type/date metadata"""
+    rng = np.random.default_rng(seed)
+    dim = Settings.EMBEDDING_DIMENSION
+    centers = rng.standard_normal((n_tickers, dim), dtype=np.float32)
+    ticker_idx = rng.integers(0, n_tickers, n_docs)
+    vectors = centers[ticker_idx] + 0.8 * rng.standard_normal((n_docs, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    documents = [{
+        'text': f"synthetic chunk {i}",
+        'ticker': f"T{ticker_idx[i]:04d}",
+        'company_name': f"Company {ticker_idx[i]}",
+        'type': DOC_TYPES[i % len(DOC_TYPES)],
+        'chunk_id': i,
+        'date': f"2025-{1 + i % 12:02d}-01T00:00:00",
+        'metadata': {'sector': 'Technology', 'industry': 'Software', 'market_cap': 1e9, 'pe_ratio': 20.0}
+    } for i in range(n_docs)]
+    return documents, vectors
+
+
+def query_mix(n_queries: int, n_tickers: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    queries = rng.standard_normal((n_queries, Settings.EMBEDDING_DIMENSION), dtype=np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    filters = []
+    for i in range(n_queries):
+        kind = i % 4
+        if kind == 0:
+            filters.append(None)
+        elif kind == 1:
+            filters.append({'tickers': [f"T{rng.integers(n_tickers):04d}"]})
+        elif kind == 2:
+            filters.append({'tickers': [f"T{t:04d}" for t in rng.integers(0, n_tickers, 5)]})
+        else:
+            filters.append({'doc_types': ['News', 'Trading Signals']})
+    return queries, filters
+
+
+def time_queries(store, queries, filters, top_k):
+    timings = []
+    results = []
+    for query, query_filters in zip(queries, filters):
+        start = time.perf_counter()
+        results.append(store.search(query, query_filters, top_k))
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector store latency benchmark")
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    documents, vectors = synthetic_corpus(args.docs, args.tickers)
+    queries, filters = query_mix(args.queries, args.tickers)
+    tmp_root = tempfile.mkdtemp(prefix="bench_stores_")
+    Settings.CHROMA_PERSIST_DIR = os.path.join(tmp_root, "chroma")
+    Settings.NUMPY_STORE_DIR = os.path.join(tmp_root, "numpy")
+
+    from vector_db.chroma_manager import ChromaDBManager
+    from vector_db.numpy_store import NumpyVectorStore
+
+    try:
+        stores = {}
+        print(f"{args.docs:,} docs, {args.tickers} tickers, {args.queries} queries, top_k={args.top_k}\n")
+        for name, cls in (("chroma", ChromaDBManager), ("numpy", NumpyVectorStore)):
+            store = cls()
+            start = time.perf_counter()
+            store.add_documents(documents, vectors, batch_size=1000)
+            stores[name] = (store, time.perf_counter() - start)
+
+        rows = {}
+        for name, (store, ingest_seconds) in stores.items():
+            store.search(queries[0], None, args.top_k)  # warm-up
+            timings, results = time_queries(store, queries, filters, args.top_k)
+            start = time.perf_counter()
+            store.search_many(queries, filters, args.top_k)
+            batch_ms = (time.perf_counter() - start) * 1000
+            rows[name] = (ingest_seconds, timings, batch_ms, results)
+
+        exact = rows['numpy'][3]
+        print(f"\n{'store':>8} {'ingest s':>9} {'p50 ms':>8} {'p99 ms':>8} {'search_many ms':>15} {'recall@k':>9}")
+        for name, (ingest_seconds, timings, batch_ms, results) in rows.items():
+            recall = np.mean([
+                len({d['id'] for d in got} & {d['id'] for d in want}) / max(len(want), 1)
+                for got, want in zip(results, exact)
+            ])
+            print(f"{name:>8} {ingest_seconds:>9.1f} {np.percentile(timings, 50):>8.2f} "
+                  f"{np.percentile(timings, 99):>8.2f} {batch_ms:>15.1f} {recall:>9.3f}")
+    finally:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,16 +25,74 @@ class Settings:
     # Embedding Model (Free, Local)
     EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
     EMBEDDING_DIMENSION = 384
+    # 'torch' (SentenceTransformer) or 'onnx' (ONNX Runtime, int8-quantized by default)
+    EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch').lower()
+    ONNX_MODEL_DIR = "./onnx_models"
+    ONNX_QUANTIZE = os.getenv('ONNX_QUANTIZE', 'True').lower() == 'true'
+    ONNX_NUM_THREADS = int(os.getenv('ONNX_NUM_THREADS', '0'))  # 0 = ONNX Runtime default
+    # 'tokens' groups similar-length texts into batches of ~EMBEDDING_BATCH_TOKENS padded tokens;
+    # 'fixed' keeps batch_size texts per batch in input order
+    EMBEDDING_BATCHING = os.getenv('EMBEDDING_BATCHING', 'tokens').lower()
+    EMBEDDING_BATCH_TOKENS = int(os.getenv('EMBEDDING_BATCH_TOKENS', '8192'))
+    # Worker processes for bulk embedding (0/1 = embed in-process); threads default to cores / workers
+    EMBEDDING_POOL_WORKERS = int(os.getenv('EMBEDDING_POOL_WORKERS', '0'))
+    EMBEDDING_THREADS_PER_WORKER = int(os.getenv('EMBEDDING_THREADS_PER_WORKER', '0'))
+    EMBEDDING_POOL_SHARD_SIZE = 256
+    # Query embedding micro-batching across concurrent chat sessions
+    QUERY_BATCH_MAX_WAIT_MS = float(os.getenv('QUERY_BATCH_MAX_WAIT_MS', '5'))
+    QUERY_BATCH_MAX_SIZE = int(os.getenv('QUERY_BATCH_MAX_SIZE', '32'))
+    USE_EMBEDDING_CACHE = os.getenv('USE_EMBEDDING_CACHE', 'True').lower() == 'true'
+    EMBEDDING_CACHE_DIR = "./embedding_cache"
     
     # ChromaDB Settings (Free, Local)
     CHROMA_PERSIST_DIR = "./chroma_db"
-    CHROMA_COLLECTION_NAME = "financial_documents"
+    CHROMA_COLLECTION_NAME = "financial_documents"  # alias for the live versioned collection
+    # Optional sharding of each version: 'none', 'sector' or 'ticker' (hash into CHROMA_SHARD_COUNT shards).
+    # Takes effect for new versions (python load_data.py --full-rebuild)
+    CHROMA_SHARDING = os.getenv('CHROMA_SHARDING', 'none').lower()
+    CHROMA_SHARD_COUNT = int(os.getenv('CHROMA_SHARD_COUNT', '8'))
+    CHROMA_SHARD_SEARCH_THREADS = 8
+    # HNSW index parameters for new collections (search_ef also applies to existing ones).
+    # Measure recall vs latency with benchmarks/bench_hnsw_params.py before changing them
+    HNSW_SPACE = os.getenv('HNSW_SPACE', 'cosine')  # 'cosine', 'l2' or 'ip'
+    HNSW_CONSTRUCTION_EF = int(os.getenv('HNSW_CONSTRUCTION_EF', '100'))
+    HNSW_SEARCH_EF = int(os.getenv('HNSW_SEARCH_EF', '100'))
+    HNSW_M = int(os.getenv('HNSW_M', '16'))
+    
+    # Vector store backend: 'chroma' (HNSW) or 'numpy' (exact search over a memory-mapped matrix)
+    VECTOR_STORE_BACKEND = os.getenv('VECTOR_STORE_BACKEND', 'chroma').lower()
+    NUMPY_STORE_DIR = "./vector_store"
+    MIN_REBUILD_RATIO = 0.9  # a rebuild must hold >= 90% of the live documents to go live
+    # Compressed vectors for the numpy backend: 'none', 'pca' or 'pq'. Codes are held in memory and
+    # shortlist candidates; full-precision vectors stay on disk and re-rank the shortlist exactly
+    VECTOR_COMPRESSION = os.getenv('VECTOR_COMPRESSION', 'none').lower()
+    PCA_DIMENSIONS = 96  # 384 -> 96 float32 (4x smaller)
+    PQ_SUBVECTORS = 48   # 48 one-byte codes per vector (32x smaller); must divide EMBEDDING_DIMENSION
+    COMPRESSION_TRAIN_ROWS = 20000  # trained once a collection version has this many rows (and on this sample size)
+    COMPRESSION_RERANK = 10  # exact re-rank of top_k x this many approximate candidates
+    # Search result cache (process-wide LRU, invalidated by every ingest; 0 entries = off)
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', '1024'))
+    SEARCH_CACHE_TTL = float(os.getenv('SEARCH_CACHE_TTL', str(10 * 60)))
+    # Hybrid retrieval: BM25 over an ingest-time inverted index, fused with vector hits (RRF)
+    HYBRID_SEARCH = os.getenv('HYBRID_SEARCH', 'True').lower() == 'true'
+    HYBRID_CANDIDATES = 4  # each arm returns this many x top_k candidates for fusion
+    RRF_K = 60
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    
+    # Recency decay for chat retrieval: blend similarity with 0.5 ** (age / half-life) (0 = off)
+    RECENCY_HALF_LIFE_DAYS = float(os.getenv('RECENCY_HALF_LIFE_DAYS', '0'))
+    RECENCY_WEIGHT = float(os.getenv('RECENCY_WEIGHT', '0.3'))
+    RECENCY_OVERFETCH = 4  # candidates fetched per result before re-ranking
     
     # Data Settings
     DATA_DIR = "data"
     RAW_DATA_DIR = os.path.join(DATA_DIR, "raw")
     PROCESSED_DATA_DIR = os.path.join(DATA_DIR, "processed")
     SAMPLE_DATA_DIR = os.path.join(DATA_DIR, "sample")
+    PROCESSED_CHUNKS_FILE = os.path.join(PROCESSED_DATA_DIR, "all_chunks.jsonl")
+    HISTORY_DIR = os.path.join(DATA_DIR, "history")
+    HISTORY_PERIOD_DAYS = 365
     
     # Application Settings
     APP_NAME = "Financial Research RAG Assistant (Free)"
@@ -44,12 +102,30 @@ class Settings:
     # Default tickers for analysis
     DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "JPM", "V", "JNJ"]
     
+    # Data collection (concurrent mode)
+    COLLECTOR_MAX_WORKERS = int(os.getenv('COLLECTOR_MAX_WORKERS', '8'))
+    # yfinance calls per second across all workers (a full ticker fetch is 4 calls: info, history, financials, news)
+    COLLECTOR_REQUESTS_PER_SECOND = float(os.getenv('COLLECTOR_REQUESTS_PER_SECOND', '2.0'))
+    COLLECTOR_BURST = float(os.getenv('COLLECTOR_BURST', '4'))
+    COLLECTOR_BULK_BATCH_SIZE = int(os.getenv('COLLECTOR_BULK_BATCH_SIZE', '100'))
+
+    # Raw cache freshness (seconds) - prices intraday, fundamentals daily, summary weekly
+    CACHE_TTL_PRICES = int(os.getenv('CACHE_TTL_PRICES', str(60 * 60)))
+    CACHE_TTL_NEWS = int(os.getenv('CACHE_TTL_NEWS', str(60 * 60)))
+    CACHE_TTL_FUNDAMENTALS = int(os.getenv('CACHE_TTL_FUNDAMENTALS', str(24 * 60 * 60)))
+    CACHE_TTL_SUMMARY = int(os.getenv('CACHE_TTL_SUMMARY', str(7 * 24 * 60 * 60)))
+
     # Document types - Fixed to match actual data
     DOCUMENT_TYPES = ["Company Overview", "Financial Performance", "Technical Analysis", "Trading Signals", "News"]
     
     # Chunk settings for document processing
     CHUNK_SIZE = 500
     CHUNK_OVERLAP = 50
+    # 'tokens' sizes chunks with the embedding tokenizer so nothing gets truncated
+    CHUNK_MODE = os.getenv('CHUNK_MODE', 'words')
+    EMBEDDING_MAX_TOKENS = 256  # all-MiniLM-L6-v2 max_seq_length
+    CHUNK_OVERLAP_TOKENS = 32
+    CHUNK_MIN_TOKENS = 16
     
     # Free model limits
     MAX_TOKENS = 1024
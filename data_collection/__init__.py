@@ -1,7 +1,14 @@
-from .yahoo_collector import YahooFinanceCollector
+from .yahoo_collector import YahooFinanceCollector, YahooFetchBackend
 from .data_preprocessor import DocumentPreprocessor
+from .rate_limiter import TokenBucket
+from .freshness import FreshnessPolicy
+from .history_store import PriceHistoryStore
 
 __all__ = [
     'YahooFinanceCollector',
-    'DocumentPreprocessor'
+    'YahooFetchBackend',
+    'DocumentPreprocessor',
+    'TokenBucket',
+    'FreshnessPolicy',
+    'PriceHistoryStore'
 ]
\ No newline at end of file
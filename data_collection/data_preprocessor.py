@@ -1,23 +1,126 @@
 import re
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional
 from datetime import datetime
+from itertools import islice
+from collections import deque
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import glob
 import os
+import time
 from tqdm import tqdm
+from config.settings import Settings
+
+# Compiled once per process instead of on every clean_text call
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\;\:\!\?\-\%\$\/]')
+_SENTENCE_END_RE = re.compile(r'(?<=[\.\!\?])\s+')
+
+# Per-worker preprocessor, built by _init_worker in each pool process
+_worker_preprocessor = None
+
+
+def _init_worker(config: Dict):
+    global _worker_preprocessor
+    _worker_preprocessor = DocumentPreprocessor(**config)
+
+
+def _process_in_worker(stock_data: Dict) -> List[Dict]:
+    return _worker_preprocessor.process_stock_data(stock_data)
+
+
+def batched(iterable: Iterable, batch_size: int) -> Iterator[List]:
+    """Yield lists of up to batch_size items from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def throughput_stats(stocks_data: List[Dict], elapsed: float) -> Dict:
+    """Preprocessing throughput in documents/sec and MB/sec of raw document text"""
+    docs = sum(len(stock.get('documents', [])) for stock in stocks_data)
+    size_mb = sum(
+        len(doc['content'].encode('utf-8'))
+        for stock in stocks_data for doc in stock.get('documents', [])
+    ) / (1024 * 1024)
+    return {
+        'documents': docs,
+        'megabytes': size_mb,
+        'seconds': elapsed,
+        'docs_per_second': docs / elapsed if elapsed > 0 else 0.0,
+        'mb_per_second': size_mb / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def iter_jsonl(path: str) -> Iterator[Dict]:
+    """Stream records from a JSONL file one line at a time"""
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_raw_stock_files(raw_dir: Optional[str] = None) -> Iterator[Dict]:
+    """Stream per-ticker raw data files ({TICKER}_data.json) one stock at a time"""
+    raw_dir = raw_dir or Settings.RAW_DATA_DIR
+    for path in sorted(glob.glob(os.path.join(raw_dir, "*_data.json"))):
+        if os.path.basename(path) == "all_stocks_data.json":
+            continue
+        try:
+            with open(path, 'r') as f:
+                yield json.load(f)
+        except Exception as e:
+            print(f"   ⚠️ Skipping unreadable file {path}: {e}")
+
 
 class DocumentPreprocessor:
     """Preprocess documents for vector storage"""
     
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    def __init__(self,
+                 chunk_size: int = 500,
+                 chunk_overlap: int = 50,
+                 chunk_mode: Optional[str] = None,
+                 tokenizer_name: Optional[str] = None,
+                 max_tokens: Optional[int] = None,
+                 overlap_tokens: Optional[int] = None):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.last_run_stats = {}
+
+        # 'words': fixed word windows; 'tokens': windows sized to the embedding model
+        self.chunk_mode = chunk_mode or Settings.CHUNK_MODE
+        if self.chunk_mode not in ('words', 'tokens'):
+            raise ValueError(f"Unknown chunk mode: {self.chunk_mode}")
+        self.tokenizer_name = tokenizer_name or Settings.EMBEDDING_MODEL
+        self.max_tokens = max_tokens or Settings.EMBEDDING_MAX_TOKENS
+        self.overlap_tokens = overlap_tokens if overlap_tokens is not None else Settings.CHUNK_OVERLAP_TOKENS
+        self._tokenizer = None
+
+    @property
+    def tokenizer(self):
+        """The embedding model's own (fast) tokenizer, loaded on first use"""
+        if self._tokenizer is None:
+            from transformers import AutoTokenizer
+            self._tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name, use_fast=True)
+        return self._tokenizer
+
+    @property
+    def token_budget(self) -> int:
+        """Content tokens per chunk once the model's [CLS]/[SEP] are added"""
+        return self.max_tokens - self.tokenizer.num_special_tokens_to_add(pair=False)
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\%\$\/]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         return text.strip()
     
     def chunk_text(self, text: str) -> List[str]:
@@ -26,12 +129,89 @@ class DocumentPreprocessor:
         chunks = []
         
         for i in range(0, len(words), self.chunk_size - self.chunk_overlap):
-            chunk = ' '.join(words[i:i + self.chunk_size])
-            if len(chunk.split()) > 20:  # Minimum chunk size
-                chunks.append(chunk)
+            chunk_words = words[i:i + self.chunk_size]
+            if len(chunk_words) > 20:  # Minimum chunk size
+                chunks.append(' '.join(chunk_words))
         
         return chunks
     
+    def chunk_text_tokens(self, text: str) -> List[Dict]:
+        """
+        Split text into chunks that fit the embedding model's window.
+        Tokens are counted with the model's tokenizer; chunks end on sentence
+        boundaries where possible and carry character offsets into `text`.
+        Consecutive chunks share up to `overlap_tokens` of trailing sentences.
+        """
+        encoding = self.tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            verbose=False
+        )
+        offsets = encoding['offset_mapping']
+        if len(offsets) < Settings.CHUNK_MIN_TOKENS:
+            return []
+
+        budget = self.token_budget
+        token_starts = [start for start, _ in offsets]
+
+        # Sentences as token index ranges [first, last)
+        sentences = []
+        sentence_start = 0
+        for match in _SENTENCE_END_RE.finditer(text):
+            sentences.append((sentence_start, match.start()))
+            sentence_start = match.end()
+        sentences.append((sentence_start, len(text)))
+
+        units = []
+        for char_start, char_end in sentences:
+            first = bisect_left(token_starts, char_start)
+            last = bisect_left(token_starts, char_end)
+            # Sentences longer than the window are cut between words
+            i = first
+            while i < last:
+                end = min(i + budget, last)
+                if end < last:
+                    cut = end
+                    while cut > i + 1 and token_starts[cut] == offsets[cut - 1][1]:
+                        cut -= 1
+                    if cut > i + 1:
+                        end = cut
+                units.append((i, end))
+                i = end
+
+        chunks = []
+        i = 0
+        covered = 0
+        while i < len(units):
+            first = units[i][0]
+            j = i
+            while j < len(units) and units[j][1] - first <= budget:
+                j += 1
+            if j <= covered:
+                # The overlap left no room for new text; restart without it
+                i = covered
+                continue
+            covered = j
+            last = units[j - 1][1]
+            char_start, char_end = offsets[first][0], offsets[last - 1][1]
+            chunks.append({
+                'text': text[char_start:char_end],
+                'char_start': char_start,
+                'char_end': char_end,
+                'token_count': last - first
+            })
+            if j >= len(units):
+                break
+
+            # Step back over trailing sentences that fit the overlap budget
+            k = j
+            while k - 1 > i and units[j - 1][1] - units[k - 1][0] <= self.overlap_tokens:
+                k -= 1
+            i = k
+
+        return chunks
+
     def process_stock_data(self, stock_data: Dict) -> List[Dict]:
         """Process stock data into chunks for vector database"""
         processed_chunks = []
@@ -45,12 +225,15 @@ class DocumentPreprocessor:
             cleaned_content = self.clean_text(doc['content'])
             
             # Create chunks
-            chunks = self.chunk_text(cleaned_content)
+            if self.chunk_mode == 'tokens':
+                spans = self.chunk_text_tokens(cleaned_content)
+            else:
+                spans = [{'text': chunk} for chunk in self.chunk_text(cleaned_content)]
             
             # Add metadata to each chunk
-            for i, chunk in enumerate(chunks):
-                processed_chunks.append({
-                    'text': chunk,
+            for i, span in enumerate(spans):
+                chunk = {
+                    'text': span['text'],
                     'ticker': ticker,
                     'company_name': company_name,
                     'type': doc['type'],
@@ -62,19 +245,86 @@ class DocumentPreprocessor:
                         'market_cap': stock_data.get('market_cap', 0),
                         'pe_ratio': stock_data.get('pe_ratio', 0)
                     }
-                })
+                }
+                # Token mode: offsets into the cleaned document text
+                for key in ('char_start', 'char_end', 'token_count'):
+                    if key in span:
+                        chunk[key] = span[key]
+                processed_chunks.append(chunk)
         
         return processed_chunks
     
-    def process_all_stocks(self, stocks_data: List[Dict]) -> List[Dict]:
-        """Process all stock data"""
-        all_processed = []
-        
-        for stock_data in tqdm(stocks_data, desc="Processing documents"):
-            chunks = self.process_stock_data(stock_data)
-            all_processed.extend(chunks)
+    def _worker_config(self) -> Dict:
+        """Constructor arguments used to rebuild this preprocessor in worker processes"""
+        return {
+            'chunk_size': self.chunk_size,
+            'chunk_overlap': self.chunk_overlap,
+            'chunk_mode': self.chunk_mode,
+            'tokenizer_name': self.tokenizer_name,
+            'max_tokens': self.max_tokens,
+            'overlap_tokens': self.overlap_tokens
+        }
+
+    def iter_chunks(self, stocks_data: Iterable[Dict], workers: int = 1) -> Iterator[Dict]:
+        """
+        Lazily yield processed chunks, one stock at a time.
+        With workers > 1, stocks are sharded across a process pool; output
+        keeps the input order and at most a few stocks per worker are in flight.
+        Workers are spawned, not forked: the pool starts lazily, possibly after
+        the embedder has loaded torch / the tokenizer and started their threads.
+        """
+        if workers <= 1:
+            for stock_data in stocks_data:
+                yield from self.process_stock_data(stock_data)
+            return
+
+        max_pending = workers * 4
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=(self._worker_config(),)) as executor:
+            pending = deque()
+            for stock_data in stocks_data:
+                pending.append(executor.submit(_process_in_worker, stock_data))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def stream_to_jsonl(self,
+                        stocks_data: Iterable[Dict],
+                        output_file: Optional[str] = None,
+                        workers: int = 1) -> Iterator[Dict]:
+        """
+        Stream chunks to an append-only JSONL file while yielding them.
+        Memory stays flat regardless of corpus size, and consumers (e.g. the
+        embedder) can start on the first chunks before preprocessing finishes.
+        """
+        output_file = output_file or Settings.PROCESSED_CHUNKS_FILE
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+        total = 0
+        last_ticker = None
+        with open(output_file, 'w') as f:
+            for chunk in self.iter_chunks(tqdm(stocks_data, desc="Processing documents"), workers=workers):
+                # Make each finished stock visible to readers tailing the file
+                if chunk['ticker'] != last_ticker:
+                    f.flush()
+                    last_ticker = chunk['ticker']
+                f.write(json.dumps(chunk, default=str) + "\n")
+                total += 1
+                yield chunk
+
+        print(f"Total processed chunks: {total}")
+
+    def process_all_stocks(self, stocks_data: List[Dict], workers: int = 1) -> List[Dict]:
+        """Process all stock data (across `workers` processes if > 1)"""
+        start = time.perf_counter()
+        all_processed = list(self.iter_chunks(tqdm(stocks_data, desc="Processing documents"), workers=workers))
+        elapsed = time.perf_counter() - start
         
         print(f"Total processed chunks: {len(all_processed)}")
+        self.last_run_stats = throughput_stats(stocks_data, elapsed)
         
         # Save processed data
         os.makedirs("data/processed", exist_ok=True)
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from config.settings import Settings
+
+# Cached fields grouped by how quickly they go stale
+FIELD_GROUPS = {
+    'prices': ['current_price', '52_week_high', '52_week_low'],
+    'news': ['recent_news'],
+    'fundamentals': ['market_cap', 'pe_ratio', 'forward_pe', 'dividend_yield', 'beta',
+                     'target_price', 'revenue', 'gross_profit', 'operating_income',
+                     'analyst_recommendation'],
+    'summary': ['company_name', 'sector', 'industry', 'business_summary']
+}
+
+# Backend calls needed to refresh each group
+GROUP_SOURCES = {
+    'prices': {'history'},
+    'news': {'news'},
+    'fundamentals': {'info', 'financials'},
+    'summary': {'info'}
+}
+
+
+class FreshnessPolicy:
+    """
+    TTL policy for the raw ticker cache.
+    Each field group carries its own refresh timestamp under data['refreshed'];
+    caches written before this existed fall back to `collected_date`.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, timedelta]] = None):
+        self.ttls = ttls or {
+            'prices': timedelta(seconds=Settings.CACHE_TTL_PRICES),
+            'news': timedelta(seconds=Settings.CACHE_TTL_NEWS),
+            'fundamentals': timedelta(seconds=Settings.CACHE_TTL_FUNDAMENTALS),
+            'summary': timedelta(seconds=Settings.CACHE_TTL_SUMMARY)
+        }
+
+    @staticmethod
+    def _parse(value) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+
+    def last_refreshed(self, data: Dict, group: str) -> Optional[datetime]:
+        """When a field group was last fetched from the API"""
+        refreshed = data.get('refreshed') or {}
+        return self._parse(refreshed.get(group)) or self._parse(data.get('collected_date'))
+
+    def expired_groups(self, data: Dict, now: Optional[datetime] = None) -> List[str]:
+        """Field groups whose TTL has run out (all of them if never refreshed)"""
+        now = now or datetime.now()
+        expired = []
+        for group, ttl in self.ttls.items():
+            refreshed_at = self.last_refreshed(data, group)
+            if refreshed_at is None or now - refreshed_at >= ttl:
+                expired.append(group)
+        return expired
+
+    def sources_for(self, groups: Iterable[str]) -> Set[str]:
+        """Backend calls needed to refresh the given groups"""
+        sources = set()
+        for group in groups:
+            sources |= GROUP_SOURCES.get(group, set())
+        return sources
+
+    def mark_refreshed(self, data: Dict, groups: Iterable[str], now: Optional[datetime] = None):
+        """Stamp field groups as refreshed"""
+        stamp = (now or datetime.now()).isoformat()
+        refreshed = data.setdefault('refreshed', {})
+        for group in groups:
+            refreshed[group] = stamp
+
+    def keep_stamps(self, data: Dict, previous: Dict, groups: Iterable[str]):
+        """
+        Stamp groups with their refresh time in `previous`, so a newer collected_date
+        doesn't make them look fresh (never-refreshed groups stay expired)
+        """
+        refreshed = data['refreshed'] = dict(data.get('refreshed') or {})
+        for group in groups:
+            refreshed_at = self.last_refreshed(previous, group) or datetime.min
+            refreshed[group] = refreshed_at.isoformat()
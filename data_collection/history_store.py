@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Union
+from config.settings import Settings
+
+# OHLCV columns stored per ticker (plus the Date column as int64 nanoseconds, UTC)
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+DateLike = Union[str, datetime, np.datetime64, pd.Timestamp]
+
+
+class PriceHistoryStore:
+    """
+    Columnar on-disk store for daily OHLCV bars.
+    Every ticker gets a directory with one raw binary file per column
+    (Date as int64 ns, prices/volume as float64). Appends write to the end of
+    each file; reads memory-map the files, so range reads are views, not copies.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or Settings.HISTORY_DIR
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, ticker: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _column_path(self, ticker: str, column: str) -> str:
+        return os.path.join(self.base_dir, ticker, f"{column}.bin")
+
+    @staticmethod
+    def _to_ns(value: DateLike) -> int:
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        return int(ts.value)
+
+    def __contains__(self, ticker: str) -> bool:
+        return self.length(ticker) > 0
+
+    def length(self, ticker: str) -> int:
+        """Number of complete bars stored for a ticker"""
+        sizes = []
+        for column in ('Date',) + PRICE_COLUMNS:
+            path = self._column_path(ticker, column)
+            if not os.path.exists(path):
+                return 0
+            sizes.append(os.path.getsize(path) // 8)
+        # A crash mid-append can leave columns uneven; only full rows count
+        return min(sizes)
+
+    def _memmap(self, ticker: str, column: str, n: int, mode: str = 'r') -> np.memmap:
+        dtype = np.int64 if column == 'Date' else np.float64
+        return np.memmap(self._column_path(ticker, column), dtype=dtype, mode=mode, shape=(n,))
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Date of the most recent stored bar (UTC, tz-naive)"""
+        n = self.length(ticker)
+        if n == 0:
+            return None
+        return pd.Timestamp(int(self._memmap(ticker, 'Date', n)[n - 1]))
+
+    def append(self, ticker: str, dates: np.ndarray, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Append bars sorted by date. Bars older than the last stored bar are
+        dropped; a bar on the last stored date overwrites it (intraday updates).
+        Returns the number of new bars written.
+        """
+        dates = np.asarray(dates).astype('datetime64[ns]').view(np.int64)
+        if len(dates) == 0:
+            return 0
+
+        with self._lock(ticker):
+            os.makedirs(os.path.join(self.base_dir, ticker), exist_ok=True)
+            n = self.length(ticker)
+            all_columns = ('Date',) + PRICE_COLUMNS
+            values = {'Date': dates}
+            for column in PRICE_COLUMNS:
+                values[column] = np.asarray(columns[column], dtype=np.float64)
+
+            start = 0
+            if n > 0:
+                last = int(self._memmap(ticker, 'Date', n)[n - 1])
+                start = int(np.searchsorted(dates, last, side='left'))
+                if start < len(dates) and dates[start] == last:
+                    # Rewrite the last stored bar in place
+                    for column in all_columns:
+                        mm = self._memmap(ticker, column, n, mode='r+')
+                        mm[n - 1] = values[column][start]
+                        mm.flush()
+                        del mm
+                    start += 1
+
+            if start >= len(dates):
+                return 0
+
+            for column in all_columns:
+                path = self._column_path(ticker, column)
+                dtype = np.int64 if column == 'Date' else np.float64
+                with open(path, 'ab') as f:
+                    # Drop any partial tail left by an interrupted append
+                    f.truncate(n * 8)
+                    f.write(values[column][start:].astype(dtype).tobytes())
+
+            return len(dates) - start
+
+    def append_frame(self, ticker: str, hist: pd.DataFrame) -> int:
+        """Append a yfinance-style history DataFrame (DatetimeIndex + OHLCV columns)"""
+        if hist is None or hist.empty:
+            return 0
+        index = pd.DatetimeIndex(hist.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        order = np.argsort(index.values, kind='stable')
+        return self.append(
+            ticker,
+            index.values[order],
+            {column: hist[column].to_numpy()[order] for column in PRICE_COLUMNS}
+        )
+
+    def read(self,
+             ticker: str,
+             start: Optional[DateLike] = None,
+             end: Optional[DateLike] = None) -> Dict[str, np.ndarray]:
+        """
+        Read bars in [start, end] as zero-copy memory-mapped views.
+        'Date' is returned as datetime64[ns]; other columns as float64.
+        """
+        n = self.length(ticker)
+        if n == 0:
+            empty = {column: np.empty(0, dtype=np.float64) for column in PRICE_COLUMNS}
+            empty['Date'] = np.empty(0, dtype='datetime64[ns]')
+            return empty
+
+        dates = self._memmap(ticker, 'Date', n)
+        lo = int(np.searchsorted(dates, self._to_ns(start), side='left')) if start is not None else 0
+        hi = int(np.searchsorted(dates, self._to_ns(end), side='right')) if end is not None else n
+
+        result = {'Date': dates[lo:hi].view('datetime64[ns]')}
+        for column in PRICE_COLUMNS:
+            result[column] = self._memmap(ticker, column, n)[lo:hi]
+        return result
+
+    def to_frame(self,
+                 ticker: str,
+                 start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None) -> pd.DataFrame:
+        """Read bars into a DataFrame shaped like `yf.Ticker.history` output"""
+        bars = self.read(ticker, start, end)
+        return pd.DataFrame(
+            {column: np.array(bars[column]) for column in PRICE_COLUMNS},
+            index=pd.DatetimeIndex(np.array(bars['Date']), name='Date')
+        )
@@ -0,0 +1,283 @@
+"""
+Vectorized technical indicators over (ticker x time) panels.
+
+Every function takes 2-D float arrays shaped (n_tickers, n_bars), oldest bar
+first. Tickers with shorter histories are left-padded with NaN; indicator
+values are NaN until enough bars are available.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+# Trading days used for the period-change figures
+PERIOD_DAYS = {'1-Week': 5, '1-Month': 21, '3-Month': 63}
+YEAR_DAYS = 252  # trading days
+
+
+def build_panel(histories: Dict[str, pd.DataFrame],
+                bars: int = YEAR_DAYS + 1) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Stack per-ticker OHLCV frames into right-aligned (ticker x time) arrays.
+    Returns the ticker order and a dict of Open/High/Low/Close/Volume panels.
+    """
+    tickers = [t for t, hist in histories.items() if hist is not None and not hist.empty]
+    panel = {column: np.full((len(tickers), bars), np.nan)
+             for column in ('Open', 'High', 'Low', 'Close', 'Volume')}
+
+    for row, ticker in enumerate(tickers):
+        hist = histories[ticker].tail(bars)
+        n = len(hist)
+        for column, values in panel.items():
+            if column in hist.columns:
+                values[row, bars - n:] = hist[column].to_numpy(dtype=np.float64)
+
+    return tickers, panel
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average via cumulative sums"""
+    valid = ~np.isnan(x)
+    cs = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    cnt = np.cumsum(valid, axis=1)
+    cs = np.concatenate([np.zeros((x.shape[0], 1)), cs], axis=1)
+    cnt = np.concatenate([np.zeros((x.shape[0], 1), dtype=cnt.dtype), cnt], axis=1)
+
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    sums = cs[:, window:] - cs[:, :-window]
+    counts = cnt[:, window:] - cnt[:, :-window]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:, window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Population rolling standard deviation via cumulative sums"""
+    mean = sma(x, window)
+    mean_sq = sma(x * x, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def _recursive_smooth(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponential smoothing along time, vectorized across tickers.
+    Seeds each row with its first valid value and carries through NaN gaps.
+    """
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        cur = x[:, t]
+        seeded = ~np.isnan(prev)
+        has_value = ~np.isnan(cur)
+        prev = np.where(
+            seeded & has_value, alpha * cur + (1 - alpha) * prev,
+            np.where(has_value, cur, prev)
+        )
+        out[:, t] = prev
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1)"""
+    return _recursive_smooth(x, 2.0 / (span + 1))
+
+
+def wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1 / period), used by RSI and ATR"""
+    return _recursive_smooth(x, 1.0 / period)
+
+
+def _shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    out[:, n:] = x[:, :-n]
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index"""
+    delta = close - _shift(close)
+    avg_gain = wilder(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0)), period)
+    avg_loss = wilder(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0)), period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = avg_gain / avg_loss
+        out = 100.0 - 100.0 / (1.0 + rs)
+    # No losses in the window means maximum strength
+    out = np.where((avg_loss == 0) & (avg_gain > 0), 100.0, out)
+    # Not enough bars yet
+    enough = np.cumsum(~np.isnan(delta), axis=1) >= period
+    return np.where(enough, out, np.nan)
+
+
+def macd(close: np.ndarray,
+         fast: int = 12,
+         slow: int = 26,
+         signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close: np.ndarray,
+              window: int = 20,
+              num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands: (lower, middle, upper)"""
+    middle = sma(close, window)
+    std = rolling_std(close, window)
+    return middle - num_std * std, middle, middle + num_std * std
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range"""
+    prev_close = _shift(close)
+    true_range = np.fmax(
+        high - low,
+        np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    )
+    return wilder(true_range, period)
+
+
+def volume_zscore(volume: np.ndarray, window: int = 20) -> np.ndarray:
+    """How unusual each bar's volume is relative to its trailing window"""
+    mean = sma(volume, window)
+    std = rolling_std(volume, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # NaN until the window is full; a flat window (std 0) scores 0
+        return np.where(std > 0, (volume - mean) / std, np.where(np.isnan(std), np.nan, 0.0))
+
+
+def compute_indicators(panel: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Compute the full indicator set for every ticker in one pass"""
+    close, high, low, volume = panel['Close'], panel['High'], panel['Low'], panel['Volume']
+
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_lower, bb_middle, bb_upper = bollinger(close)
+
+    return {
+        'close': close,
+        'sma_20': bb_middle,
+        'sma_50': sma(close, 50),
+        'sma_200': sma(close, 200),
+        'ema_12': ema(close, 12),
+        'ema_26': ema(close, 26),
+        'rsi_14': rsi(close, 14),
+        'macd': macd_line,
+        'macd_signal': macd_signal,
+        'macd_hist': macd_hist,
+        'bb_lower': bb_lower,
+        'bb_upper': bb_upper,
+        'atr_14': atr(high, low, close, 14),
+        'volume_z': volume_zscore(volume, 20)
+    }
+
+
+def latest_values(indicators: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Last bar of every indicator, plus period changes and the previous MACD histogram"""
+    close = indicators['close']
+    last = {name: values[:, -1] for name, values in indicators.items()}
+    last['prev_macd_hist'] = indicators['macd_hist'][:, -2] if close.shape[1] > 1 else np.full(close.shape[0], np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for label, days in PERIOD_DAYS.items():
+            if close.shape[1] > days:
+                last[f'change_{label}'] = (close[:, -1] / close[:, -1 - days] - 1) * 100
+            else:
+                last[f'change_{label}'] = np.full(close.shape[0], np.nan)
+        # Change over up to a year of bars, per ticker; period_bars is the span actually covered
+        first_idx = np.argmax(~np.isnan(close), axis=1)
+        span = np.minimum(close.shape[1] - 1 - first_idx, YEAR_DAYS)
+        first = close[np.arange(close.shape[0]), close.shape[1] - 1 - span]
+        last['change_period'] = (close[:, -1] / first - 1) * 100
+        last['period_bars'] = span.astype(float)
+        last['atr_pct'] = indicators['atr_14'][:, -1] / close[:, -1] * 100
+    return last
+
+
+def _fmt(value: float, pattern: str) -> str:
+    return "N/A" if value is None or np.isnan(value) else pattern.format(value)
+
+
+def _signals(v: Dict[str, float]) -> List[str]:
+    """Rule-based signal lines for one ticker's latest indicator values"""
+    signals = []
+    close, rsi_value = v['close'], v['rsi_14']
+
+    if not np.isnan(rsi_value):
+        if rsi_value >= 70:
+            signals.append(f"BEARISH: RSI {rsi_value:.1f} is overbought (>= 70)")
+        elif rsi_value <= 30:
+            signals.append(f"BULLISH: RSI {rsi_value:.1f} is oversold (<= 30)")
+
+    if not np.isnan(v['macd_hist']) and not np.isnan(v['prev_macd_hist']):
+        if v['prev_macd_hist'] <= 0 < v['macd_hist']:
+            signals.append("BULLISH: MACD crossed above its signal line")
+        elif v['prev_macd_hist'] >= 0 > v['macd_hist']:
+            signals.append("BEARISH: MACD crossed below its signal line")
+
+    if not np.isnan(v['sma_50']) and not np.isnan(v['sma_200']):
+        if v['sma_50'] > v['sma_200']:
+            signals.append("BULLISH: 50-day MA above 200-day MA (uptrend)")
+        else:
+            signals.append("BEARISH: 50-day MA below 200-day MA (downtrend)")
+    elif not np.isnan(v['sma_50']):
+        trend = "BULLISH: Price above" if close > v['sma_50'] else "BEARISH: Price below"
+        signals.append(f"{trend} 50-day MA")
+
+    if not np.isnan(v['bb_upper']) and close > v['bb_upper']:
+        signals.append("BEARISH: Price above upper Bollinger band (stretched)")
+    elif not np.isnan(v['bb_lower']) and close < v['bb_lower']:
+        signals.append("BULLISH: Price below lower Bollinger band (stretched)")
+
+    if not np.isnan(v['volume_z']) and v['volume_z'] >= 2:
+        signals.append(f"NOTE: Unusual volume ({v['volume_z']:.1f} std above 20-day average)")
+
+    return signals
+
+
+def generate_technical_documents(tickers: List[str],
+                                 panel: Dict[str, np.ndarray]) -> Dict[str, List[Dict]]:
+    """Build 'Technical Analysis' and 'Trading Signals' documents for every ticker"""
+    latest = latest_values(compute_indicators(panel))
+    now = datetime.now().isoformat()
+    documents = {}
+
+    for row, ticker in enumerate(tickers):
+        v = {name: float(values[row]) for name, values in latest.items()}
+        if np.isnan(v['close']):
+            continue
+        bars = int(v['period_bars'])
+        period_label = f"{bars}-Trading-Day" if 0 < bars < YEAR_DAYS else "1-Year"
+
+        tech_doc = f"""
+                Technical Analysis for {ticker}
+                - Current Price: ${v['close']:.2f}
+                - 1-Week Change: {_fmt(v['change_1-Week'], '{:.2f}%')}
+                - 1-Month Change: {_fmt(v['change_1-Month'], '{:.2f}%')}
+                - 3-Month Change: {_fmt(v['change_3-Month'], '{:.2f}%')}
+                - {period_label} Change: {_fmt(v['change_period'] if bars else np.nan, '{:.2f}%')}
+                - 20-Day MA: {_fmt(v['sma_20'], '${:.2f}')}
+                - 50-Day MA: {_fmt(v['sma_50'], '${:.2f}')}
+                - 200-Day MA: {_fmt(v['sma_200'], '${:.2f}')}
+                - RSI (14): {_fmt(v['rsi_14'], '{:.1f}')}
+                - MACD (12/26/9): {_fmt(v['macd'], '{:.2f}')} (signal {_fmt(v['macd_signal'], '{:.2f}')}, histogram {_fmt(v['macd_hist'], '{:.2f}')})
+                - Bollinger Bands (20, 2): {_fmt(v['bb_lower'], '${:.2f}')} - {_fmt(v['bb_upper'], '${:.2f}')}
+                - ATR (14): {_fmt(v['atr_14'], '${:.2f}')} ({_fmt(v['atr_pct'], '{:.2f}%')} of price)
+                - Volume Z-Score (20-day): {_fmt(v['volume_z'], '{:.2f}')}
+                """
+        docs = [{'type': 'Technical Analysis', 'content': tech_doc, 'date': now}]
+
+        signals = _signals(v)
+        if signals:
+            signal_lines = "\n".join(f"- {signal}" for signal in signals)
+            docs.append({
+                'type': 'Trading Signals',
+                'content': f"Trading Signals for {ticker}:\n{signal_lines}",
+                'date': now
+            })
+
+        documents[ticker] = docs
+
+    return documents
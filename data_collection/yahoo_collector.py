@@ -1,34 +1,156 @@
 import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import os
 from tqdm import tqdm
 import time
 import random
 import requests
+from config.settings import Settings
+from .rate_limiter import TokenBucket
+from .freshness import FreshnessPolicy
+from .history_store import PriceHistoryStore
+from .indicators import build_panel, generate_technical_documents
+
+ALL_SOURCES = {'info', 'history', 'financials', 'news'}
+
+# Collection sources that produced new data and need writing back to the cache
+FETCHED_SOURCES = {'api', 'refresh', 'mock'}
+
+# Data fields refreshed from `stock.info`, by freshness group
+INFO_FIELDS = {
+    'fundamentals': {
+        'market_cap': 'marketCap',
+        'pe_ratio': 'trailingPE',
+        'forward_pe': 'forwardPE',
+        'dividend_yield': 'dividendYield',
+        'beta': 'beta',
+        'target_price': 'targetMeanPrice',
+        'analyst_recommendation': 'recommendationKey'
+    },
+    'summary': {
+        'company_name': 'longName',
+        'sector': 'sector',
+        'industry': 'industry',
+        'business_summary': 'longBusinessSummary'
+    }
+}
+
+
+class YahooFetchBackend:
+    """
+    Thin wrapper around yfinance calls.
+    Swap in a stub with the same `fetch` signature to collect offline.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session
+
+    def fetch(self,
+              ticker: str,
+              parts: Optional[Set[str]] = None,
+              history_start: Optional[datetime] = None) -> Dict:
+        """
+        Fetch raw info, history, financials and news for a ticker.
+        `parts` limits the calls to a subset of those four sources and
+        `history_start` limits history to bars from that date on.
+        """
+        parts = ALL_SOURCES if parts is None else parts
+        stock = yf.Ticker(ticker, session=self.session)
+        raw = {}
+
+        # Fetch basic info to test connection
+        if 'info' in parts:
+            try:
+                raw['info'] = stock.info or {}
+            except:
+                raw['info'] = {}
+
+        # Fetch history
+        if 'history' in parts:
+            try:
+                if history_start is not None:
+                    raw['history'] = stock.history(start=history_start.strftime('%Y-%m-%d'))
+                else:
+                    raw['history'] = stock.history(period="1y")
+            except:
+                raw['history'] = pd.DataFrame()
+
+        # Fetch financials
+        if 'financials' in parts:
+            try:
+                raw['financials'] = stock.financials
+            except:
+                raw['financials'] = pd.DataFrame()
+
+        # Fetch news
+        if 'news' in parts:
+            try:
+                raw['news'] = stock.news or []
+            except:
+                raw['news'] = []
+
+        return raw
+
+    def download_history(self,
+                         tickers: List[str],
+                         start: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """Download price history for many tickers in one multi-ticker request"""
+        kwargs = {'start': start.strftime('%Y-%m-%d')} if start is not None else {'period': "1y"}
+        frame = yf.download(
+            tickers,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+            session=self.session,
+            **kwargs
+        )
+        if frame is None or frame.empty:
+            return {}
+
+        histories = {}
+        if isinstance(frame.columns, pd.MultiIndex):
+            available = set(frame.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker in available:
+                    histories[ticker] = frame[ticker].dropna(how='all')
+        elif len(tickers) == 1:
+            histories[tickers[0]] = frame.dropna(how='all')
+
+        return {ticker: hist for ticker, hist in histories.items() if not hist.empty}
+
 
 class YahooFinanceCollector:
     """
     Robust Financial Data Collector
-    1. Checks local cache first
+    1. Checks local cache first (refetching only expired field groups)
     2. Tries Yahoo Finance API with backoff
     3. Falls back to mock data if API fails
     """
     
-    def __init__(self, output_dir="data/raw"):
+    def __init__(self,
+                 output_dir="data/raw",
+                 backend: Optional[YahooFetchBackend] = None,
+                 freshness_policy: Optional[FreshnessPolicy] = None,
+                 history_store: Optional[PriceHistoryStore] = None):
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
+        self.backend = backend or YahooFetchBackend(self.session)
+        self.freshness_policy = freshness_policy or FreshnessPolicy()
+        self.history_store = history_store or PriceHistoryStore()
+        self.last_run_stats = {}
+        self._technical_documents = {}
 
-    def collect_stock_data(self, ticker: str) -> Optional[Dict]:
-        """Collect stock data with Cache -> API -> Fallback priority"""
-        
-        # 1. TRY LOCAL CACHE FIRST
+    def _load_cached(self, ticker: str) -> Optional[Dict]:
+        """Load previously collected data for a ticker, if valid"""
         local_file = os.path.join(self.output_dir, f"{ticker}_data.json")
         if os.path.exists(local_file):
             try:
@@ -40,94 +162,265 @@ class YahooFinanceCollector:
                         return data
             except Exception as e:
                 print(f"   ⚠️ Cache corrupt for {ticker}, refetching...")
+        return None
 
-        # 2. TRY YAHOO FINANCE API
-        max_retries = 3
-        base_wait = 2
+    def collect_stock_data(self, ticker: str) -> Optional[Dict]:
+        """Collect stock data with Cache -> API -> Fallback priority"""
+        data, _ = self._collect_one(ticker)
+        return data
+
+    def _collect_one(self,
+                     ticker: str,
+                     limiter: Optional[TokenBucket] = None,
+                     max_retries: int = 3,
+                     base_wait: float = 2,
+                     stats: Optional[Dict] = None,
+                     history_prefetched: bool = False):
+        """
+        Collect one ticker; returns (data, source).
+        Without a limiter each attempt is preceded by a polite sleep (serial mode);
+        with one, every backend call takes a token from the shared bucket instead.
+        With history_prefetched, price history is read from the history store
+        (filled by a bulk download) instead of being fetched per ticker.
+        """
+        if stats is None:
+            stats = {'attempts': 0, 'failures': 0, 'rate_wait_seconds': 0.0, 'error': None}
 
+        # 1. TRY LOCAL CACHE FIRST (only expired field groups get refetched)
+        cached = self._load_cached(ticker)
+        expired = self.freshness_policy.expired_groups(cached) if cached else None
+        if cached and not expired:
+            return cached, 'cache'
+
+        # 2. TRY YAHOO FINANCE API
         for attempt in range(max_retries):
+            stats['attempts'] += 1
             try:
-                time.sleep(random.uniform(1.0, 3.0)) # Polite delay
-                
-                stock = yf.Ticker(ticker, session=self.session)
-                
-                # Fetch basic info to test connection
-                try:
-                    info = stock.info
-                except:
-                    info = {}
-                
-                if not info and attempt < max_retries - 1:
-                    raise ValueError("Empty info received")
-
-                # Fetch history
-                try:
-                    hist = stock.history(period="1y")
-                except:
-                    hist = pd.DataFrame()
-
-                # Fetch financials
-                try:
-                    financials = stock.financials
-                except:
-                    financials = pd.DataFrame()
-                
-                # Fetch news
-                try:
-                    news = stock.news
-                except:
-                    news = []
-
-                # Build Data Object
-                data = {
-                    'ticker': ticker,
-                    'company_name': info.get('longName', ticker),
-                    'sector': info.get('sector', 'Technology'),
-                    'industry': info.get('industry', 'Consumer Electronics'),
-                    'market_cap': info.get('marketCap', 1000000000),
-                    'pe_ratio': info.get('trailingPE', 25.0),
-                    'forward_pe': info.get('forwardPE', 20.0),
-                    'dividend_yield': info.get('dividendYield', 0.0),
-                    'beta': info.get('beta', 1.0),
-                    '52_week_high': info.get('fiftyTwoWeekHigh', 100.0),
-                    '52_week_low': info.get('fiftyTwoWeekLow', 50.0),
-                    'current_price': info.get('currentPrice', hist['Close'].iloc[-1] if not hist.empty else 100.0),
-                    'target_price': info.get('targetMeanPrice', 110.0),
-                    'revenue': 0,
-                    'gross_profit': 0,
-                    'operating_income': 0,
-                    'business_summary': info.get('longBusinessSummary', f"Summary for {ticker}"),
-                    'recent_news': news[:5] if news else [],
-                    'analyst_recommendation': info.get('recommendationKey', 'buy'),
-                    'collected_date': datetime.now().isoformat()
-                }
+                if limiter is None:
+                    time.sleep(random.uniform(1.0, 3.0)) # Polite delay
 
-                # Safe extraction of financials
-                if not financials.empty:
-                    try:
-                        if 'Total Revenue' in financials.index:
-                            data['revenue'] = float(financials.loc['Total Revenue'].iloc[0])
-                        if 'Gross Profit' in financials.index:
-                            data['gross_profit'] = float(financials.loc['Gross Profit'].iloc[0])
-                        if 'Operating Income' in financials.index:
-                            data['operating_income'] = float(financials.loc['Operating Income'].iloc[0])
-                    except:
-                        pass
-
-                # Generate RAG Documents
-                data['documents'] = self._generate_documents(data, hist, financials)
-                
-                return data
+                if cached:
+                    return self._refresh_from_api(
+                        ticker, cached, expired, history_prefetched, limiter=limiter, stats=stats
+                    ), 'refresh'
+                return self._fetch_from_api(
+                    ticker,
+                    require_info=attempt < max_retries - 1,
+                    history_prefetched=history_prefetched,
+                    limiter=limiter,
+                    stats=stats
+                ), 'api'
 
             except Exception as e:
-                wait_time = base_wait * (2 ** attempt)
+                stats['failures'] += 1
+                stats['error'] = str(e)
                 if attempt < max_retries - 1:
-                    print(f"   ⚠️ Retry {attempt+1}/{max_retries} for {ticker} (Wait {wait_time}s)...")
+                    if limiter is None:
+                        wait_time = base_wait * (2 ** attempt)
+                        print(f"   ⚠️ Retry {attempt+1}/{max_retries} for {ticker} (Wait {wait_time}s)...")
+                    else:
+                        # Full jitter keeps retrying workers from synchronizing
+                        wait_time = random.uniform(0, base_wait * (2 ** attempt))
                     time.sleep(wait_time)
-        
+
+        # Stale data beats synthetic data
+        if cached:
+            print(f"   ⚠️ Refresh failed for {ticker}. Keeping cached data.")
+            return cached, 'stale'
+
         # 3. EMERGENCY FALLBACK (MOCK DATA)
         print(f"   ⚠️ API failed for {ticker}. Generating synthetic data.")
-        return self._get_mock_data(ticker)
+        return self._get_mock_data(ticker), 'mock'
+
+    def _fetch(self,
+               ticker: str,
+               parts: Set[str],
+               history_start: Optional[datetime] = None,
+               limiter: Optional[TokenBucket] = None,
+               stats: Optional[Dict] = None) -> Dict:
+        """backend.fetch, taking one limiter token per yfinance call it makes"""
+        if limiter is not None:
+            for _ in parts:
+                waited = limiter.acquire()
+                if stats is not None:
+                    stats['rate_wait_seconds'] += waited
+        return self.backend.fetch(ticker, parts=parts, history_start=history_start)
+
+    def _fetch_from_api(self,
+                        ticker: str,
+                        require_info: bool = True,
+                        history_prefetched: bool = False,
+                        limiter: Optional[TokenBucket] = None,
+                        stats: Optional[Dict] = None) -> Dict:
+        """Fetch a ticker through the backend and build its data object"""
+        if history_prefetched:
+            raw = self._fetch(ticker, ALL_SOURCES - {'history'}, limiter=limiter, stats=stats)
+            hist = self._stored_history(ticker)
+        else:
+            raw = self._fetch(ticker, ALL_SOURCES, self._history_start(ticker), limiter=limiter, stats=stats)
+            hist = self._update_history(ticker, raw.get('history', pd.DataFrame()))
+
+        if not raw.get('info') and require_info:
+            raise ValueError("Empty info received")
+
+        data = self._build_stock_data(
+            ticker,
+            raw.get('info') or {},
+            hist,
+            raw.get('financials', pd.DataFrame()),
+            raw.get('news') or []
+        )
+        self.freshness_policy.mark_refreshed(data, self.freshness_policy.ttls.keys())
+        return data
+
+    def _refresh_from_api(self,
+                          ticker: str,
+                          cached: Dict,
+                          groups: List[str],
+                          history_prefetched: bool = False,
+                          limiter: Optional[TokenBucket] = None,
+                          stats: Optional[Dict] = None) -> Dict:
+        """Refetch only the expired field groups of a cached ticker"""
+        sources = self.freshness_policy.sources_for(groups)
+        fetch_history = 'history' in sources and not history_prefetched
+        if history_prefetched:
+            sources = sources - {'history'}
+
+        raw = {}
+        if sources:
+            raw = self._fetch(
+                ticker,
+                sources,
+                history_start=self._history_start(ticker) if fetch_history else None,
+                limiter=limiter,
+                stats=stats
+            )
+
+        info = raw.get('info') or {}
+        hist = raw.get('history', pd.DataFrame())
+        if fetch_history:
+            hist = self._update_history(ticker, hist)
+        elif history_prefetched and 'prices' in groups:
+            hist = self._stored_history(ticker)
+        financials = raw.get('financials', pd.DataFrame())
+        news = raw.get('news') or []
+
+        data = dict(cached)
+        refreshed = []
+
+        if 'prices' in groups and not hist.empty:
+            data['current_price'] = float(hist['Close'].iloc[-1])
+            data['52_week_high'] = float(hist['High'].max())
+            data['52_week_low'] = float(hist['Low'].min())
+            refreshed.append('prices')
+
+        if 'fundamentals' in groups and info:
+            for field, key in INFO_FIELDS['fundamentals'].items():
+                data[field] = info.get(key, data.get(field))
+            self._extract_financials(data, financials)
+            refreshed.append('fundamentals')
+
+        if 'summary' in groups and info:
+            for field, key in INFO_FIELDS['summary'].items():
+                data[field] = info.get(key, data.get(field))
+            refreshed.append('summary')
+
+        if 'news' in groups and 'news' in raw:
+            data['recent_news'] = news[:5]
+            refreshed.append('news')
+
+        if not refreshed:
+            raise ValueError("No fresh data received")
+
+        # Regenerated documents replace their cached counterparts; others are kept
+        new_docs = self._generate_documents(data, hist, financials)
+        new_types = {doc['type'] for doc in new_docs}
+        data['documents'] = new_docs + [
+            doc for doc in cached.get('documents', []) if doc['type'] not in new_types
+        ]
+
+        # Groups that were not refreshed keep their own age
+        self.freshness_policy.keep_stamps(
+            data, cached, [group for group in self.freshness_policy.ttls if group not in refreshed]
+        )
+        data['collected_date'] = datetime.now().isoformat()
+        self.freshness_policy.mark_refreshed(data, refreshed)
+        return data
+
+    def _history_start(self, ticker: str) -> Optional[datetime]:
+        """Start date for an incremental history fetch, or None for a full year"""
+        last = self.history_store.last_date(ticker)
+        if last is None or datetime.now() - last.to_pydatetime() > timedelta(days=Settings.HISTORY_PERIOD_DAYS):
+            return None
+        # Refetch the last stored day too, so a partial intraday bar gets replaced
+        return last.to_pydatetime()
+
+    def _stored_history(self, ticker: str) -> pd.DataFrame:
+        """Read the history window used for documents from the store"""
+        window_start = datetime.now() - timedelta(days=Settings.HISTORY_PERIOD_DAYS)
+        return self.history_store.to_frame(ticker, start=window_start)
+
+    def _update_history(self, ticker: str, hist: pd.DataFrame) -> pd.DataFrame:
+        """Append newly fetched bars to the history store and return the full window"""
+        try:
+            self.history_store.append_frame(ticker, hist)
+            stored = self._stored_history(ticker)
+            if not stored.empty:
+                return stored
+        except Exception as e:
+            print(f"   ⚠️ History store update failed for {ticker}: {e}")
+        return hist if hist is not None else pd.DataFrame()
+
+    def _extract_financials(self, data: Dict, financials: pd.DataFrame):
+        """Safe extraction of financials"""
+        if financials is None or financials.empty:
+            return
+        try:
+            if 'Total Revenue' in financials.index:
+                data['revenue'] = float(financials.loc['Total Revenue'].iloc[0])
+            if 'Gross Profit' in financials.index:
+                data['gross_profit'] = float(financials.loc['Gross Profit'].iloc[0])
+            if 'Operating Income' in financials.index:
+                data['operating_income'] = float(financials.loc['Operating Income'].iloc[0])
+        except:
+            pass
+
+    def _build_stock_data(self,
+                          ticker: str,
+                          info: Dict,
+                          hist: pd.DataFrame,
+                          financials: pd.DataFrame,
+                          news: List) -> Dict:
+        """Build the per-ticker data object from raw API responses"""
+        data = {
+            'ticker': ticker,
+            'company_name': info.get('longName', ticker),
+            'sector': info.get('sector', 'Technology'),
+            'industry': info.get('industry', 'Consumer Electronics'),
+            'market_cap': info.get('marketCap', 1000000000),
+            'pe_ratio': info.get('trailingPE', 25.0),
+            'forward_pe': info.get('forwardPE', 20.0),
+            'dividend_yield': info.get('dividendYield', 0.0),
+            'beta': info.get('beta', 1.0),
+            '52_week_high': info.get('fiftyTwoWeekHigh', 100.0),
+            '52_week_low': info.get('fiftyTwoWeekLow', 50.0),
+            'current_price': info.get('currentPrice', hist['Close'].iloc[-1] if not hist.empty else 100.0),
+            'target_price': info.get('targetMeanPrice', 110.0),
+            'revenue': 0,
+            'gross_profit': 0,
+            'operating_income': 0,
+            'business_summary': info.get('longBusinessSummary', f"Summary for {ticker}"),
+            'recent_news': news[:5] if news else [],
+            'analyst_recommendation': info.get('recommendationKey', 'buy'),
+            'collected_date': datetime.now().isoformat()
+        }
+
+        self._extract_financials(data, financials)
+
+        # Generate RAG Documents
+        data['documents'] = self._generate_documents(data, hist, financials)
+
+        return data
 
     def _get_mock_data(self, ticker: str) -> Dict:
         """Generate plausible mock data so the app doesn't crash"""
@@ -215,42 +508,234 @@ class YahooFinanceCollector:
             'date': datetime.now().isoformat()
         })
         
-        # Technical Analysis
-        if not hist.empty:
+        # Technical Analysis + Trading Signals (precomputed for the whole panel in bulk mode)
+        ticker = data['ticker']
+        if ticker in self._technical_documents:
+            documents.extend(self._technical_documents[ticker])
+        elif not hist.empty:
             try:
-                current = hist['Close'].iloc[-1]
-                change_30 = ((current / hist['Close'].iloc[0] - 1) * 100) if len(hist) > 0 else 0
-                tech_doc = f"""
-                Technical Analysis for {data['ticker']}
-                - Current Price: ${current:.2f}
-                - 30-Day Change: {change_30:.2f}%
-                - 50-Day MA: ${hist['Close'].tail(50).mean():.2f}
-                """
-                documents.append({
-                    'type': 'Technical Analysis',
-                    'content': tech_doc,
-                    'date': datetime.now().isoformat()
-                })
-            except:
-                pass
+                tickers, panel = build_panel({ticker: hist}, bars=len(hist))
+                documents.extend(generate_technical_documents(tickers, panel).get(ticker, []))
+            except Exception as e:
+                print(f"   ⚠️ Technical analysis failed for {ticker}: {e}")
 
         return documents
 
-    def collect_multiple_tickers(self, tickers: List[str]) -> List[Dict]:
-        """Collect data for multiple tickers"""
+    def _save_ticker_data(self, ticker: str, data: Dict):
+        """Save individual ticker data"""
+        output_file = os.path.join(self.output_dir, f"{ticker}_data.json")
+        with open(output_file, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+
+    def _all_data_path(self) -> str:
+        return os.path.join(self.output_dir, "all_stocks_data.json")
+
+    def _save_all_data(self, all_data: List[Dict]):
+        """Save the combined data file used by load_data.py"""
+        with open(self._all_data_path(), 'w') as f:
+            json.dump(all_data, f, indent=2, default=str)
+
+    def collect_multiple_tickers(self,
+                                 tickers: List[str],
+                                 max_workers: int = 1,
+                                 requests_per_second: Optional[float] = None) -> List[Dict]:
+        """
+        Collect data for multiple tickers.
+        With max_workers > 1, tickers are fetched concurrently under a shared
+        rate limit instead of one at a time with polite sleeps.
+        """
+        if max_workers > 1:
+            return self.collect_multiple_tickers_concurrent(
+                tickers,
+                max_workers=max_workers,
+                requests_per_second=requests_per_second
+            )
+
         all_data = []
+        changed = False
         for ticker in tickers:
-            data = self.collect_stock_data(ticker)
+            data, source = self._collect_one(ticker)
             if data:
                 all_data.append(data)
-                # Save individual ticker data
-                output_file = os.path.join(self.output_dir, f"{ticker}_data.json")
-                with open(output_file, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
+                if source in FETCHED_SOURCES:
+                    self._save_ticker_data(ticker, data)
+                    changed = True
         
-        if all_data:
-            output_file = os.path.join(self.output_dir, "all_stocks_data.json")
-            with open(output_file, 'w') as f:
-                json.dump(all_data, f, indent=2, default=str)
+        if all_data and (changed or not os.path.exists(self._all_data_path())):
+            self._save_all_data(all_data)
         
-        return all_data
\ No newline at end of file
+        return all_data
+
+    def collect_multiple_tickers_concurrent(self,
+                                            tickers: List[str],
+                                            max_workers: Optional[int] = None,
+                                            requests_per_second: Optional[float] = None,
+                                            max_retries: int = 3,
+                                            base_wait: float = 1.0,
+                                            limiter: Optional[TokenBucket] = None,
+                                            prefetched_history: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        Collect tickers with a bounded worker pool.
+        All workers share one token bucket, so throughput is set by the allowed
+        request rate. Failed fetches back off per ticker with jittered exponential
+        waits. Per-ticker timings and failure counts end up in `last_run_stats`.
+        Tickers in `prefetched_history` skip their per-ticker history call.
+        """
+        prefetched_history = prefetched_history or set()
+        max_workers = max_workers or Settings.COLLECTOR_MAX_WORKERS
+        if limiter is None:
+            limiter = TokenBucket(
+                rate=requests_per_second or Settings.COLLECTOR_REQUESTS_PER_SECOND,
+                capacity=Settings.COLLECTOR_BURST
+            )
+
+        start = time.perf_counter()
+        results = {}
+        ticker_stats = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._collect_with_backoff, ticker, limiter, max_retries, base_wait,
+                    ticker in prefetched_history
+                ): ticker
+                for ticker in tickers
+            }
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Collecting tickers"):
+                ticker = futures[future]
+                data, stats = future.result()
+                results[ticker] = data
+                ticker_stats[ticker] = stats
+
+        # Keep the caller's ticker order in the output
+        all_data = []
+        changed = False
+        for ticker in tickers:
+            data = results.get(ticker)
+            if data:
+                all_data.append(data)
+                if ticker_stats[ticker]['source'] in FETCHED_SOURCES:
+                    self._save_ticker_data(ticker, data)
+                    changed = True
+
+        if all_data and (changed or not os.path.exists(self._all_data_path())):
+            self._save_all_data(all_data)
+
+        total_seconds = time.perf_counter() - start
+        self.last_run_stats = {
+            'tickers': ticker_stats,
+            'total_tickers': len(tickers),
+            'total_seconds': total_seconds,
+            'tickers_per_second': len(tickers) / total_seconds if total_seconds > 0 else 0.0,
+            'failed_attempts': sum(s['failures'] for s in ticker_stats.values()),
+            'fallbacks': sum(1 for s in ticker_stats.values() if s['source'] == 'mock'),
+            'cache_hits': sum(1 for s in ticker_stats.values() if s['source'] == 'cache'),
+            'refreshed': sum(1 for s in ticker_stats.values() if s['source'] == 'refresh'),
+            'rate_wait_seconds': sum(s['rate_wait_seconds'] for s in ticker_stats.values())
+        }
+
+        print(f"Collected {len(all_data)}/{len(tickers)} tickers in {total_seconds:.1f}s "
+              f"({self.last_run_stats['failed_attempts']} failed attempts, "
+              f"{self.last_run_stats['fallbacks']} fallbacks)")
+
+        return all_data
+
+    def collect_bulk(self,
+                     tickers: List[str],
+                     batch_size: Optional[int] = None,
+                     max_workers: Optional[int] = None,
+                     requests_per_second: Optional[float] = None) -> List[Dict]:
+        """
+        Collect a large ticker universe with batched history downloads.
+        Price history for every ticker that needs it comes from a few
+        multi-ticker downloads into the history store; the remaining per-ticker
+        calls (info, financials, news) are spread across the concurrent worker
+        pool, and everything is merged into the usual per-ticker data dicts.
+        """
+        batch_size = batch_size or Settings.COLLECTOR_BULK_BATCH_SIZE
+        limiter = TokenBucket(
+            rate=requests_per_second or Settings.COLLECTOR_REQUESTS_PER_SECOND,
+            capacity=Settings.COLLECTOR_BURST
+        )
+
+        # Only tickers without fresh cached prices need history
+        needs_history = []
+        for ticker in tickers:
+            cached = self._load_cached(ticker)
+            if cached is None or 'prices' in self.freshness_policy.expired_groups(cached):
+                needs_history.append(ticker)
+
+        # Incremental tickers share one download from their oldest last-stored date
+        full, incremental = [], []
+        for ticker in needs_history:
+            (incremental if self._history_start(ticker) else full).append(ticker)
+
+        prefetched = set()
+        download_start = time.perf_counter()
+        for group, start in ((full, None),
+                             (incremental, min((self._history_start(t) for t in incremental), default=None))):
+            for i in range(0, len(group), batch_size):
+                batch = group[i:i + batch_size]
+                limiter.acquire()
+                try:
+                    histories = self.backend.download_history(batch, start=start)
+                except Exception as e:
+                    print(f"   ⚠️ Bulk download failed for {len(batch)} tickers: {e}")
+                    continue
+                for ticker, hist in histories.items():
+                    try:
+                        self.history_store.append_frame(ticker, hist)
+                        prefetched.add(ticker)
+                    except Exception as e:
+                        print(f"   ⚠️ History store update failed for {ticker}: {e}")
+        download_seconds = time.perf_counter() - download_start
+
+        print(f"Bulk history: {len(prefetched)}/{len(needs_history)} tickers in {download_seconds:.1f}s")
+
+        # One vectorized indicator pass over every downloaded ticker
+        histories = {ticker: self._stored_history(ticker) for ticker in prefetched}
+        panel_tickers, panel = build_panel(histories)
+        self._technical_documents = generate_technical_documents(panel_tickers, panel)
+
+        # Tickers missing from the bulk download fall back to per-ticker history
+        try:
+            all_data = self.collect_multiple_tickers_concurrent(
+                tickers,
+                max_workers=max_workers,
+                limiter=limiter,
+                prefetched_history=prefetched
+            )
+        finally:
+            self._technical_documents = {}
+        self.last_run_stats['bulk_history_tickers'] = len(prefetched)
+        self.last_run_stats['bulk_history_seconds'] = download_seconds
+        return all_data
+
+    def _collect_with_backoff(self,
+                              ticker: str,
+                              limiter: TokenBucket,
+                              max_retries: int,
+                              base_wait: float,
+                              history_prefetched: bool = False):
+        """Worker body for concurrent collection: Cache -> rate-limited API -> Fallback"""
+        start = time.perf_counter()
+        stats = {
+            'source': 'cache',
+            'attempts': 0,
+            'failures': 0,
+            'rate_wait_seconds': 0.0,
+            'seconds': 0.0,
+            'error': None
+        }
+
+        data, stats['source'] = self._collect_one(
+            ticker,
+            limiter=limiter,
+            max_retries=max_retries,
+            base_wait=base_wait,
+            stats=stats,
+            history_prefetched=history_prefetched
+        )
+
+        stats['seconds'] = time.perf_counter() - start
+        return data, stats
@@ -2,8 +2,9 @@ from typing import List, Dict, Optional
 import json
 from datetime import datetime
 from config.settings import Settings
-from vector_db.chroma_manager import ChromaDBManager
-from vector_db.embeddings import LocalEmbeddings
+from vector_db.vector_store import create_vector_store
+from vector_db.query_batcher import get_query_batcher
+from vector_db.filters import date_range_filter
 from .prompts import PromptTemplates
 
 # Import based on configuration
@@ -25,8 +26,11 @@ class TradingAssistant:
             print(f"Using Groq with model: {Settings.LLM_MODEL}")
         
         # Initialize other components
-        self.chroma_manager = ChromaDBManager()
-        self.embedding_generator = LocalEmbeddings()
+        # Vector store backend comes from Settings.VECTOR_STORE_BACKEND (attribute name kept for the UI)
+        self.chroma_manager = create_vector_store()
+        # One embedding model per process; concurrent sessions' queries are micro-batched
+        self.query_batcher = get_query_batcher()
+        self.embedding_generator = self.query_batcher.embedder
         self.prompt_templates = PromptTemplates()
     
     def get_response(self,
@@ -41,7 +45,7 @@ class TradingAssistant:
         try:
             # Step 1: Generate query embedding
             print("Generating query embedding...")
-            query_embedding = self.embedding_generator.generate_embedding(query)
+            query_embedding = self.query_batcher.embed(query)
             
             # Step 2: Build search filters
             filters = {}
@@ -49,13 +53,17 @@ class TradingAssistant:
                 filters['tickers'] = tickers
             if doc_types:
                 filters['doc_types'] = doc_types
+            if date_range and any(bound is not None for bound in date_range):
+                # Pushed down to the store: out-of-range chunks never reach the prompt
+                filters['ranges'] = {'date_ts': date_range_filter(date_range)}
             
-            # Step 3: Search for relevant documents
+            # Step 3: Search for relevant documents (re-ranked by recency if RECENCY_HALF_LIFE_DAYS is set)
             print("Searching for relevant documents...")
-            retrieved_docs = self.chroma_manager.search(
+            retrieved_docs = self.chroma_manager.search_recent(
                 query_embedding=query_embedding,
                 filters=filters,
-                top_k=top_k
+                top_k=top_k,
+                query_text=query
             )
             
             # Step 4: Prepare context
@@ -146,11 +154,16 @@ Content: {doc.get('text', 'No content')}
         for doc in docs:
             metadata = doc.get('metadata', {})
             
+            # Hybrid hits rank by rank-fusion score; relevance is the vector similarity
+            # (None for chunks only the keyword arm found)
+            hybrid = 'vector_score' in doc
+            
             source = {
                 'ticker': metadata.get('ticker', 'Unknown'),
                 'type': metadata.get('document_type', 'Unknown'),
                 'date': metadata.get('date', 'Unknown'),
-                'relevance_score': doc.get('score', 0),
+                'relevance_score': doc['vector_score'] if hybrid else doc.get('score', 0),
+                'fusion_score': doc.get('score') if hybrid else None,
                 'snippet': doc.get('text', '')[:200] + '...'
             }
             
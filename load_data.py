@@ -16,19 +16,46 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config.settings import Settings
 from data_collection.yahoo_collector import YahooFinanceCollector
-from data_collection.data_preprocessor import DocumentPreprocessor
-from vector_db.chroma_manager import ChromaDBManager
+from data_collection.data_preprocessor import DocumentPreprocessor, batched, iter_raw_stock_files
+from vector_db.vector_store import create_vector_store
 from vector_db.embeddings import LocalEmbeddings
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load financial data into the vector database")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Concurrent collection workers when fetching from Yahoo Finance")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Batch price history downloads across tickers (large universes)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream stocks -> chunks (JSONL) -> embeddings without holding the corpus in memory")
+    parser.add_argument("--preprocess-workers", type=int, default=1,
+                        help="Processes used for cleaning and chunking")
+    parser.add_argument("--embed-workers", type=int, default=None,
+                        help="Embedding worker processes, each with its own model copy (bulk ingestion)")
+    parser.add_argument("--tickers", nargs='+', default=None,
+                        help="Only (re-)ingest these tickers; other tickers' chunks are left untouched")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Build a fresh versioned collection and swap it in once validated")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Point the collection alias back at the previous version and exit")
+    parser.add_argument("--chunk-mode", choices=["words", "tokens"], default=None,
+                        help="'tokens' sizes chunks to the embedding model's max sequence length")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
     print("="*60)
     print("🚀 Financial RAG Data Loading Script (Local Priority)")
     print("="*60)
     
     # Initialize components
-    chroma_manager = ChromaDBManager()
-    preprocessor = DocumentPreprocessor()
-    embedder = LocalEmbeddings()
+    vector_store = create_vector_store()
+    if args.rollback:
+        vector_store.rollback()
+        return
+    preprocessor = DocumentPreprocessor(chunk_mode=args.chunk_mode)
+    embedder = LocalEmbeddings(workers=args.embed_workers)
     collector = YahooFinanceCollector()
 
     # Step 1: Get Data (Local Priority)
@@ -37,8 +64,13 @@ def main():
     
     local_file = os.path.join("data", "raw", "all_stocks_data.json")
     
+    # STREAMING: read per-ticker files one at a time instead of the combined file
+    if args.stream and any(True for _ in iter_raw_stock_files()):
+        print(f"   📂 Streaming per-ticker files from {Settings.RAW_DATA_DIR}")
+        stocks_data = iter_raw_stock_files()
+
     # OPTION A: Load from existing local file (Bypasses API)
-    if os.path.exists(local_file):
+    elif os.path.exists(local_file):
         print(f"   📂 Found local file: {local_file}")
         try:
             with open(local_file, 'r') as f:
@@ -51,41 +83,97 @@ def main():
     if not stocks_data:
         print("   ⚠️ Local file not found or empty. Fetching from Yahoo Finance...")
         tickers = Settings.DEFAULT_TICKERS
-        stocks_data = collector.collect_multiple_tickers(tickers)
+        if args.bulk:
+            stocks_data = collector.collect_bulk(tickers, max_workers=args.workers if args.workers > 1 else None)
+        else:
+            stocks_data = collector.collect_multiple_tickers(tickers, max_workers=args.workers)
 
     if not stocks_data:
         print("❌ No data available to process. Exiting.")
         return
 
+    if args.tickers:
+        wanted = {ticker.upper() for ticker in args.tickers}
+        if isinstance(stocks_data, list):
+            stocks_data = [stock for stock in stocks_data if stock.get('ticker') in wanted]
+        else:
+            stocks_data = (stock for stock in stocks_data if stock.get('ticker') in wanted)
+
+    # Batch process to be safe (large enough for length bucketing to group similar chunks)
+    batch_size = 512
+    if embedder.pool is not None:
+        # Enough texts per call to keep every embedding worker busy
+        batch_size = max(batch_size, embedder.pool.shard_size * embedder.pool.workers * 2)
+
     # Step 2: Process Documents
-    print("\n📝 Step 2: Processing and Chunking...")
-    processed_chunks = preprocessor.process_all_stocks(stocks_data)
-    print(f"   ✅ Created {len(processed_chunks)} document chunks")
+    if args.stream:
+        # Chunks flow straight into embedding as they are produced (and land in JSONL)
+        print("\n📝 Step 2+3: Streaming chunks into embeddings...")
+        batches = batched(preprocessor.stream_to_jsonl(stocks_data, workers=args.preprocess_workers), batch_size)
+    else:
+        print("\n📝 Step 2: Processing and Chunking...")
+        processed_chunks = preprocessor.process_all_stocks(stocks_data, workers=args.preprocess_workers)
+        print(f"   ✅ Created {len(processed_chunks)} document chunks "
+              f"({preprocessor.last_run_stats['docs_per_second']:.1f} docs/s, "
+              f"{preprocessor.last_run_stats['mb_per_second']:.2f} MB/s)")
+        batches = batched(processed_chunks, batch_size)
 
-    # Step 3: Embed and Store
-    print("\n🧠 Step 3: Generating Embeddings & Storing...")
+        # Step 3: Embed and Store
+        print("\n🧠 Step 3: Generating Embeddings & Storing...")
     
-    # Clear old data to prevent duplicates/conflicts
-    chroma_manager.reset_collection()
+    # Deterministic IDs make re-runs idempotent: unchanged chunks are overwritten in place.
+    # A full rebuild goes into a shadow collection; the live one keeps serving queries meanwhile.
+    if args.full_rebuild:
+        vector_store.begin_rebuild()
     
-    # Batch process to be safe
-    batch_size = 32
     total_added = 0
+    ids_by_ticker = {}
+    failed_tickers = set()
     
-    for i in tqdm(range(0, len(processed_chunks), batch_size), desc="Embedding"):
-        batch = processed_chunks[i : i + batch_size]
+    for i, batch in enumerate(tqdm(batches, desc="Embedding")):
         texts = [chunk['text'] for chunk in batch]
+        for chunk in batch:
+            ids_by_ticker.setdefault(chunk['ticker'], set()).add(vector_store.document_id(chunk))
         
         try:
             embeddings = embedder.generate_embeddings_batch(texts)
-            result = chroma_manager.add_documents(batch, embeddings)
+            result = vector_store.upsert_documents(batch, embeddings)
             total_added += result.get('successful', 0)
+            if result.get('failed'):
+                failed_tickers.update(chunk['ticker'] for chunk in batch)
         except Exception as e:
-            print(f"   ❌ Error in batch {i}: {e}")
+            print(f"   ❌ Error in batch {i * batch_size}: {e}")
+            failed_tickers.update(chunk['ticker'] for chunk in batch)
+    
+    embedder.close()
+
+    # Drop chunks these tickers no longer produce (skip tickers whose writes failed)
+    total_deleted = 0
+    if not args.full_rebuild:
+        for ticker, keep_ids in ids_by_ticker.items():
+            if ticker not in failed_tickers:
+                total_deleted += vector_store.delete_stale(ticker, keep_ids)
+    else:
+        report = vector_store.validate_collection(vector_store.collection_name)
+        if report['ok'] and not failed_tickers:
+            vector_store.swap()
+            pruned = vector_store.prune()
+            if pruned:
+                print(f"   🧹 Removed old versions: {', '.join(pruned)}")
+        else:
+            reasons = report['errors'] + ([f"{len(failed_tickers)} tickers failed to write"] if failed_tickers else [])
+            print(f"   ❌ Rebuild failed validation ({'; '.join(reasons)}); live collection unchanged")
+            vector_store.abort_rebuild()
+            return
 
     print("\n" + "="*60)
     print("🎉 Success! Database is ready.")
     print(f"   Total Documents: {total_added}")
+    print(f"   Stale chunks removed: {total_deleted}")
+    if embedder.cache is not None:
+        cache_stats = embedder.cache.get_stats()
+        print(f"   Embedding cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+              f"({cache_stats['hit_rate']:.0%})")
     print("="*60)
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
 import sys
 import time
@@ -460,6 +460,17 @@ with st.sidebar:
         help="Select data sources to search"
     )
     
+    time_windows = {"Any time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365}
+    time_window = st.selectbox(
+        "Time Window",
+        list(time_windows),
+        help="Only search documents dated within this window"
+    )
+    date_range = None
+    if time_windows[time_window]:
+        # Whole days, so the bound (and the search cache key) stays the same all day
+        date_range = (date.today() - timedelta(days=time_windows[time_window]), None)
+    
     # Analysis Configuration
     st.markdown("### 🎯 Analysis Settings")
     
@@ -505,7 +516,14 @@ with st.sidebar:
                 <div class="metric-label">Companies</div>
             </div>
             """, unsafe_allow_html=True)
-    
+
+        # Shared across sessions: use to tune QUERY_BATCH_MAX_WAIT_MS
+        if Settings.DEBUG:
+            with st.expander("⚡ Query Embedding Batching"):
+                st.json(st.session_state.trading_assistant.query_batcher.get_stats())
+            with st.expander("🗄️ Search Result Cache"):
+                st.json(stats.get('result_cache', {}))
+
     # Model Info
     st.markdown("---")
     st.markdown("### 🤖 AI Model")
@@ -582,6 +600,7 @@ with tab1:
                     query=query,
                     tickers=selected_tickers,
                     doc_types=doc_types,
+                    date_range=date_range,
                     mode=analysis_mode,
                     top_k=retrieval_k
                 )
@@ -647,10 +666,16 @@ with tab1:
                         if content.get('sources'):
                             with st.expander("📚 View Sources"):
                                 for source in content['sources']:
+                                    if source.get('relevance_score') is not None:
+                                        relevance = f"Relevance: {source['relevance_score']:.1%}"
+                                    elif source.get('fusion_score') is not None:
+                                        relevance = f"Keyword match (rank-fusion score {source['fusion_score']:.2f})"
+                                    else:
+                                        relevance = ""
                                     st.markdown(f"""
                                     <div class="source-card">
                                         <strong>{source['ticker']}</strong> • {source['type']}<br/>
-                                        <small style="color: #a0a0a0;">Relevance: {source['relevance_score']:.1%}</small><br/>
+                                        <small style="color: #a0a0a0;">{relevance}</small><br/>
                                         <small>{source['snippet']}</small>
                                     </div>
                                     """, unsafe_allow_html=True)
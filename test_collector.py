@@ -0,0 +1,123 @@
+"""
+Offline tests for concurrent collection, driven by a stubbed fetch backend.
+Run with: python -m pytest test_collector.py
+"""
+
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from data_collection import yahoo_collector
+from data_collection.history_store import PriceHistoryStore
+from data_collection.rate_limiter import TokenBucket
+from data_collection.yahoo_collector import YahooFinanceCollector
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+class StubBackend:
+    """Same `fetch` signature as YahooFetchBackend; counts the yfinance calls it stands in for"""
+
+    def __init__(self, rate_limited=()):
+        self.calls = 0
+        self.rate_limited = set(rate_limited)  # tickers whose first fetch is rejected
+        self._lock = threading.Lock()
+
+    def fetch(self, ticker, parts=None, history_start=None):
+        parts = yahoo_collector.ALL_SOURCES if parts is None else parts
+        with self._lock:
+            self.calls += len(parts)
+            if ticker in self.rate_limited:
+                self.rate_limited.discard(ticker)
+                raise Exception("Too Many Requests. Rate limited. Try after a while.")
+
+        raw = {}
+        if 'info' in parts:
+            raw['info'] = {'longName': f"{ticker} Inc.", 'sector': 'Technology', 'marketCap': 10 ** 9 * len(ticker)}
+        if 'history' in parts:
+            index = pd.date_range(end=pd.Timestamp(datetime.now().date()), periods=60)
+            close = pd.Series(range(100, 160), index=index, dtype=float)
+            raw['history'] = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                                           'Close': close, 'Volume': 1000.0})
+        if 'financials' in parts:
+            raw['financials'] = pd.DataFrame()
+        if 'news' in parts:
+            raw['news'] = [{'title': f"{ticker} news"}]
+        return raw
+
+
+class CountingBucket(TokenBucket):
+    """Token bucket that never waits and counts the tokens taken"""
+
+    def __init__(self):
+        super().__init__(rate=1000)
+        self.taken = 0
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self.taken += tokens
+        return 0.0
+
+
+def _collector(tmp_path, name, backend):
+    return YahooFinanceCollector(
+        output_dir=str(tmp_path / name / "raw"),
+        backend=backend,
+        history_store=PriceHistoryStore(str(tmp_path / name / "history"))
+    )
+
+
+def _stable(data):
+    """Collected data without the timestamps that differ between runs"""
+    data = {key: value for key, value in data.items() if key not in ('collected_date', 'refreshed')}
+    data['documents'] = [{key: value for key, value in doc.items() if key != 'date'} for doc in data['documents']]
+    return data
+
+
+def _no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(yahoo_collector.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_one_token_per_yfinance_call(tmp_path, monkeypatch):
+    _no_sleep(monkeypatch)
+    backend = StubBackend()
+    limiter = CountingBucket()
+    collector = _collector(tmp_path, "run", backend)
+
+    collector.collect_multiple_tickers_concurrent(TICKERS, max_workers=2, limiter=limiter)
+
+    assert backend.calls == 4 * len(TICKERS)
+    assert limiter.taken == backend.calls
+
+
+def test_backoff_retries_rate_limit_error(tmp_path, monkeypatch):
+    sleeps = _no_sleep(monkeypatch)
+    backend = StubBackend(rate_limited=["BBB"])
+    limiter = CountingBucket()
+    collector = _collector(tmp_path, "run", backend)
+
+    all_data = collector.collect_multiple_tickers_concurrent(TICKERS, max_workers=2, limiter=limiter, base_wait=1.0)
+
+    stats = collector.last_run_stats['tickers']['BBB']
+    assert stats['attempts'] == 2
+    assert stats['failures'] == 1
+    assert stats['source'] == 'api'
+    assert "Rate limited" in stats['error']
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= 1.0
+    assert [data['ticker'] for data in all_data] == TICKERS
+    # The rejected attempt spent its tokens too
+    assert limiter.taken == backend.calls == 4 * (len(TICKERS) + 1)
+
+
+def test_serial_and_concurrent_results_match(tmp_path, monkeypatch):
+    _no_sleep(monkeypatch)
+    serial = _collector(tmp_path, "serial", StubBackend()).collect_multiple_tickers(TICKERS)
+    concurrent = _collector(tmp_path, "concurrent", StubBackend()).collect_multiple_tickers_concurrent(
+        TICKERS, max_workers=3, limiter=CountingBucket()
+    )
+
+    assert [data['ticker'] for data in serial] == TICKERS
+    assert [_stable(data) for data in serial] == [_stable(data) for data in concurrent]
@@ -1,4 +1,9 @@
+from .vector_store import VectorStore, create_vector_store
 from .chroma_manager import ChromaDBManager
+from .numpy_store import NumpyVectorStore
 from .embeddings import LocalEmbeddings
+from .embedding_cache import EmbeddingCache
+from .query_batcher import QueryBatcher, get_query_batcher
+from .result_cache import SearchResultCache, get_result_cache
 
-__all__ = ['ChromaDBManager', 'LocalEmbeddings']
\ No newline at end of file
+__all__ = ['VectorStore', 'create_vector_store', 'ChromaDBManager', 'NumpyVectorStore', 'LocalEmbeddings', 'EmbeddingCache', 'QueryBatcher', 'get_query_batcher', 'SearchResultCache', 'get_result_cache']
\ No newline at end of file
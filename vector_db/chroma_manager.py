@@ -1,12 +1,33 @@
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Optional
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterable, Optional, Set, Union
+import json
+import os
+import re
+import zlib
+import numpy as np
 from tqdm import tqdm
 from config.settings import Settings
+from .vector_store import VectorStore
+from .filters import build_chroma_where, filter_key
+from .lexical_index import LexicalIndex
 
-class ChromaDBManager:
-    """Manager for ChromaDB vector database (FREE)"""
+# Shard collections are named "<version>__<shard>"
+SHARD_SEPARATOR = "__"
+SHARDING_MODES = ('none', 'sector', 'ticker')
+
+# Fan-out of one query to several shards
+_shard_pool = ThreadPoolExecutor(max_workers=Settings.CHROMA_SHARD_SEARCH_THREADS, thread_name_prefix="chroma-shard")
+
+class ChromaDBManager(VectorStore):
+    """
+    Manager for ChromaDB vector database (FREE)
+    With CHROMA_SHARDING = 'sector' or 'ticker' (hash), a version is split into
+    shard collections, and a shard map (<version>.shards.json) records which
+    tickers and sectors each shard holds. Searches only query the shards their
+    filters can match; the rest fan out in parallel and the top-k are merged.
+    """
     
     def __init__(self):
         # Initialize ChromaDB client with persistence
@@ -18,91 +39,226 @@ class ChromaDBManager:
             )
         )
         
-        # Get or create collection
-        self.collection_name = Settings.CHROMA_COLLECTION_NAME
+        # The configured name is an alias; the live collection is whatever version it points to
+        self.collection_name = self._init_alias(Settings.CHROMA_PERSIST_DIR, Settings.CHROMA_COLLECTION_NAME)
+        self._init_result_cache(Settings.CHROMA_PERSIST_DIR)
         self.setup_collection()
     
     def setup_collection(self):
-        """Setup ChromaDB collection"""
+        """Setup ChromaDB collection (or the version's shard collections)"""
         try:
-            # Get or create collection
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"description": "Financial documents for RAG"}
-            )
+            shard_map = self._read_shard_map(self.collection_name)
+            self.sharding = shard_map['mode']
+            self.shard_map = shard_map['shards']
+            self._shard_map_mtime = self._shard_map_stamp()
             
-            print(f"Collection '{self.collection_name}' ready")
-            print(f"Current document count: {self.collection.count()}")
+            if self.sharding == 'none':
+                # Get or create collection
+                self.collection = self.client.get_or_create_collection(
+                    name=self.collection_name,
+                    metadata=self._collection_metadata()
+                )
+                self.shards = {'': self.collection}
+            else:
+                self.collection = None
+                self.shards = {key: self._get_shard(key) for key in self.shard_map}
+            for collection in self.shards.values():
+                self._apply_search_ef(collection)
+            self._alias_mtime = self._alias_stamp()
+            self._open_lexical(self.collection_name)
             
+            if self.sharding != Settings.CHROMA_SHARDING:
+                print(f"Collection '{self.collection_name}' uses sharding '{self.sharding}' "
+                      f"(CHROMA_SHARDING='{Settings.CHROMA_SHARDING}' applies from the next --full-rebuild)")
+            print(f"Collection '{self.collection_name}' ready ({len(self.shards)} shard(s))")
+            print(f"Current document count: {self._count()}")
+        
         except Exception as e:
             print(f"Error setting up ChromaDB collection: {e}")
             raise
     
-    def add_documents(self, 
-                     documents: List[Dict], 
-                     embeddings: List[List[float]],
-                     batch_size: int = 100) -> Dict:
-        """Add documents with embeddings to ChromaDB"""
-        
+    @staticmethod
+    def _collection_metadata(**extra) -> Dict:
+        """Collection metadata, including HNSW parameters (fixed at creation except search_ef)"""
+        return {
+            "description": "Financial documents for RAG",
+            "hnsw:space": Settings.HNSW_SPACE,
+            "hnsw:construction_ef": Settings.HNSW_CONSTRUCTION_EF,
+            "hnsw:search_ef": Settings.HNSW_SEARCH_EF,
+            "hnsw:M": Settings.HNSW_M,
+            **extra
+        }
+    
+    @staticmethod
+    def _hnsw_config(collection) -> Dict:
+        try:
+            return dict((collection.configuration or {}).get('hnsw') or {})
+        except Exception:
+            return {}
+    
+    def _apply_search_ef(self, collection):
+        """
+        search_ef only affects queries, so existing collections follow Settings.HNSW_SEARCH_EF
+        (picked up by processes that load the index afterwards)
+        """
+        ef_search = self._hnsw_config(collection).get('ef_search')
+        if ef_search is None or ef_search == Settings.HNSW_SEARCH_EF:
+            return
+        try:
+            collection.modify(configuration={'hnsw': {'ef_search': Settings.HNSW_SEARCH_EF}})
+        except Exception as e:
+            print(f"Could not update search_ef of '{collection.name}': {e}")
+    
+    # --- Shards -------------------------------------------------------------
+    
+    def _shard_map_path(self, name: str) -> str:
+        return os.path.join(self.persist_dir, f"{name}.shards.json")
+    
+    def _shard_map_stamp(self) -> Optional[int]:
+        try:
+            return os.stat(self._shard_map_path(self.collection_name)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _read_shard_map(self, name: str) -> Dict:
+        """Sharding mode and shards of a version; versions without a map are unsharded if the collection exists"""
+        try:
+            with open(self._shard_map_path(name), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        try:
+            self.client.get_collection(name=name)
+            mode = 'none'
+        except Exception:
+            mode = Settings.CHROMA_SHARDING
+        if mode not in SHARDING_MODES:
+            raise ValueError(f"Unknown CHROMA_SHARDING mode: {mode}")
+        return {'mode': mode, 'shards': {}}
+    
+    def _write_shard_map(self):
+        path = self._shard_map_path(self.collection_name)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump({'mode': self.sharding, 'shards': self.shard_map}, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        self._shard_map_mtime = self._shard_map_stamp()
+    
+    def _version_collections(self, name: str) -> List[str]:
+        shard_map = self._read_shard_map(name)
+        if shard_map['mode'] == 'none':
+            return [name]
+        return [f"{name}{SHARD_SEPARATOR}{key}" for key in shard_map['shards']]
+    
+    def _shard_key(self, metadata: Dict) -> str:
+        if self.sharding == 'sector':
+            return re.sub(r'[^a-z0-9]+', '-', metadata['sector'].lower()).strip('-') or 'unknown'
+        if self.sharding == 'ticker':
+            return f"t{zlib.crc32(metadata['ticker'].encode('utf-8')) % Settings.CHROMA_SHARD_COUNT:03d}"
+        return ''
+    
+    def _get_shard(self, key: str):
+        return self.client.get_or_create_collection(
+            name=f"{self.collection_name}{SHARD_SEPARATOR}{key}",
+            metadata=self._collection_metadata(shard=key)
+        )
+    
+    def _route(self, filters: Optional[Dict]) -> List[str]:
+        """Shards that can hold chunks matching the ticker / sector filters"""
+        if self.sharding == 'none':
+            return ['']
+        tickers = set((filters or {}).get('tickers') or [])
+        sectors = set((filters or {}).get('sectors') or [])
+        return [key for key, held in self.shard_map.items()
+                if (not tickers or tickers & set(held['tickers'])) and (not sectors or sectors & set(held['sectors']))]
+    
+    def _shard_filters(self, key: str, filters: Optional[Dict]) -> Optional[Dict]:
+        """Drop ticker / sector conditions that every chunk in the shard already satisfies"""
+        if self.sharding == 'none' or not filters:
+            return filters
+        held = self.shard_map[key]
+        pruned = dict(filters)
+        for filter_name, field in (('tickers', 'tickers'), ('sectors', 'sectors')):
+            if pruned.get(filter_name) and set(held[field]) <= set(pruned[filter_name]):
+                del pruned[filter_name]
+        return pruned
+    
+    def _sync(self):
+        """Follow alias swaps and shards added or dropped by other processes"""
+        self._sync_alias()
+        if self.sharding != 'none' and self._shard_map_stamp() != self._shard_map_mtime:
+            self.shard_map = self._read_shard_map(self.collection_name)['shards']
+            for key in self.shard_map:
+                if key not in self.shards:
+                    self.shards[key] = self._get_shard(key)
+            for key in set(self.shards) - set(self.shard_map):
+                del self.shards[key]
+            self._shard_map_mtime = self._shard_map_stamp()
+    
+    def _count(self) -> int:
+        return sum(collection.count() for collection in self.shards.values())
+    
+    # --- Writes -------------------------------------------------------------
+    
+    def _write_documents(self,
+                         documents: List[Dict],
+                         embeddings: Union[np.ndarray, List[List[float]]],
+                         batch_size: int,
+                         upsert: bool) -> Dict:
         if len(documents) != len(embeddings):
             raise ValueError("Number of documents must match number of embeddings")
         
+        # One contiguous matrix; batches below are row slices of it, not copies
+        embeddings = np.asarray(embeddings)
+        if embeddings.dtype not in (np.float32, np.float16):
+            embeddings = embeddings.astype(np.float32)
+        
         successful = 0
         failed = 0
         
         # Process in batches
         for i in tqdm(range(0, len(documents), batch_size), desc="Adding to ChromaDB"):
             batch_docs = documents[i:i+batch_size]
-            batch_embeddings = embeddings[i:i+batch_size]
-            
-            # Prepare data for ChromaDB
-            ids = []
-            texts = []
-            metadatas = []
-            embeddings_list = []
+            # ChromaDB stores float32; half-precision input is widened one batch at a time
+            batch_embeddings = embeddings[i:i+batch_size].astype(np.float32, copy=False)
+            batch_metadatas = [self._build_metadata(doc) for doc in batch_docs]
             
+            # Prepare data for ChromaDB (identical chunks share an ID; keep the first), grouped by shard
+            shards = {}
             for j, doc in enumerate(batch_docs):
-                # Generate unique ID
-                doc_id = str(uuid.uuid4())
-                
-                # Extract text and metadata
-                text = doc.get('text', '')
-                
-                # Prepare metadata (ChromaDB requires all values to be strings, ints, floats, or bools)
-                # We ensure all values are simple types to avoid ChromaDB errors
-                metadata = {
-                    'ticker': str(doc.get('ticker', 'UNKNOWN')),
-                    'company_name': str(doc.get('company_name', '')),
-                    'document_type': str(doc.get('type', '')),
-                    'date': str(doc.get('date', '')),
-                    'chunk_id': str(doc.get('chunk_id', 0)),
-                    'sector': str(doc.get('metadata', {}).get('sector', '')),
-                    'industry': str(doc.get('metadata', {}).get('industry', '')),
-                    # Convert stats to string to ensure compatibility
-                    'market_cap': str(doc.get('metadata', {}).get('market_cap', 0)),
-                    'pe_ratio': str(doc.get('metadata', {}).get('pe_ratio', 0))
-                }
-                
-                ids.append(doc_id)
-                texts.append(text)
-                metadatas.append(metadata)
-                embeddings_list.append(batch_embeddings[j])
+                shards.setdefault(self._shard_key(batch_metadatas[j]), {}).setdefault(self.document_id(doc), j)
+            moved = self._claim_ids(shards, batch_metadatas, upsert)
+            self._register_shards(shards, batch_metadatas)
             
-            try:
-                # Add to collection
-                self.collection.add(
-                    ids=ids,
-                    documents=texts,
-                    metadatas=metadatas,
-                    embeddings=embeddings_list
-                )
-                successful += len(batch_docs)
+            for key, rows in shards.items():
+                if not rows:
+                    continue
+                collection = self.shards[key]
+                write = collection.upsert if upsert else collection.add
+                try:
+                    write(
+                        ids=list(rows),
+                        documents=[batch_docs[j].get('text', '') for j in rows.values()],
+                        metadatas=[batch_metadatas[j] for j in rows.values()],
+                        embeddings=batch_embeddings[list(rows.values())]
+                    )
+                    successful += len(rows)
                 
-            except Exception as e:
-                print(f"Error in batch {i//batch_size}: {e}")
-                failed += len(batch_docs)
+                except Exception as e:
+                    print(f"Error in batch {i//batch_size}{f' (shard {key})' if key else ''}: {e}")
+                    failed += len(rows)
+            # Old copies go once the new ones are written (readers dedupe by ID meanwhile)
+            for key, ids in moved.items():
+                try:
+                    self.shards[key].delete(ids=ids)
+                except Exception as e:
+                    print(f"Error removing moved chunks from shard {key}: {e}")
+            if moved:
+                self._release_shards({key: {batch_metadatas[j]['ticker'] for rows in shards.values()
+                                            for j in rows.values()} for key in moved})
+            # Duplicates within the batch (and existing IDs skipped by add) count as written
+            successful += len(batch_docs) - sum(len(rows) for rows in shards.values())
         
-        print(f"Added {successful} documents to ChromaDB")
+        print(f"{'Upserted' if upsert else 'Added'} {successful} documents to ChromaDB")
         
         return {
             'successful': successful,
@@ -110,68 +266,271 @@ class ChromaDBManager:
             'total': len(documents)
         }
     
-    def search(self, 
-              query_embedding: List[float], 
-              filters: Dict = None,
-              top_k: int = 5) -> List[Dict]:
+    def _claim_ids(self, shards: Dict[str, Dict[str, int]], metadatas: List[Dict], upsert: bool) -> Dict[str, List[str]]:
+        """
+        Chunk IDs do not change when a ticker moves shard (e.g. a new sector), so look for
+        them in the other shards holding the ticker. add leaves such chunks where they are
+        (dropped from shards); for upsert, returns {shard: ids} whose old copies to delete.
+        """
+        moved = {}
+        if self.sharding == 'none':
+            return moved
+        for key, rows in shards.items():
+            tickers = {metadatas[j]['ticker'] for j in rows.values()}
+            for other, held in self.shard_map.items():
+                if other == key or other not in self.shards or not tickers & set(held['tickers']):
+                    continue
+                existing = self.shards[other].get(ids=list(rows), include=[])['ids']
+                if not existing:
+                    continue
+                if upsert:
+                    moved.setdefault(other, []).extend(existing)
+                else:
+                    for doc_id in existing:
+                        rows.pop(doc_id, None)
+        return moved
+    
+    def _register_shards(self, shards: Dict[str, Dict[str, int]], metadatas: List[Dict]):
+        """Create new shard collections and record the tickers / sectors each shard receives"""
+        if self.sharding == 'none':
+            return
+        changed = False
+        for key, rows in shards.items():
+            if key not in self.shards:
+                self.shards[key] = self._get_shard(key)
+            held = self.shard_map.setdefault(key, {'tickers': [], 'sectors': []})
+            for j in rows.values():
+                for field, values in (('ticker', held['tickers']), ('sector', held['sectors'])):
+                    if metadatas[j][field] not in values:
+                        values.append(metadatas[j][field])
+                        changed = True
+        # Written before the chunks, so readers route to a shard as soon as it has data
+        if changed:
+            self._write_shard_map()
+    
+    def _release_shards(self, left: Dict[str, Set[str]]):
+        """
+        Update the shard map after chunks left shards ({shard: tickers}): tickers with no
+        chunks left are unlisted, and shards left empty are dropped so routing skips them
+        """
+        if self.sharding == 'none':
+            return
+        changed = False
+        emptied = []
+        for key, tickers in left.items():
+            held = self.shard_map.get(key)
+            if held is None:
+                continue
+            collection = self.shards[key]
+            if collection.count() == 0:
+                del self.shard_map[key]
+                emptied.append(key)
+                changed = True
+                continue
+            for ticker in tickers & set(held['tickers']):
+                if not collection.get(where={'ticker': ticker}, limit=1, include=[])['ids']:
+                    held['tickers'].remove(ticker)
+                    changed = True
+        if changed:
+            self._write_shard_map()
+        # Collections go after the map no longer routes to them
+        for key in emptied:
+            try:
+                self.client.delete_collection(name=self.shards.pop(key).name)
+            except Exception as e:
+                print(f"Error dropping empty shard {key}: {e}")
+    
+    def delete_stale(self, ticker: str, keep_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """Delete a ticker's chunks whose IDs are not in keep_ids (i.e. no longer produced)"""
+        keep_ids = set(keep_ids)
+        try:
+            stale = []
+            left = {}
+            for key in self._route({'tickers': [ticker]}):
+                collection = self.shards[key]
+                existing = collection.get(where={'ticker': ticker}, include=[])['ids']
+                shard_stale = [doc_id for doc_id in existing if doc_id not in keep_ids]
+                for i in range(0, len(shard_stale), batch_size):
+                    collection.delete(ids=shard_stale[i:i+batch_size])
+                stale.extend(shard_stale)
+                if shard_stale:
+                    left[key] = {ticker}
+            if left:
+                self._release_shards(left)
+            if stale:
+                self._on_deleted(stale)
+            return len(stale)
+        except Exception as e:
+            print(f"Error deleting stale chunks for {ticker}: {e}")
+            return 0
+    
+    # --- Versions -----------------------------------------------------------
+    
+    def _open_version(self, name: str):
+        self.collection_name = name
+        self.setup_collection()
+    
+    def _create_version(self, name: str):
+        if Settings.CHROMA_SHARDING == 'none':
+            self.client.create_collection(
+                name=name,
+                metadata=self._collection_metadata()
+            )
+        self.collection_name = name
+        self.setup_collection()
+    
+    def _drop_version(self, name: str):
+        for collection_name in self._version_collections(name):
+            self.client.delete_collection(name=collection_name)
+        if os.path.exists(self._shard_map_path(name)):
+            os.remove(self._shard_map_path(name))
+        LexicalIndex.drop(self._lexical_path(name))
+    
+    def _version_count(self, name: str) -> int:
+        return sum(self.client.get_collection(name=collection_name).count()
+                   for collection_name in self._version_collections(name))
+    
+    def _probe_version(self, name: str) -> bool:
+        for collection_name in self._version_collections(name):
+            collection = self.client.get_collection(name=collection_name)
+            probe = collection.get(limit=1, include=['embeddings'])
+            if len(probe['ids']) == 0:
+                continue
+            hit = collection.query(query_embeddings=probe['embeddings'], n_results=1, include=['distances'])
+            # Identical chunks under other tickers may tie, so check the distance rather than the ID
+            return bool(hit['ids'] and hit['ids'][0]) and hit['distances'][0][0] <= 1e-3
+        return False
+    
+    # --- Reads --------------------------------------------------------------
+    
+    @staticmethod
+    def _format_results(results: Dict, row: int, top_k: int) -> List[Dict]:
+        """Format one query's results from a collection.query response"""
+        formatted_results = []
+        
+        if results['ids'] and len(results['ids'][row]) > 0:
+            for i in range(min(len(results['ids'][row]), top_k)):
+                formatted_results.append({
+                    'id': results['ids'][row][i],
+                    # Handle case where distances might be None
+                    'score': 1 - results['distances'][row][i] if results['distances'] else 0,
+                    'text': results['documents'][row][i],
+                    'metadata': results['metadatas'][row][i]
+                })
+        
+        return formatted_results
+    
+    def _query_shards(self,
+                      query_embeddings: np.ndarray,
+                      n_results: int,
+                      filters: Optional[Dict]) -> List[List[Dict]]:
+        """Query the shards filters route to (in parallel if more than one); the merged top n_results per query row"""
+        def query(key):
+            results = self.shards[key].query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=build_chroma_where(self._shard_filters(key, filters))
+            )
+            return [self._format_results(results, row, n_results) for row in range(len(query_embeddings))]
+        
+        keys = self._route(filters)
+        if not keys:
+            return [[] for _ in range(len(query_embeddings))]
+        if len(keys) == 1:
+            return query(keys[0])
+        
+        merged = [{} for _ in range(len(query_embeddings))]
+        for shard_results in _shard_pool.map(query, keys):
+            for row, docs in enumerate(shard_results):
+                for doc in docs:
+                    # A chunk briefly in two shards (mid-move) counts once
+                    if doc['id'] not in merged[row] or doc['score'] > merged[row][doc['id']]['score']:
+                        merged[row][doc['id']] = doc
+        return [sorted(docs.values(), key=lambda doc: -doc['score'])[:n_results] for docs in merged]
+    
+    def _search(self,
+                query_embedding: Union[np.ndarray, List[float]],
+                filters: Optional[Dict],
+                top_k: int) -> List[Dict]:
         """Search for similar documents in ChromaDB"""
         
         try:
-            # Build where clause with explicit $and operator for ChromaDB
-            where_clause = None
-            
-            if filters:
-                conditions = []
-                
-                if 'tickers' in filters and filters['tickers']:
-                    conditions.append({'ticker': {"$in": filters['tickers']}})
-                
-                if 'doc_types' in filters and filters['doc_types']:
-                    conditions.append({'document_type': {"$in": filters['doc_types']}})
-                
-                # CRITICAL FIX: Use $and if multiple conditions exist
-                if len(conditions) > 1:
-                    where_clause = {"$and": conditions}
-                elif len(conditions) == 1:
-                    where_clause = conditions[0]
+            self._sync()
             
             # Perform search
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=top_k,
-                where=where_clause
-            )
-            
-            # ... (rest of the function remains the same) ...
-            
-            # Format results
-            formatted_results = []
-            
-            if results['ids'] and len(results['ids'][0]) > 0:
-                for i in range(len(results['ids'][0])):
-                    formatted_results.append({
-                        'id': results['ids'][0][i],
-                        # Handle case where distances might be None
-                        'score': 1 - results['distances'][0][i] if results['distances'] else 0,
-                        'text': results['documents'][0][i],
-                        'metadata': results['metadatas'][0][i]
-                    })
-            
-            return formatted_results
-            
+            return self._query_shards(
+                np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+                top_k,
+                filters
+            )[0]
+        
         except Exception as e:
             print(f"Error during search: {e}")
             return []
     
+    def get_documents(self, ids: List[str]) -> List[Dict]:
+        """Stored chunks by ID (id, text, metadata); unknown IDs are skipped"""
+        try:
+            self._sync()
+            # IDs start with the ticker, which is enough to route them
+            tickers = list({doc_id.split(':', 1)[0] for doc_id in ids})
+            documents = []
+            for key in self._route({'tickers': tickers}):
+                results = self.shards[key].get(ids=ids, include=['documents', 'metadatas'])
+                documents.extend({'id': doc_id, 'text': text, 'metadata': metadata}
+                                 for doc_id, text, metadata in zip(results['ids'], results['documents'], results['metadatas']))
+            return documents
+        except Exception as e:
+            print(f"Error fetching documents: {e}")
+            return []
+    
+    def search_many(self,
+                    query_embeddings: Union[np.ndarray, List[List[float]]],
+                    filters: Union[Dict, List[Optional[Dict]], None] = None,
+                    top_k: Union[int, List[int]] = 5) -> List[List[Dict]]:
+        """
+        Search for many queries at once (one result list per query, in input order).
+        filters and top_k may be shared or given per query; queries with the same
+        filter go to ChromaDB together in a single collection.query call per shard.
+        """
+        query_embeddings, filters_list, top_k_list = self._expand_queries(query_embeddings, filters, top_k)
+        
+        # Group queries by their (canonicalized) filters
+        groups = {}
+        for row, query_filters in enumerate(filters_list):
+            groups.setdefault(filter_key(query_filters), (query_filters, []))[1].append(row)
+        
+        self._sync()
+        output = [[] for _ in range(len(query_embeddings))]
+        for query_filters, rows in groups.values():
+            try:
+                results = self._query_shards(query_embeddings[rows], max(top_k_list[row] for row in rows), query_filters)
+                for position, row in enumerate(rows):
+                    output[row] = results[position][:top_k_list[row]]
+            except Exception as e:
+                print(f"Error during search ({len(rows)} queries, filters={query_filters}): {e}")
+        
+        return output
+    
     def get_stats(self) -> Dict:
         """Get collection statistics"""
         try:
-            count = self.collection.count()
-            return {
-                'total_documents': count,
+            self._sync()
+            stats = {
+                'total_documents': self._count(),
                 'collection_name': self.collection_name,
-                'persist_directory': Settings.CHROMA_PERSIST_DIR
+                'alias': self.alias,
+                'previous_version': self._read_alias().get('previous'),
+                'persist_directory': Settings.CHROMA_PERSIST_DIR,
+                'sharding': self.sharding,
+                'hnsw': self._hnsw_config(next(iter(self.shards.values()))) if self.shards else {},
+                'lexical_documents': len(self.lexical_index),
+                'index_generation': self.index_generation(),
+                'result_cache': self.result_cache.get_stats()
             }
+            if self.sharding != 'none':
+                stats['shards'] = {key: collection.count() for key, collection in self.shards.items()}
+            return stats
         except Exception as e:
             print(f"Error getting stats: {e}")
             return {}
@@ -179,8 +538,13 @@ class ChromaDBManager:
     def reset_collection(self):
         """Reset the collection (delete all documents)"""
         try:
-            self.client.delete_collection(name=self.collection_name)
+            for collection_name in self._version_collections(self.collection_name):
+                self.client.delete_collection(name=collection_name)
+            if os.path.exists(self._shard_map_path(self.collection_name)):
+                os.remove(self._shard_map_path(self.collection_name))
+            self.lexical_index.reset()
             self.setup_collection()
+            self._bump_generation()
             print(f"Collection '{self.collection_name}' reset successfully")
         except Exception as e:
-            print(f"Error resetting collection: {e}")
\ No newline at end of file
+            print(f"Error resetting collection: {e}")
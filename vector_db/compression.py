@@ -0,0 +1,169 @@
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Optional
+from config.settings import Settings
+
+COMPRESSION_METHODS = ('none', 'pca', 'pq')
+
+# Rows encoded per block (bounds the temporary distance matrices)
+ENCODE_BLOCK = 65536
+
+
+class VectorCompressor(ABC):
+    """
+    Lossy code for unit-length embeddings, used to shortlist candidates by
+    approximate inner product before exact re-ranking from full vectors.
+    """
+
+    method = None
+    code_dtype = np.float32
+    code_size = 0  # code values per vector
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.code_size * np.dtype(self.code_dtype).itemsize
+
+    @abstractmethod
+    def fit(self, sample: np.ndarray):
+        """Learn the code from a sample of vectors"""
+
+    @abstractmethod
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """(rows, queries) approximate inner products, up to a per-query constant"""
+
+    @abstractmethod
+    def _arrays(self) -> dict:
+        pass
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.empty((len(vectors), self.code_size), dtype=self.code_dtype)
+        for start in range(0, len(vectors), ENCODE_BLOCK):
+            block = np.asarray(vectors[start:start + ENCODE_BLOCK], dtype=np.float32)
+            codes[start:start + len(block)] = self._encode(block)
+        return codes
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez(f, method=self.method, **self._arrays())
+
+
+class PCACompressor(VectorCompressor):
+    """Projection onto the top principal components (float32 per kept dimension)"""
+
+    method = 'pca'
+
+    def __init__(self, dimensions: Optional[int] = None):
+        self.code_size = dimensions or Settings.PCA_DIMENSIONS
+        self.mean = None
+        self.components = None
+        self.explained_variance = 0.0
+
+    def fit(self, sample: np.ndarray):
+        sample = np.asarray(sample, dtype=np.float32)
+        self.code_size = min(self.code_size, sample.shape[1], len(sample))
+        self.mean = sample.mean(axis=0)
+        _, singular_values, vt = np.linalg.svd(sample - self.mean, full_matrices=False)
+        self.components = vt[:self.code_size].astype(np.float32)
+        variance = singular_values ** 2
+        self.explained_variance = float(variance[:self.code_size].sum() / max(variance.sum(), 1e-12))
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        return (vectors - self.mean) @ self.components.T
+
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        # q.x = q.mean + (P q).(P (x - mean)); q.mean is the same for every row
+        return codes @ (queries @ self.components.T).T
+
+    def _arrays(self) -> dict:
+        return {'mean': self.mean, 'components': self.components,
+                'explained_variance': self.explained_variance}
+
+
+class ProductQuantizer(VectorCompressor):
+    """
+    Product quantization: each vector is split into subvectors, and each
+    subvector is stored as the uint8 index of its nearest of 256 k-means
+    centroids. Queries are scored with per-subspace lookup tables.
+    """
+
+    method = 'pq'
+    code_dtype = np.uint8
+
+    def __init__(self, subvectors: Optional[int] = None, iterations: int = 15, seed: int = 0):
+        self.code_size = subvectors or Settings.PQ_SUBVECTORS
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None  # (subvectors, centroids, subvector dims)
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors.reshape(len(vectors), self.code_size, -1)
+
+    @staticmethod
+    def _nearest(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        return np.argmin((centroids ** 2).sum(axis=1) - 2 * data @ centroids.T, axis=1)
+
+    def fit(self, sample: np.ndarray):
+        sample = np.asarray(sample, dtype=np.float32)
+        if sample.shape[1] % self.code_size:
+            raise ValueError(f"PQ_SUBVECTORS ({self.code_size}) must divide the dimension ({sample.shape[1]})")
+        rng = np.random.default_rng(self.seed)
+        k = min(256, len(sample))
+        parts = self._split(sample)
+        self.centroids = np.zeros((self.code_size, 256, parts.shape[2]), dtype=np.float32)
+        for j in range(self.code_size):
+            data = parts[:, j]
+            centroids = data[rng.choice(len(data), k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assign = self._nearest(data, centroids)
+                counts = np.bincount(assign, minlength=k)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, data)
+                filled = counts > 0
+                centroids[filled] = sums[filled] / counts[filled, None]
+            self.centroids[j, :k] = centroids
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        parts = self._split(vectors)
+        return np.stack([self._nearest(parts[:, j], self.centroids[j]) for j in range(self.code_size)], axis=1)
+
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        tables = np.einsum('qjs,jks->qjk', self._split(queries), self.centroids)
+        scores = np.zeros((len(queries), len(codes)), dtype=np.float32)
+        for j in range(self.code_size):
+            scores += tables[:, j].take(codes[:, j], axis=1)
+        return scores.T
+
+    def _arrays(self) -> dict:
+        return {'centroids': self.centroids}
+
+
+def create_compressor(method: Optional[str] = None) -> Optional[VectorCompressor]:
+    """Untrained compressor for Settings.VECTOR_COMPRESSION ('none' -> None)"""
+    method = (method or Settings.VECTOR_COMPRESSION).lower()
+    if method == 'pca':
+        return PCACompressor()
+    if method == 'pq':
+        return ProductQuantizer()
+    if method == 'none':
+        return None
+    raise ValueError(f"Unknown vector compression: {method} (expected one of {', '.join(COMPRESSION_METHODS)})")
+
+
+def load_compressor(path: str) -> VectorCompressor:
+    with np.load(path) as data:
+        method = str(data['method'])
+        if method == 'pca':
+            compressor = PCACompressor(len(data['components']))
+            compressor.mean = data['mean']
+            compressor.components = data['components']
+            compressor.explained_variance = float(data['explained_variance'])
+        elif method == 'pq':
+            compressor = ProductQuantizer(len(data['centroids']))
+            compressor.centroids = data['centroids']
+        else:
+            raise ValueError(f"Unknown vector compression: {method}")
+    return compressor
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import re
+import threading
+from contextlib import contextmanager
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.settings import Settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer use only
+    fcntl = None
+
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed embedding cache.
+    Vectors live in an append-only float32 file that is memory-mapped for
+    reads; keys.txt holds one SHA-256 key per row, in row order. Keys hash
+    the model name together with the text, so switching models never
+    returns stale vectors. Writers (and the repair of an interrupted write)
+    hold an exclusive lock on a sidecar lock file, so several processes can
+    share one cache directory; lookups pick up rows other processes appended.
+    """
+
+    def __init__(self,
+                 model_name: Optional[str] = None,
+                 dimension: Optional[int] = None,
+                 cache_dir: Optional[str] = None):
+        self.model_name = model_name or Settings.EMBEDDING_MODEL
+        self.dimension = dimension or Settings.EMBEDDING_DIMENSION
+        model_slug = re.sub(r'[^\w\-]+', '_', self.model_name)
+        self.cache_dir = os.path.join(cache_dir or Settings.EMBEDDING_CACHE_DIR, model_slug)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.vectors_path = os.path.join(self.cache_dir, "vectors.f32")
+        self.keys_path = os.path.join(self.cache_dir, "keys.txt")
+        self.lock_path = os.path.join(self.cache_dir, "write.lock")
+        self._row_bytes = self.dimension * 4
+        self._lock = threading.Lock()
+        self._vectors = None
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive inter-process lock around writes and repairs"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load_index(self):
+        self.index: Dict[str, int] = {}
+        self.rows = 0
+        self._keys_offset = 0
+        with self._file_lock():
+            self._sync_index()
+            self._repair()
+
+    def _sync_index(self):
+        """Read keys appended since the last read (by this or another process)"""
+        if not os.path.exists(self.keys_path):
+            open(self.keys_path, 'a').close()
+        with open(self.keys_path, 'rb') as f:
+            f.seek(self._keys_offset)
+            data = f.read()
+        # A partial last line belongs to an interrupted (or, without the lock, ongoing) write
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            key = line.decode('utf-8').strip()
+            if key:
+                self.index[key] = self.rows
+            self.rows += 1
+        self._keys_offset += len(complete)
+
+    def _follow_writers(self):
+        """
+        Pick up keys other processes appended since the last read. Needs no file
+        lock: a key line is only written after its vector, and only complete lines
+        are read.
+        """
+        try:
+            size = os.path.getsize(self.keys_path)
+        except OSError:
+            return
+        if size < self._keys_offset:
+            # A repair rewrote the keys file; read it again from the start
+            self.index = {}
+            self.rows = 0
+            self._keys_offset = 0
+        if size != self._keys_offset:
+            self._sync_index()
+
+    def _repair(self):
+        """
+        Drop what an interrupted put left behind: a partial key line, keys without
+        vectors, vector bytes without keys. Only called with the file lock held.
+        """
+        with open(self.keys_path, 'r+b') as f:
+            f.truncate(self._keys_offset)
+        # Rows are only valid once both the vector and its key were written
+        stored_rows = os.path.getsize(self.vectors_path) // self._row_bytes if os.path.exists(self.vectors_path) else 0
+        if stored_rows < self.rows:
+            self.index = {k: r for k, r in self.index.items() if r < stored_rows}
+            self.rows = stored_rows
+            with open(self.keys_path, 'w') as f:
+                for key, _ in sorted(self.index.items(), key=lambda item: item[1]):
+                    f.write(key + "\n")
+            self._keys_offset = os.path.getsize(self.keys_path)
+        with open(self.vectors_path, 'ab') as f:
+            f.truncate(self.rows * self._row_bytes)
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-mapped view of all cached vectors (re-mapped after appends)"""
+        if self.rows == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        if self._vectors is None or self._vectors.shape[0] != self.rows:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r',
+                                      shape=(self.rows, self.dimension))
+        return self._vectors
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's model"""
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def lookup(self, keys: Sequence[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Fetch cached vectors for keys.
+        Returns a (len(keys), dim) float32 array (zeros for misses) and the
+        positions of the keys that were not found.
+        """
+        out = np.zeros((len(keys), self.dimension), dtype=np.float32)
+        with self._lock:
+            self._follow_writers()
+            rows = [self.index.get(key) for key in keys]
+            found = [i for i, row in enumerate(rows) if row is not None]
+            missing = [i for i, row in enumerate(rows) if row is None]
+            if found:
+                out[found] = self._matrix()[[rows[i] for i in found]]
+        self.hits += len(found)
+        self.misses += len(missing)
+        return out, missing
+
+    def put(self, keys: Sequence[str], vectors: np.ndarray):
+        """Append new vectors; keys already cached are skipped"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of shape (n, {self.dimension}), got {vectors.shape}")
+
+        with self._lock, self._file_lock():
+            # Rows appended by other processes come first; then clean up after any crashed writer
+            self._sync_index()
+            self._repair()
+            new_rows = []
+            seen = set()
+            for i, key in enumerate(keys):
+                if key not in self.index and key not in seen:
+                    seen.add(key)
+                    new_rows.append(i)
+            if not new_rows:
+                return
+
+            # Vectors first, keys second: a crash in between leaves only orphan bytes
+            with open(self.vectors_path, 'ab') as f:
+                f.write(vectors[new_rows].tobytes())
+            with open(self.keys_path, 'ab') as f:
+                key_bytes = "".join(keys[i] + "\n" for i in new_rows).encode('utf-8')
+                f.write(key_bytes)
+            self._keys_offset += len(key_bytes)
+
+            for i in new_rows:
+                self.index[keys[i]] = self.rows
+                self.rows += 1
+
+    def get_stats(self) -> Dict:
+        """Cache size and hit rate since startup"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': self.rows,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size_mb': self.rows * self._row_bytes / (1024 * 1024)
+        }
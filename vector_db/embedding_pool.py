@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from config.settings import Settings
+
+# Per-worker embedder, built by _init_worker in each pool process
+_worker_embedder = None
+
+
+def _init_worker(config: Dict):
+    global _worker_embedder
+
+    # Keep each worker to its share of the cores instead of every process grabbing all of them
+    threads = config['threads']
+    os.environ['TOKENIZERS_PARALLELISM'] = 'false'
+    Settings.EMBEDDING_MODEL = config['model']
+    Settings.EMBEDDING_DIMENSION = config['dimension']
+    Settings.ONNX_NUM_THREADS = threads
+    if config['backend'] == 'torch':
+        import torch
+        torch.set_num_threads(threads)
+
+    from .embeddings import LocalEmbeddings
+    _worker_embedder = LocalEmbeddings(use_cache=False,
+                                       backend=config['backend'],
+                                       batching=config['batching'],
+                                       workers=0)
+    _worker_embedder.max_batch_tokens = config['max_batch_tokens']
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    return _worker_embedder._encode_batches(texts, batch_size, show_progress=False)
+
+
+class EmbeddingPool:
+    """
+    Pool of worker processes, each holding its own copy of the embedding model.
+    Large text lists are sharded across workers and results come back in input
+    order. Workers are started on first use and live until close().
+    """
+
+    def __init__(self,
+                 workers: int,
+                 threads_per_worker: Optional[int] = None,
+                 shard_size: Optional[int] = None,
+                 backend: Optional[str] = None,
+                 batching: Optional[str] = None,
+                 max_batch_tokens: Optional[int] = None):
+        self.workers = workers
+        threads = threads_per_worker or Settings.EMBEDDING_THREADS_PER_WORKER
+        self.threads_per_worker = threads or max(1, (os.cpu_count() or 1) // workers)
+        self.shard_size = shard_size or Settings.EMBEDDING_POOL_SHARD_SIZE
+        self.config = {
+            'model': Settings.EMBEDDING_MODEL,
+            'dimension': Settings.EMBEDDING_DIMENSION,
+            'backend': (backend or Settings.EMBEDDING_BACKEND).lower(),
+            'batching': (batching or Settings.EMBEDDING_BATCHING).lower(),
+            'max_batch_tokens': max_batch_tokens or Settings.EMBEDDING_BATCH_TOKENS,
+            'threads': self.threads_per_worker
+        }
+        self._executor = None
+
+    def start(self):
+        """Start the worker processes (spawned: torch and OpenMP are not fork-safe)"""
+        if self._executor is None:
+            print(f"Starting embedding pool: {self.workers} workers x {self.threads_per_worker} threads")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.config,)
+            )
+
+    def close(self):
+        """Stop the workers; queued shards are cancelled"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def iter_encode(self, texts: List[str], batch_size: int = 32) -> Iterator[np.ndarray]:
+        """
+        Yield each shard's embeddings in input order as soon as it is ready.
+        At most a couple of shards per worker are in flight at any time.
+        """
+        self.start()
+        max_pending = self.workers * 2
+        pending = deque()
+        try:
+            for start in range(0, len(texts), self.shard_size):
+                shard = texts[start:start + self.shard_size]
+                pending.append(self._executor.submit(_encode_in_worker, shard, batch_size))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Consumer stopped early or a worker failed: drop whatever is still queued
+            for future in pending:
+                future.cancel()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts across the pool into one (len(texts), dim) float32 matrix"""
+        embeddings = np.empty((len(texts), Settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        row = 0
+        for shard in self.iter_encode(texts, batch_size):
+            embeddings[row:row + len(shard)] = shard
+            row += len(shard)
+        return embeddings
@@ -1,40 +1,137 @@
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Optional
 import numpy as np
+from numpy.typing import DTypeLike
 from tqdm import tqdm
 from config.settings import Settings
+from .embedding_cache import EmbeddingCache
 
 class LocalEmbeddings:
     """Generate embeddings using free local models"""
     
-    def __init__(self):
+    def __init__(self,
+                 use_cache: Optional[bool] = None,
+                 backend: Optional[str] = None,
+                 batching: Optional[str] = None,
+                 workers: Optional[int] = None):
+        self.backend = (backend or Settings.EMBEDDING_BACKEND).lower()
+        self.batching = (batching or Settings.EMBEDDING_BATCHING).lower()
+        self.max_batch_tokens = Settings.EMBEDDING_BATCH_TOKENS
+        if self.batching not in ('tokens', 'fixed'):
+            raise ValueError(f"Unknown embedding batching mode: {self.batching}")
+        
         # Load free sentence transformer model
-        print(f"Loading embedding model: {Settings.EMBEDDING_MODEL}")
-        self.model = SentenceTransformer(Settings.EMBEDDING_MODEL)
+        print(f"Loading embedding model: {Settings.EMBEDDING_MODEL} ({self.backend})")
+        if self.backend == 'onnx':
+            from .onnx_backend import OnnxEmbeddingModel
+            self.model = OnnxEmbeddingModel(Settings.EMBEDDING_MODEL, quantize=Settings.ONNX_QUANTIZE)
+            self.model_id = f"{Settings.EMBEDDING_MODEL}:onnx{'-int8' if Settings.ONNX_QUANTIZE else ''}"
+        elif self.backend == 'torch':
+            self.model = SentenceTransformer(Settings.EMBEDDING_MODEL)
+            self.model_id = Settings.EMBEDDING_MODEL
+        else:
+            raise ValueError(f"Unknown embedding backend: {self.backend}")
         print("Embedding model loaded successfully")
+
+        # Persistent cache so unchanged chunks are never re-embedded
+        # (keyed per backend, since quantized vectors differ slightly)
+        use_cache = Settings.USE_EMBEDDING_CACHE if use_cache is None else use_cache
+        self.cache = EmbeddingCache(self.model_id, Settings.EMBEDDING_DIMENSION) if use_cache else None
+        
+        # Bulk ingestion: shard large text lists across worker processes (started on first use)
+        workers = Settings.EMBEDDING_POOL_WORKERS if workers is None else workers
+        self.pool = None
+        if workers > 1:
+            from .embedding_pool import EmbeddingPool
+            self.pool = EmbeddingPool(workers, backend=self.backend, batching=self.batching)
     
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text"""
+    def close(self):
+        """Shut down the embedding worker pool, if any"""
+        if self.pool is not None:
+            self.pool.close()
+    
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text (float32 vector)"""
         embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        return np.asarray(embedding, dtype=np.float32)
+    
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Token count per text as the model will see it (truncated to its window)"""
+        input_ids = self.model.tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.model.max_seq_length
+        )['input_ids']
+        return np.fromiter((len(ids) for ids in input_ids), dtype=np.int64, count=len(texts))
+    
+    def _token_budget_batches(self, texts: List[str], max_batch_tokens: int) -> List[np.ndarray]:
+        """
+        Longest-first batches of similar-length texts, sized so that
+        rows x longest row (the padded tensor) stays within the token budget.
+        """
+        lengths = self._token_lengths(texts)
+        order = np.argsort(-lengths, kind='stable')
+        
+        batches = []
+        start = 0
+        while start < len(order):
+            longest = max(int(lengths[order[start]]), 1)
+            size = max(1, max_batch_tokens // longest)
+            batches.append(order[start:start+size])
+            start += size
+        return batches
     
-    def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+    def _encode_batches(self, texts: List[str], batch_size: int, show_progress: bool = True) -> np.ndarray:
+        """Run the model over texts batch by batch, filling one preallocated matrix in input order"""
+        if self.pool is not None and len(texts) > self.pool.shard_size:
+            return self.pool.encode(texts, batch_size)
         
-        all_embeddings = []
+        embeddings = np.empty((len(texts), Settings.EMBEDDING_DIMENSION), dtype=np.float32)
         
-        for i in tqdm(range(0, len(texts), batch_size), desc="Generating embeddings"):
-            batch = texts[i:i+batch_size]
-            
-            # Generate embeddings for batch
-            batch_embeddings = self.model.encode(
-                batch,
+        if self.batching == 'tokens':
+            # Short headlines are no longer padded to the length of long overview chunks
+            batches = self._token_budget_batches(texts, self.max_batch_tokens)
+        else:
+            batches = [np.arange(i, min(i+batch_size, len(texts))) for i in range(0, len(texts), batch_size)]
+        
+        for rows in tqdm(batches, desc="Generating embeddings", disable=not show_progress):
+            # Generate embeddings for batch and scatter them back to their original positions
+            embeddings[rows] = self.model.encode(
+                [texts[i] for i in rows],
+                batch_size=len(rows),
                 convert_to_numpy=True,
                 show_progress_bar=False
             )
+        
+        return embeddings
+    
+    def generate_embeddings_batch(self,
+                                  texts: List[str],
+                                  batch_size: int = 32,
+                                  dtype: DTypeLike = np.float32) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts (only new or changed text reaches the model).
+        Returns a contiguous (len(texts), dim) array; pass dtype=np.float16 to halve memory.
+        batch_size only applies to 'fixed' batching; 'tokens' batching sizes by token budget.
+        """
+        
+        if self.cache is None:
+            embeddings = self._encode_batches(texts, batch_size)
+        else:
+            # Identical texts share one key (and one forward pass)
+            keys = [self.cache.key(text) for text in texts]
+            embeddings, missing = self.cache.lookup(keys)
             
-            # Convert to list and add to results
-            for embedding in batch_embeddings:
-                all_embeddings.append(embedding.tolist())
+            if missing:
+                unique = {}
+                for i in missing:
+                    unique.setdefault(keys[i], i)
+                unique_positions = list(unique.values())
+                
+                new_embeddings = self._encode_batches([texts[i] for i in unique_positions], batch_size)
+                self.cache.put([keys[i] for i in unique_positions], new_embeddings)
+                
+                row_for_key = {key: row for row, key in enumerate(unique)}
+                embeddings[missing] = new_embeddings[[row_for_key[keys[i]] for i in missing]]
         
-        return all_embeddings
\ No newline at end of file
+        return np.ascontiguousarray(embeddings, dtype=dtype)
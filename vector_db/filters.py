@@ -0,0 +1,126 @@
+"""
+Search filters shared by the vector store backends.
+
+A filters dict may contain:
+    'tickers':   ["AAPL", "MSFT"]        -> ticker in list
+    'doc_types': ["News"]                -> document_type in list
+    'sectors':   ["Technology"]          -> sector in list
+    'ranges':    {"pe_ratio": {"$lt": 20},
+                  "date_ts": {"$gte": 1735689600}}
+Range fields are the numeric metadata stored with every chunk; operators are
+ChromaDB's comparison operators. Chunks missing a field never match a range on it.
+"""
+
+import json
+import operator
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Numeric metadata fields usable in 'ranges', and their operators
+NUMERIC_FIELDS = ('market_cap', 'pe_ratio', 'chunk_id', 'date_ts')
+COMPARISONS = {'$gt': operator.gt, '$gte': operator.ge, '$lt': operator.lt,
+               '$lte': operator.le, '$eq': operator.eq, '$ne': operator.ne}
+RANGE_OPERATORS = tuple(COMPARISONS)
+
+# List filters: filter key -> metadata field
+LIST_FILTERS = {'tickers': 'ticker', 'doc_types': 'document_type', 'sectors': 'sector'}
+
+
+def to_number(value) -> Optional[float]:
+    """Float for numeric-looking metadata ('N/A', None, '' and NaN -> None)"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number != number else number
+
+
+def to_epoch_seconds(value) -> Optional[int]:
+    """
+    ISO date string / date / datetime -> epoch seconds (UTC). Naive dates are
+    local wall-clock times (the collectors stamp datetime.now()) and are
+    converted from the local timezone.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    try:
+        ts = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return int(ts.astimezone(timezone.utc).timestamp())
+
+
+def date_range_filter(date_range: Tuple) -> Dict:
+    """
+    (start, end) -> date_ts range conditions; either end may be None.
+    A plain date (or 'YYYY-MM-DD') as the end includes that whole day.
+    """
+    start, end = date_range
+    conditions = {}
+    if start is not None:
+        conditions['$gte'] = to_epoch_seconds(start)
+    if end is not None:
+        end_ts = to_epoch_seconds(end)
+        whole_day = (isinstance(end, date) and not isinstance(end, datetime)) or (isinstance(end, str) and len(end) == 10)
+        conditions['$lte'] = end_ts + 86399 if whole_day else end_ts
+    if None in conditions.values():
+        raise ValueError(f"Invalid date range: {date_range}")
+    return conditions
+
+
+def validate_filters(filters: Optional[Dict]) -> Dict:
+    """Check filter keys, range fields and operators; returns the filters (or {})"""
+    filters = filters or {}
+    for key in filters:
+        if key not in LIST_FILTERS and key != 'ranges':
+            raise ValueError(f"Unknown filter: {key}")
+    for field, conditions in (filters.get('ranges') or {}).items():
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Range filters only apply to {', '.join(NUMERIC_FIELDS)} (got {field})")
+        for op in conditions:
+            if op not in RANGE_OPERATORS:
+                raise ValueError(f"Unknown range operator: {op}")
+    return filters
+
+
+def filter_key(filters: Optional[Dict]) -> str:
+    """Canonical string for grouping queries that share a filter"""
+    return json.dumps(filters or {}, sort_keys=True, default=str)
+
+
+def matches_filters(metadata: Dict, filters: Dict) -> bool:
+    """Evaluate (already validated) filters against one chunk's metadata"""
+    for key, field in LIST_FILTERS.items():
+        if filters.get(key) and metadata.get(field) not in filters[key]:
+            return False
+    for field, conditions in (filters.get('ranges') or {}).items():
+        value = to_number(metadata.get(field))
+        if value is None:
+            return False
+        for op, bound in conditions.items():
+            if not COMPARISONS[op](value, bound):
+                return False
+    return True
+
+
+def build_chroma_where(filters: Optional[Dict]) -> Optional[Dict]:
+    """Build where clause with explicit $and operator for ChromaDB"""
+    filters = validate_filters(filters)
+    conditions: List[Dict] = []
+
+    for key, field in LIST_FILTERS.items():
+        if filters.get(key):
+            conditions.append({field: {"$in": list(filters[key])}})
+
+    for field, ranges in (filters.get('ranges') or {}).items():
+        for op, value in ranges.items():
+            conditions.append({field: {op: value}})
+
+    # CRITICAL FIX: Use $and if multiple conditions exist
+    if len(conditions) > 1:
+        return {"$and": conditions}
+    if len(conditions) == 1:
+        return conditions[0]
+    return None
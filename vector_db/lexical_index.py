@@ -0,0 +1,204 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.settings import Settings
+from .filters import matches_filters, validate_filters
+
+# Keeps tickers, "p/e", "30.50", "2,500,000" and "s&p" as single terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[./&,'-][a-z0-9]+)*")
+STOPWORDS = frozenset("a an and are as at be by for from how in is it its of on or that the this to what with".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: Optional[int] = None) -> List[Tuple[str, float]]:
+    """
+    Merge ranked ID lists: score = sum of 1 / (k + rank) over the lists an ID appears in,
+    scaled so an ID ranked first in every list scores 1.
+    """
+    k = Settings.RRF_K if k is None else k
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    scale = (k + 1) / max(len(rankings), 1)
+    return sorted(((doc_id, score * scale) for doc_id, score in scores.items()), key=lambda item: -item[1])
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over chunk texts, maintained at ingest time.
+    Persisted as an append-only JSONL log of term counts (plus filterable
+    metadata) per chunk and deletion records. Other processes replay only
+    the bytes appended since their last read; the log is compacted once
+    deleted records outnumber live ones.
+    """
+
+    def __init__(self, path: str, k1: Optional[float] = None, b: Optional[float] = None):
+        self.path = path
+        self.k1 = Settings.BM25_K1 if k1 is None else k1
+        self.b = Settings.BM25_B if b is None else b
+        self._lock = threading.RLock()
+        self._file_id = None
+        self._clear()
+
+    def _clear(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_meta: Dict[str, Dict] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.total_len = 0
+        self.dead_records = 0
+        self._offset = 0
+
+    # --- Log ----------------------------------------------------------------
+
+    def _refresh(self):
+        """Apply records appended by any process since the last read (full reload if the log was replaced)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._offset or self.doc_len:
+                self._clear()
+            self._file_id = None
+            return
+        if (stat.st_ino, stat.st_dev) != self._file_id or stat.st_size < self._offset:
+            self._clear()
+            self._file_id = (stat.st_ino, stat.st_dev)
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        # A writer may be mid-line; only consume complete records
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            self._apply(json.loads(line))
+        self._offset += len(complete)
+
+    def _apply(self, record: Dict):
+        doc_id = record['id']
+        if record.get('deleted'):
+            self._unindex(doc_id)
+            self.dead_records += 2  # the deletion and the record it cancels
+        elif doc_id not in self.doc_len:
+            for term, tf in record['tf'].items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(record['tf'].values())
+            self.doc_len[doc_id] = length
+            self.doc_meta[doc_id] = record['metadata']
+            self.doc_terms[doc_id] = list(record['tf'])
+            self.total_len += length
+
+    def _unindex(self, doc_id: str):
+        length = self.doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self.total_len -= length
+        self.doc_meta.pop(doc_id, None)
+        for term in self.doc_terms.pop(doc_id, []):
+            posting = self.postings[term]
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+
+    def _append(self, records: List[Dict]):
+        if not records:
+            return
+        data = "".join(json.dumps(record) + "\n" for record in records).encode('utf-8')
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self._refresh()
+
+    def _compact(self):
+        """Rewrite the log with live chunks only (readers see a new file and reload)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for doc_id, terms in self.doc_terms.items():
+                tf = {term: self.postings[term][doc_id] for term in terms}
+                f.write(json.dumps({'id': doc_id, 'tf': tf, 'metadata': self.doc_meta[doc_id]}) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file_id = None
+        self._refresh()
+
+    # --- Writes -------------------------------------------------------------
+
+    def add(self, entries: Iterable[Tuple[str, str, Dict]], replace: bool = False):
+        """
+        Index (id, text, metadata) entries. IDs hash the text, so an indexed ID is skipped,
+        unless replace is set and its metadata changed (an upsert): then the record is
+        deleted and re-added so filters see the new metadata.
+        """
+        with self._lock:
+            self._refresh()
+            records = []
+            seen = set()
+            for doc_id, text, metadata in entries:
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if doc_id in self.doc_len:
+                    if not replace or self.doc_meta[doc_id] == json.loads(json.dumps(metadata)):
+                        continue
+                    records.append({'id': doc_id, 'deleted': True})
+                records.append({'id': doc_id, 'tf': dict(Counter(tokenize(text))), 'metadata': metadata})
+            self._append(records)
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            self._refresh()
+            self._append([{'id': doc_id, 'deleted': True} for doc_id in ids if doc_id in self.doc_len])
+            if self.dead_records > max(len(self.doc_len), 1000):
+                self._compact()
+
+    def reset(self):
+        with self._lock:
+            self.drop(self.path)
+            self._refresh()
+
+    @staticmethod
+    def drop(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    # --- Reads --------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self.doc_len)
+
+    def search(self, query: str, filters: Optional[Dict] = None, top_k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (id, BM25 score) for the query's terms among chunks matching filters"""
+        filters = validate_filters(filters)
+        with self._lock:
+            self._refresh()
+            n_docs = len(self.doc_len)
+            if n_docs == 0:
+                return []
+            avg_len = self.total_len / n_docs
+
+            scores = {}
+            for term in set(tokenize(query)):
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = 1 - self.b + self.b * self.doc_len[doc_id] / avg_len
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+            if filters:
+                scores = {doc_id: score for doc_id, score in scores.items()
+                          if matches_filters(self.doc_meta[doc_id], filters)}
+            return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
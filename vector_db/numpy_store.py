@@ -0,0 +1,550 @@
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Optional, Union
+import numpy as np
+from config.settings import Settings
+from .vector_store import VectorStore
+from .filters import filter_key, to_epoch_seconds, to_number, validate_filters
+from .lexical_index import LexicalIndex
+from .compression import create_compressor, load_compressor
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer use only
+    fcntl = None
+
+# Per-row column files (raw, append-only): name -> dtype
+COLUMNS = {
+    'ticker': np.int32,          # code into manifest['tickers']
+    'document_type': np.int32,   # code into manifest['doc_types']
+    'sector': np.int32,          # code into manifest['sectors']
+    'date': np.int64,            # epoch seconds (MISSING_DATE if unknown)
+    'chunk_id': np.int64,
+    'market_cap': np.float64,    # NaN if unknown
+    'pe_ratio': np.float64,      # NaN if unknown
+    'offset': np.int64,          # byte offset of the row in documents.jsonl
+    'alive': np.uint8            # cleared in place when a row is deleted or replaced
+}
+MISSING_DATE = np.iinfo(np.int64).min
+
+# Column behind each list filter and range field (see vector_db.filters)
+LIST_COLUMNS = {'tickers': ('ticker', 'tickers'),
+                'doc_types': ('document_type', 'doc_types'),
+                'sectors': ('sector', 'sectors')}
+RANGE_COLUMNS = {'market_cap': 'market_cap', 'pe_ratio': 'pe_ratio', 'chunk_id': 'chunk_id', 'date_ts': 'date'}
+COMPARE = {'$gt': np.greater, '$gte': np.greater_equal, '$lt': np.less,
+           '$lte': np.less_equal, '$eq': np.equal, '$ne': np.not_equal}
+
+# Above this share of candidate rows, score the whole matrix instead of gathering rows first
+FULL_SCAN_FRACTION = 0.5
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact-search vector store on a memory-mapped float32 matrix.
+    Each collection version is a directory of append-only files: vectors.f32,
+    one raw column per filterable field, ids.txt, and documents.jsonl (text and
+    metadata, read only for returned hits). manifest.json is replaced last on
+    every write and defines how many rows are valid, so readers never see a
+    half-written batch. Writers hold an exclusive lock on write.lock and
+    catch up with the latest manifest before touching any file; readers never
+    write, and repairs they find needed are persisted by the next writer. Search is a metadata prefilter, one matrix product and
+    argpartition. With VECTOR_COMPRESSION set, a version that reaches
+    COMPRESSION_TRAIN_ROWS rows also keeps compact codes (codes.bin) in memory:
+    they shortlist candidates, and only the shortlist is read from vectors.f32
+    for exact scoring.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or Settings.NUMPY_STORE_DIR
+        os.makedirs(self.base_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self.collection_name = self._init_alias(self.base_dir, Settings.CHROMA_COLLECTION_NAME)
+        self._init_result_cache(self.base_dir)
+        self._open_version(self.collection_name)
+
+    # --- Files --------------------------------------------------------------
+
+    def _path(self, filename: str, name: Optional[str] = None) -> str:
+        return os.path.join(self.base_dir, name or self.collection_name, filename)
+
+    def _read_manifest(self, name: Optional[str] = None) -> Dict:
+        try:
+            with open(self._path("manifest.json", name), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'rows': 0, 'dimension': Settings.EMBEDDING_DIMENSION, 'tickers': [], 'doc_types': [],
+                    'sectors': [], 'jsonl_bytes': 0, 'ids_bytes': 0, 'generation': 0}
+
+    def _write_manifest(self):
+        self.manifest['rows'] = self.rows
+        self.manifest['generation'] += 1
+        path = self._path("manifest.json")
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(f"{path}.tmp", path)
+        self._manifest_mtime = self._manifest_stamp()
+
+    def _manifest_stamp(self) -> Optional[int]:
+        try:
+            return os.stat(self._path("manifest.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_column(self, column: str, rows: int, name: Optional[str] = None) -> np.ndarray:
+        path = self._path(f"{column}.bin", name)
+        if rows == 0 or not os.path.exists(path):
+            return np.empty(0, dtype=COLUMNS[column])
+        return np.fromfile(path, dtype=COLUMNS[column], count=rows)
+
+    def _load(self):
+        """(Re)load the current version's columns and ID index from disk"""
+        self.manifest = self._read_manifest()
+        self.rows = self.manifest['rows']
+        self.dimension = self.manifest['dimension']
+        self._manifest_mtime = self._manifest_stamp()
+        self.manifest.setdefault('sectors', [])
+        self.columns = {column: self._read_column(column, self.rows) for column in COLUMNS}
+        self._codes = {vocab: {value: code for code, value in enumerate(self.manifest[vocab])}
+                       for vocab in ('tickers', 'doc_types', 'sectors')}
+        self._vectors = None
+        self._load_compression()
+        self._open_lexical(self.collection_name)
+        # Readers repair in memory only; the next writer persists it (see _repair)
+        self._backfilled = []
+        if any(len(values) < self.rows for values in self.columns.values()):
+            self._backfill_columns()
+
+        self.ids = []
+        if self.rows:
+            with open(self._path("ids.txt"), 'r') as f:
+                self.ids = [line.rstrip('\n') for line, _ in zip(f, range(self.rows))]
+
+        # An interrupted upsert can leave an old and a new row alive; the newer one wins
+        self.row_for_id = {}
+        self._duplicates = []
+        for row in np.flatnonzero(self.columns['alive']):
+            previous = self.row_for_id.get(self.ids[row])
+            if previous is not None:
+                self._duplicates.append(previous)
+            self.row_for_id[self.ids[row]] = int(row)
+        if self._duplicates:
+            self.columns['alive'][self._duplicates] = 0
+
+    def _load_compression(self):
+        """Compressor and in-memory codes, once this version has been compressed"""
+        self.compressor = None
+        self.vector_codes = None
+        if self.manifest.get('compression'):
+            self.compressor = load_compressor(self._path("compressor.npz"))
+            width = self.compressor.code_size
+            self.vector_codes = np.fromfile(self._path("codes.bin"), dtype=self.compressor.code_dtype,
+                                            count=self.rows * width).reshape(self.rows, width)
+
+    def _backfill_columns(self):
+        """Rebuild (in memory) columns missing from versions written before they existed"""
+        with open(self._path("documents.jsonl"), 'rb') as f:
+            metadatas = [json.loads(line)['metadata'] for line, _ in zip(f, range(self.rows))]
+        rebuilt = self._metadata_columns(metadatas)
+        for column, values in rebuilt.items():
+            if len(self.columns[column]) < self.rows:
+                self.columns[column] = np.asarray(values, dtype=COLUMNS[column])
+                self._backfilled.append(column)
+
+    def _repair(self):
+        """Persist what _load repaired in memory: backfilled columns and duplicate rows (write lock held)"""
+        for column in self._backfilled:
+            self.columns[column].tofile(self._path(f"{column}.bin"))
+        if self._duplicates:
+            self._tombstone(self._duplicates)
+        if self._backfilled or self._duplicates:
+            self._write_manifest()
+        self._backfilled = []
+        self._duplicates = []
+
+    @contextmanager
+    def _write_lock(self):
+        """Exclusive inter-process write lock (with the in-process lock held), on the latest manifest"""
+        with self._lock, open(os.path.join(self.base_dir, "write.lock"), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+            # Rows appended by another writer must not be truncated or overwritten
+            self._sync()
+            self._repair()
+            yield
+
+    def _sync(self):
+        """Follow alias swaps and writes made by other processes"""
+        self._sync_alias()
+        if self._manifest_stamp() != self._manifest_mtime:
+            self._load()
+
+    def _matrix(self) -> np.ndarray:
+        """Memory-mapped view of all stored vectors (re-mapped after appends)"""
+        if self.rows == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        if self._vectors is None or self._vectors.shape[0] != self.rows:
+            self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode='r',
+                                      shape=(self.rows, self.dimension))
+        return self._vectors
+
+    # --- Writes -------------------------------------------------------------
+
+    def _truncate_tails(self):
+        """Drop bytes past the manifest (left by an interrupted write) before appending"""
+        sizes = {'vectors.f32': self.rows * self.dimension * 4,
+                 'documents.jsonl': self.manifest['jsonl_bytes'],
+                 'ids.txt': self.manifest['ids_bytes']}
+        for column, dtype in COLUMNS.items():
+            sizes[f"{column}.bin"] = self.rows * np.dtype(dtype).itemsize
+        if self.compressor is not None:
+            sizes['codes.bin'] = self.rows * self.compressor.bytes_per_vector
+        for filename, size in sizes.items():
+            with open(self._path(filename), 'ab') as f:
+                f.truncate(size)
+
+    def _code(self, vocab: str, value: str) -> int:
+        codes = self._codes[vocab]
+        if value not in codes:
+            codes[value] = len(codes)
+            self.manifest[vocab].append(value)
+        return codes[value]
+
+    def _metadata_columns(self, metadatas: List[Dict]) -> Dict[str, List]:
+        """Filterable column values for rows with the given metadata"""
+        def number(metadata, field, missing):
+            value = to_number(metadata.get(field))
+            return missing if value is None else value
+
+        def epoch(metadata):
+            value = to_epoch_seconds(metadata.get('date_ts', metadata.get('date', '')))
+            return MISSING_DATE if value is None else value
+
+        return {
+            'ticker': [self._code('tickers', m.get('ticker', 'UNKNOWN')) for m in metadatas],
+            'document_type': [self._code('doc_types', m.get('document_type', '')) for m in metadatas],
+            'sector': [self._code('sectors', m.get('sector', '')) for m in metadatas],
+            'date': [epoch(m) for m in metadatas],
+            'chunk_id': [int(number(m, 'chunk_id', 0)) for m in metadatas],
+            'market_cap': [number(m, 'market_cap', np.nan) for m in metadatas],
+            'pe_ratio': [number(m, 'pe_ratio', np.nan) for m in metadatas]
+        }
+
+    def _append(self, documents: List[Dict], ids: List[str], vectors: np.ndarray):
+        self._truncate_tails()
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = (vectors / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+        lines = []
+        offsets = []
+        metadatas = [self._build_metadata(doc) for doc in documents]
+        position = self.manifest['jsonl_bytes']
+        for doc_id, doc, metadata in zip(ids, documents, metadatas):
+            line = (json.dumps({'id': doc_id, 'text': doc.get('text', ''),
+                                'metadata': metadata}) + "\n").encode('utf-8')
+            offsets.append(position)
+            position += len(line)
+            lines.append(line)
+        new_columns = self._metadata_columns(metadatas)
+        new_columns['offset'] = offsets
+        new_columns['alive'] = [1] * len(documents)
+        id_bytes = "".join(f"{doc_id}\n" for doc_id in ids).encode('utf-8')
+
+        with open(self._path("vectors.f32"), 'ab') as f:
+            f.write(vectors.tobytes())
+        with open(self._path("documents.jsonl"), 'ab') as f:
+            f.write(b"".join(lines))
+        with open(self._path("ids.txt"), 'ab') as f:
+            f.write(id_bytes)
+        for column, values in new_columns.items():
+            values = np.asarray(values, dtype=COLUMNS[column])
+            with open(self._path(f"{column}.bin"), 'ab') as f:
+                f.write(values.tobytes())
+            self.columns[column] = np.concatenate([self.columns[column], values])
+
+        for row, doc_id in enumerate(ids, start=self.rows):
+            self.row_for_id[doc_id] = row
+        self.ids.extend(ids)
+        self.rows += len(ids)
+        self.manifest['jsonl_bytes'] = position
+        self.manifest['ids_bytes'] += len(id_bytes)
+
+    def _update_codes(self):
+        """Encode appended rows (training the compressor once the version has COMPRESSION_TRAIN_ROWS rows)"""
+        if self.compressor is None:
+            if Settings.VECTOR_COMPRESSION == 'none' or self.rows < Settings.COMPRESSION_TRAIN_ROWS:
+                return
+            compressor = create_compressor()
+            sample = np.random.default_rng(0).choice(self.rows, Settings.COMPRESSION_TRAIN_ROWS, replace=False)
+            compressor.fit(self._matrix()[np.sort(sample)])
+            compressor.save(self._path("compressor.npz"))
+            self.compressor = compressor
+            self.vector_codes = np.empty((0, compressor.code_size), dtype=compressor.code_dtype)
+            self.manifest['compression'] = compressor.method
+            print(f"Trained '{compressor.method}' vector compression on {len(sample)} rows "
+                  f"({compressor.bytes_per_vector} bytes per vector in memory)")
+
+        encoded = len(self.vector_codes)
+        if encoded < self.rows:
+            codes = self.compressor.encode(self._matrix()[encoded:])
+            # A fresh compressor starts a fresh file (one left by an interrupted training is stale)
+            with open(self._path("codes.bin"), 'ab' if encoded else 'wb') as f:
+                f.write(codes.tobytes())
+            self.vector_codes = np.concatenate([self.vector_codes, codes])
+
+    def _tombstone(self, rows: Iterable[int]):
+        """Mark rows deleted, in memory and in the alive column file"""
+        rows = sorted(set(int(row) for row in rows))
+        if not rows:
+            return
+        self.columns['alive'][rows] = 0
+        with open(self._path("alive.bin"), 'r+b') as f:
+            for row in rows:
+                f.seek(row)
+                f.write(b"\x00")
+
+    def _write_documents(self,
+                         documents: List[Dict],
+                         embeddings: Union[np.ndarray, List[List[float]]],
+                         batch_size: int,
+                         upsert: bool) -> Dict:
+        if len(documents) != len(embeddings):
+            raise ValueError("Number of documents must match number of embeddings")
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        # Identical chunks share an ID; keep the first
+        rows = {}
+        for j, doc in enumerate(documents):
+            rows.setdefault(self.document_id(doc), j)
+
+        with self._write_lock():
+            replaced = []
+            new_ids = []
+            for doc_id, j in rows.items():
+                existing = self.row_for_id.get(doc_id)
+                if existing is not None:
+                    if not upsert:
+                        continue  # like ChromaDB's add, existing IDs are left as they are
+                    replaced.append(existing)
+                new_ids.append(doc_id)
+
+            if new_ids:
+                new_rows = [rows[doc_id] for doc_id in new_ids]
+                self._append([documents[j] for j in new_rows], new_ids, embeddings[new_rows])
+                self._update_codes()
+                # New rows become visible first; then the rows they replace are retired
+                self._write_manifest()
+            if replaced:
+                self._tombstone(replaced)
+                self._write_manifest()
+
+        print(f"{'Upserted' if upsert else 'Added'} {len(documents)} documents to the vector store")
+
+        return {
+            'successful': len(documents),
+            'failed': 0,
+            'total': len(documents)
+        }
+
+    def delete_stale(self, ticker: str, keep_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """Delete a ticker's chunks whose IDs are not in keep_ids (i.e. no longer produced)"""
+        keep_ids = set(keep_ids)
+        with self._write_lock():
+            code = self._codes['tickers'].get(ticker)
+            if code is None:
+                return 0
+            rows = np.flatnonzero((self.columns['ticker'] == code) & (self.columns['alive'] == 1))
+            stale = [int(row) for row in rows if self.ids[row] not in keep_ids]
+            if stale:
+                self._tombstone(stale)
+                for row in stale:
+                    self.row_for_id.pop(self.ids[row], None)
+                self._write_manifest()
+                self._on_deleted([self.ids[row] for row in stale])
+            return len(stale)
+
+    # --- Reads --------------------------------------------------------------
+
+    def _candidate_mask(self, filters: Optional[Dict]) -> np.ndarray:
+        """Live rows matching the list and range filters (rows missing a ranged field never match)"""
+        filters = validate_filters(filters)
+        mask = self.columns['alive'].astype(bool)
+        for key, (column, vocab) in LIST_COLUMNS.items():
+            if filters.get(key):
+                codes = [self._codes[vocab][value] for value in filters[key] if value in self._codes[vocab]]
+                mask &= np.isin(self.columns[column], codes)
+        for field, conditions in (filters.get('ranges') or {}).items():
+            values = self.columns[RANGE_COLUMNS[field]]
+            if field == 'date_ts':
+                mask &= values != MISSING_DATE
+            elif values.dtype.kind == 'f':
+                mask &= ~np.isnan(values)
+            for op, value in conditions.items():
+                mask &= COMPARE[op](values, value)
+        return mask
+
+    def _fetch(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """Read text and metadata for result rows from documents.jsonl"""
+        results = []
+        offsets = self.columns['offset']
+        with open(self._path("documents.jsonl"), 'rb') as f:
+            for row, score in zip(rows, scores):
+                end = offsets[row + 1] if row + 1 < self.rows else self.manifest['jsonl_bytes']
+                f.seek(offsets[row])
+                record = json.loads(f.read(end - offsets[row]))
+                results.append({
+                    'id': record['id'],
+                    'score': float(score),
+                    'text': record['text'],
+                    'metadata': record['metadata']
+                })
+        return results
+
+    def _search(self,
+                query_embedding: Union[np.ndarray, List[float]],
+                filters: Optional[Dict],
+                top_k: int) -> List[Dict]:
+        """Exact top-k by cosine similarity (score = cosine similarity)"""
+        return self.search_many(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1),
+                                [filters], [top_k])[0]
+
+    def _exact_rerank(self, candidates: np.ndarray, approximate: np.ndarray, query: np.ndarray, k: int):
+        """Exact scores for the top k * COMPRESSION_RERANK approximate candidates; returns their top k"""
+        n = min(len(candidates), k * max(Settings.COMPRESSION_RERANK, 1))
+        shortlist = np.sort(candidates[np.argpartition(-approximate, n - 1)[:n]])
+        exact = self._matrix()[shortlist] @ query
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top], kind='stable')]
+        return shortlist[top], exact[top]
+
+    def get_documents(self, ids: List[str]) -> List[Dict]:
+        """Stored chunks by ID (id, text, metadata); unknown IDs are skipped"""
+        with self._lock:
+            self._sync()
+            rows = [self.row_for_id[doc_id] for doc_id in ids if doc_id in self.row_for_id]
+            return [{key: doc[key] for key in ('id', 'text', 'metadata')}
+                    for doc in self._fetch(np.array(rows, dtype=np.int64), np.zeros(len(rows)))]
+
+    def search_many(self,
+                    query_embeddings: Union[np.ndarray, List[List[float]]],
+                    filters: Union[Dict, List[Optional[Dict]], None] = None,
+                    top_k: Union[int, List[int]] = 5) -> List[List[Dict]]:
+        """
+        Search for many queries at once (one result list per query, in input order).
+        Queries with the same filter share one prefilter and one matrix product.
+        """
+        query_embeddings, filters_list, top_k_list = self._expand_queries(query_embeddings, filters, top_k)
+        output = [[] for _ in range(len(query_embeddings))]
+        queries = query_embeddings / np.clip(np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        groups = {}
+        for row, query_filters in enumerate(filters_list):
+            groups.setdefault(filter_key(query_filters), (query_filters, []))[1].append(row)
+
+        try:
+            with self._lock:
+                self._sync()
+                matrix = self._matrix()
+                for query_filters, rows in groups.values():
+                    mask = self._candidate_mask(query_filters)
+                    candidates = np.flatnonzero(mask)
+                    if len(candidates) == 0:
+                        continue
+                    if self.compressor is not None:
+                        # Approximate scores from the in-memory codes, then exact re-ranking per query
+                        if len(candidates) > FULL_SCAN_FRACTION * self.rows:
+                            scores = self.compressor.scores(self.vector_codes, queries[rows])[candidates]
+                        else:
+                            scores = self.compressor.scores(self.vector_codes[candidates], queries[rows])
+                    elif len(candidates) > FULL_SCAN_FRACTION * self.rows:
+                        scores = (matrix @ queries[rows].T)[candidates]
+                    else:
+                        scores = matrix[candidates] @ queries[rows].T
+
+                    for column, row in enumerate(rows):
+                        k = min(top_k_list[row], len(candidates))
+                        column_scores = scores[:, column]
+                        if self.compressor is not None:
+                            output[row] = self._fetch(*self._exact_rerank(candidates, column_scores, queries[row], k))
+                            continue
+                        top = np.argpartition(-column_scores, k - 1)[:k]
+                        top = top[np.argsort(-column_scores[top], kind='stable')]
+                        output[row] = self._fetch(candidates[top], column_scores[top])
+        except Exception as e:
+            print(f"Error during search: {e}")
+
+        return output
+
+    def get_stats(self) -> Dict:
+        """Get collection statistics"""
+        try:
+            with self._lock:
+                self._sync()
+                return {
+                    'total_documents': int(self.columns['alive'].sum()),
+                    'collection_name': self.collection_name,
+                    'alias': self.alias,
+                    'previous_version': self._read_alias().get('previous'),
+                    'persist_directory': self.base_dir,
+                    'backend': 'numpy',
+                    'rows': self.rows,
+                    'vectors_mb': self.rows * self.dimension * 4 / (1024 * 1024),
+                    'compression': self.manifest.get('compression', 'none'),
+                    'codes_mb': self.rows * self.compressor.bytes_per_vector / (1024 * 1024) if self.compressor else 0.0,
+                    'lexical_documents': len(self.lexical_index),
+                    'index_generation': self.index_generation(),
+                    'result_cache': self.result_cache.get_stats()
+                }
+        except Exception as e:
+            print(f"Error getting stats: {e}")
+            return {}
+
+    def reset_collection(self):
+        """Reset the collection (delete all documents)"""
+        try:
+            with self._lock:
+                self._drop_version(self.collection_name)
+                self._open_version(self.collection_name)
+                self._bump_generation()
+            print(f"Collection '{self.collection_name}' reset successfully")
+        except Exception as e:
+            print(f"Error resetting collection: {e}")
+
+    # --- Versions -----------------------------------------------------------
+
+    def _open_version(self, name: str):
+        with self._lock:
+            self.collection_name = name
+            os.makedirs(os.path.join(self.base_dir, name), exist_ok=True)
+            self._load()
+            self._alias_mtime = self._alias_stamp()
+        print(f"Collection '{name}' ready")
+        print(f"Current document count: {int(self.columns['alive'].sum())}")
+
+    def _create_version(self, name: str):
+        with self._lock:
+            os.makedirs(os.path.join(self.base_dir, name))
+            self.collection_name = name
+            self._load()
+
+    def _drop_version(self, name: str):
+        shutil.rmtree(os.path.join(self.base_dir, name), ignore_errors=True)
+        LexicalIndex.drop(self._lexical_path(name))
+
+    def _version_count(self, name: str) -> int:
+        rows = self._read_manifest(name)['rows']
+        return int(self._read_column('alive', rows, name).sum())
+
+    def _probe_version(self, name: str) -> bool:
+        manifest = self._read_manifest(name)
+        live = np.flatnonzero(self._read_column('alive', manifest['rows'], name))
+        if len(live) == 0:
+            return False
+        matrix = np.memmap(self._path("vectors.f32", name), dtype=np.float32, mode='r',
+                           shape=(manifest['rows'], manifest['dimension']))
+        # Stored rows are unit-length, so the probe must score ~1 against itself and be the top hit
+        scores = matrix[live] @ matrix[live[0]]
+        return bool(scores[0] >= 1 - 1e-3 and scores[0] >= scores.max() - 1e-6)
@@ -0,0 +1,188 @@
+import inspect
+import json
+import os
+import re
+import numpy as np
+import onnxruntime as ort
+from typing import Dict, List, Optional, Union
+from transformers import AutoTokenizer
+from config.settings import Settings
+
+
+class OnnxEmbeddingModel:
+    """
+    Sentence embedding model running on ONNX Runtime (CPU).
+    The transformer is exported once from the SentenceTransformer model and,
+    by default, dynamically quantized to int8; pooling and normalization are
+    done in NumPy. `encode` mirrors SentenceTransformer.encode so it can stand
+    in for it inside LocalEmbeddings.
+    """
+
+    def __init__(self,
+                 model_name: Optional[str] = None,
+                 quantize: bool = True,
+                 model_dir: Optional[str] = None,
+                 num_threads: Optional[int] = None):
+        self.model_name = model_name or Settings.EMBEDDING_MODEL
+        self.quantize = quantize
+        slug = re.sub(r'[^\w\-]+', '_', self.model_name)
+        self.model_dir = os.path.join(model_dir or Settings.ONNX_MODEL_DIR, slug)
+
+        self.fp32_path = os.path.join(self.model_dir, "model.onnx")
+        self.int8_path = os.path.join(self.model_dir, "model.int8.onnx")
+        self.config_path = os.path.join(self.model_dir, "embedding_config.json")
+
+        if not os.path.exists(self.fp32_path):
+            self.export()
+        if quantize and not os.path.exists(self.int8_path):
+            self.quantize_model()
+
+        with open(self.config_path, 'r') as f:
+            self.config = json.load(f)
+        self.max_seq_length = self.config['max_seq_length']
+        self.normalize = self.config['normalize']
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir, use_fast=True)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = num_threads if num_threads is not None else Settings.ONNX_NUM_THREADS
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            self.int8_path if quantize else self.fp32_path,
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def export(self):
+        """Export the SentenceTransformer's transformer to ONNX (one-time)"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+        from sentence_transformers.models import Normalize, Pooling
+
+        print(f"Exporting {self.model_name} to ONNX...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        st_model = SentenceTransformer(self.model_name, device='cpu')
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+
+        pooling = [m.get_config_dict() for m in st_model if isinstance(m, Pooling)]
+        if pooling and not (pooling[0].get('pooling_mode_mean_tokens') or pooling[0].get('pooling_mode') == 'mean'):
+            raise ValueError("ONNX backend only supports mean-pooling models")
+
+        sample = tokenizer(["export sample"], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+        # Newer torch defaults to the dynamo exporter (needs onnxscript); keep the classic one
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False
+
+        class _Encoder(torch.nn.Module):
+            """Fixes the positional input order across transformers versions"""
+
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                output = self.model(**dict(zip(input_names, inputs)), return_dict=True)
+                return output.last_hidden_state
+
+        with torch.no_grad():
+            torch.onnx.export(
+                _Encoder(transformer),
+                tuple(sample[name] for name in input_names),
+                self.fp32_path,
+                input_names=input_names,
+                output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                **export_kwargs
+            )
+
+        tokenizer.save_pretrained(self.model_dir)
+        with open(self.config_path, 'w') as f:
+            json.dump({
+                'model_name': self.model_name,
+                'max_seq_length': st_model.max_seq_length,
+                'normalize': any(isinstance(m, Normalize) for m in st_model),
+                'dimension': st_model.get_sentence_embedding_dimension()
+            }, f, indent=2)
+        print(f"Exported ONNX model to {self.fp32_path}")
+
+    def quantize_model(self):
+        """Dynamic int8 quantization of the exported model's weights"""
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(self.fp32_path, self.int8_path, weight_type=QuantType.QInt8)
+        print(f"Quantized ONNX model saved to {self.int8_path}")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config['dimension']
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        features = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors='np'
+        )
+        inputs = {name: features[name].astype(np.int64) for name in self._input_names if name in features}
+        hidden = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real (non-padding) tokens
+        mask = features['attention_mask'][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self,
+               sentences: Union[str, List[str]],
+               batch_size: int = 32,
+               convert_to_numpy: bool = True,
+               show_progress_bar: bool = False,
+               normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        """Drop-in for SentenceTransformer.encode (NumPy output only)"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        embeddings = np.vstack(batches) if batches else np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        if normalize_embeddings and not self.normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+
+def compare_embeddings(reference: np.ndarray, candidate: np.ndarray) -> Dict:
+    """
+    Accuracy parity between two backends' embeddings of the same texts:
+    per-text cosine similarity, plus how often each text's nearest
+    neighbour (by the reference) is unchanged under the candidate.
+    """
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (ref * cand).sum(axis=1)
+
+    neighbour_agreement = None
+    if len(ref) > 1:
+        ref_sim = ref @ ref.T
+        cand_sim = cand @ cand.T
+        np.fill_diagonal(ref_sim, -np.inf)
+        np.fill_diagonal(cand_sim, -np.inf)
+        neighbour_agreement = float(np.mean(ref_sim.argmax(axis=1) == cand_sim.argmax(axis=1)))
+
+    return {
+        'texts': len(cosine),
+        'cosine_min': float(cosine.min()),
+        'cosine_mean': float(cosine.mean()),
+        'nearest_neighbour_agreement': neighbour_agreement
+    }
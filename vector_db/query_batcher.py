@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+import numpy as np
+from config.settings import Settings
+from .embeddings import LocalEmbeddings
+
+
+class QueryBatcher:
+    """
+    Micro-batching service for query embeddings.
+    Requests arriving within max_wait_ms of the first waiting request are
+    encoded together in one forward pass; every caller gets back its own
+    vector through a Future.
+    """
+
+    def __init__(self,
+                 embedder: LocalEmbeddings,
+                 max_wait_ms: Optional[float] = None,
+                 max_batch_size: Optional[int] = None):
+        self.embedder = embedder
+        self.max_wait = (Settings.QUERY_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.max_batch_size = max_batch_size or Settings.QUERY_BATCH_MAX_SIZE
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._stats = {
+            'requests': 0,
+            'batches': 0,
+            'max_batch_size': 0,
+            'max_queue_depth': 0,
+            'total_wait_ms': 0.0,
+            'total_encode_ms': 0.0,
+            'batch_sizes': {}
+        }
+
+    def start(self):
+        """Start the background batching thread"""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the batching thread after it drains the requests already queued"""
+        with self._thread_lock:
+            self._stopping.set()
+            self._queue.put(None)
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+    def submit(self, text: str) -> Future:
+        """Queue a query for embedding; the Future resolves to a float32 vector"""
+        self.start()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], depth)
+        return future
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Embed one query, sharing a forward pass with concurrent callers"""
+        return self.submit(text).result(timeout)
+
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the wait window closes"""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._stopping.set()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch:
+                self._encode(batch)
+            if self._stopping.is_set() and self._queue.empty():
+                return
+
+    def _encode(self, batch):
+        texts = [text for text, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            embeddings = self.embedder.model.encode(
+                texts,
+                batch_size=len(texts),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        for row, (_, future, _) in enumerate(batch):
+            future.set_result(embeddings[row])
+
+        with self._stats_lock:
+            stats = self._stats
+            stats['requests'] += len(batch)
+            stats['batches'] += 1
+            stats['max_batch_size'] = max(stats['max_batch_size'], len(batch))
+            stats['total_wait_ms'] += sum(started - enqueued for _, _, enqueued in batch) * 1000
+            stats['total_encode_ms'] += (finished - started) * 1000
+            stats['batch_sizes'][len(batch)] = stats['batch_sizes'].get(len(batch), 0) + 1
+
+    def get_stats(self, reset: bool = False) -> Dict:
+        """Queue depth and batch-size metrics for tuning the wait window"""
+        with self._stats_lock:
+            stats = self._stats
+            batches = stats['batches']
+            result = {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': stats['max_queue_depth'],
+                'requests': stats['requests'],
+                'batches': batches,
+                'mean_batch_size': stats['requests'] / batches if batches else 0.0,
+                'max_batch_size': stats['max_batch_size'],
+                'batch_size_histogram': dict(sorted(stats['batch_sizes'].items())),
+                'mean_queue_wait_ms': stats['total_wait_ms'] / stats['requests'] if stats['requests'] else 0.0,
+                'mean_encode_ms': stats['total_encode_ms'] / batches if batches else 0.0,
+                'max_wait_ms': self.max_wait * 1000
+            }
+            if reset:
+                self._reset_stats()
+        return result
+
+
+_shared_batcher = None
+_shared_lock = threading.Lock()
+
+
+def get_query_batcher() -> QueryBatcher:
+    """Process-wide batcher (and model) shared by every chat session"""
+    global _shared_batcher
+    with _shared_lock:
+        if _shared_batcher is None:
+            # Queries are rarely repeated verbatim, so skip the on-disk cache
+            _shared_batcher = QueryBatcher(LocalEmbeddings(use_cache=False, workers=0))
+            _shared_batcher.start()
+        return _shared_batcher
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from config.settings import Settings
+from .filters import filter_key
+
+
+class SearchResultCache:
+    """
+    Bounded LRU cache of search results with a TTL.
+    Keys hash the store, the unit-normalized query embedding, the filters,
+    top_k and (for hybrid searches) the query text. Every entry records the
+    store's index generation when it was computed; a lookup under a newer
+    generation is a miss, so an ingest invalidates all earlier results
+    without scanning the cache.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_entries = Settings.SEARCH_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = Settings.SEARCH_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self._entries = OrderedDict()  # key -> (generation, expires_at, results)
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(store: str, query_embedding, filters: Optional[Dict], top_k: int, query_text: Optional[str] = None) -> str:
+        """Cache key; the embedding is normalized and rounded to float16 so re-encodings of a query match"""
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        query = (query / max(float(np.linalg.norm(query)), 1e-12)).astype(np.float16)
+        digest = hashlib.sha256(query.tobytes())
+        digest.update(f"\0{store}\0{filter_key(filters)}\0{top_k}\0{query_text or ''}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str, generation: int) -> Optional[List[Dict]]:
+        """Cached results computed at this generation and not expired, else None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entry_generation, expires_at, results = entry
+            if entry_generation != generation or time.monotonic() > expires_at:
+                del self._entries[key]
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+
+    def put(self, key: str, generation: int, results: List[Dict]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic() + self.ttl, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self, reset: bool = False) -> Dict:
+        """Hit rate and occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidated': self.stale,
+                'evictions': self.evictions
+            }
+            if reset:
+                self._reset_stats()
+        return stats
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_result_cache() -> SearchResultCache:
+    """Process-wide result cache shared by every store instance (one per chat session)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchResultCache()
+        return _shared_cache
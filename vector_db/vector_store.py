@@ -0,0 +1,439 @@
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Iterable, Optional, Union
+import numpy as np
+from config.settings import Settings
+from .filters import matches_filters, to_epoch_seconds, to_number, validate_filters
+from .recency import apply_recency_decay
+from .result_cache import get_result_cache
+from .lexical_index import LexicalIndex, reciprocal_rank_fusion
+
+# Runs the vector arm of hybrid searches while the calling thread scores BM25
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vector-search")
+
+
+class VectorStore(ABC):
+    """
+    Interface shared by the vector database backends.
+    The configured collection name is an alias: a pointer file names the
+    live version, so full rebuilds go into a shadow version and are swapped
+    in atomically. Backends implement storage plus the small _*_version hooks.
+    """
+
+    def _init_alias(self, persist_dir: str, alias: str) -> str:
+        """Set up alias tracking; returns the version the alias currently points to"""
+        self.alias = alias
+        self.persist_dir = persist_dir
+        self.alias_path = os.path.join(persist_dir, f"{alias}.alias.json")
+        self._alias_mtime = None
+        self._rebuilding = None
+        return self._read_alias()['active']
+
+    def _init_result_cache(self, persist_dir: str):
+        """Share the process-wide result cache; the generation file (one per alias) invalidates it"""
+        self.result_cache = get_result_cache()
+        self.generation_path = os.path.join(persist_dir, f"{self.alias}.generation")
+        self._generation = 0
+        self._generation_mtime = None
+
+    def index_generation(self) -> int:
+        """Ingest counter for the alias, bumped by every write (re-read only when the file changes)"""
+        try:
+            stamp = os.stat(self.generation_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        if stamp != self._generation_mtime:
+            try:
+                with open(self.generation_path, 'r') as f:
+                    self._generation = int(f.read().strip() or 0)
+            except (FileNotFoundError, ValueError):
+                self._generation = 0
+            self._generation_mtime = stamp
+        return self._generation
+
+    def _bump_generation(self):
+        """Invalidate cached search results in every process using this store"""
+        self._generation_mtime = None
+        generation = self.index_generation() + 1
+        tmp_path = f"{self.generation_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(generation))
+        os.replace(tmp_path, self.generation_path)
+
+    def _lexical_path(self, name: str) -> str:
+        return os.path.join(self.persist_dir, f"{name}.lexical.jsonl")
+
+    def _open_lexical(self, name: str):
+        """Point the BM25 index at a version's log (loaded lazily on first use)"""
+        path = self._lexical_path(name)
+        if getattr(self, 'lexical_index', None) is None or self.lexical_index.path != path:
+            self.lexical_index = LexicalIndex(path)
+
+    # --- Writes -----------------------------------------------------------
+
+    @staticmethod
+    def document_id(doc: Dict) -> str:
+        """Deterministic chunk ID: ticker, document type, chunk position and a hash of the text"""
+        content_hash = hashlib.sha256(doc.get('text', '').encode('utf-8')).hexdigest()[:16]
+        return f"{doc.get('ticker', 'UNKNOWN')}:{doc.get('type', '')}:{doc.get('chunk_id', 0)}:{content_hash}"
+
+    @staticmethod
+    def _build_metadata(doc: Dict) -> Dict:
+        """
+        Prepare metadata (ChromaDB requires all values to be strings, ints, floats, or bools).
+        Numbers keep their native types so range filters can be pushed down to the store;
+        date_ts is the date as epoch seconds. Missing or non-numeric stats are left out.
+        """
+        stats = doc.get('metadata', {})
+        metadata = {
+            'ticker': str(doc.get('ticker', 'UNKNOWN')),
+            'company_name': str(doc.get('company_name', '')),
+            'document_type': str(doc.get('type', '')),
+            'date': str(doc.get('date', '')),
+            'chunk_id': int(to_number(doc.get('chunk_id', 0)) or 0),
+            'sector': str(stats.get('sector', '')),
+            'industry': str(stats.get('industry', ''))
+        }
+        date_ts = to_epoch_seconds(doc.get('date', ''))
+        if date_ts is not None:
+            metadata['date_ts'] = date_ts
+        for field in ('market_cap', 'pe_ratio'):
+            value = to_number(stats.get(field))
+            if value is not None:
+                metadata[field] = value
+        return metadata
+
+    def add_documents(self,
+                      documents: List[Dict],
+                      embeddings: Union[np.ndarray, List[List[float]]],
+                      batch_size: int = 100) -> Dict:
+        """Add documents with embeddings (ideally a float32/float16 matrix)"""
+        try:
+            stats = self._write_documents(documents, embeddings, batch_size, upsert=False)
+            self._index_lexical(documents, replace=False)
+            return stats
+        finally:
+            self._bump_generation()
+
+    def upsert_documents(self,
+                         documents: List[Dict],
+                         embeddings: Union[np.ndarray, List[List[float]]],
+                         batch_size: int = 100) -> Dict:
+        """Insert new chunks and overwrite existing ones with the same ID"""
+        try:
+            stats = self._write_documents(documents, embeddings, batch_size, upsert=True)
+            self._index_lexical(documents, replace=True)
+            return stats
+        finally:
+            self._bump_generation()
+
+    def _index_lexical(self, documents: List[Dict], replace: bool):
+        """Add written chunks to the BM25 index (upserts replace entries whose metadata changed)"""
+        self.lexical_index.add(((self.document_id(doc), doc.get('text', ''), self._build_metadata(doc))
+                                for doc in documents), replace=replace)
+
+    @abstractmethod
+    def _write_documents(self,
+                         documents: List[Dict],
+                         embeddings: Union[np.ndarray, List[List[float]]],
+                         batch_size: int,
+                         upsert: bool) -> Dict:
+        ...
+
+    @abstractmethod
+    def delete_stale(self, ticker: str, keep_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """Delete a ticker's chunks whose IDs are not in keep_ids (i.e. no longer produced)"""
+
+    def _on_deleted(self, ids: List[str]):
+        """Keep the BM25 index and result cache in step with deletions"""
+        self.lexical_index.remove(ids)
+        self._bump_generation()
+
+    # --- Reads ------------------------------------------------------------
+
+    def search(self,
+               query_embedding: Union[np.ndarray, List[float]],
+               filters: Dict = None,
+               top_k: int = 5,
+               query_text: Optional[str] = None) -> List[Dict]:
+        """
+        Top-k documents for one query: dicts with id, score, text and metadata.
+        filters (tickers, doc_types, sectors, numeric ranges) are described in vector_db.filters.
+        With query_text (and HYBRID_SEARCH on), BM25 and vector results are fused.
+        Repeated searches are answered from the result cache until the next ingest.
+        """
+        query_text = query_text if Settings.HYBRID_SEARCH else None
+        if self.result_cache.max_entries <= 0:
+            return self._search_arms(query_embedding, filters, top_k, query_text)
+        generation = self.index_generation()
+        key = self.result_cache.key(self.alias_path, query_embedding, filters, top_k, query_text)
+        results = self.result_cache.get(key, generation)
+        if results is None:
+            results = self._search_arms(query_embedding, filters, top_k, query_text)
+            if results:  # failed searches return [] and should not stick
+                self.result_cache.put(key, generation, results)
+        return results
+
+    def _search_arms(self, query_embedding, filters, top_k, query_text):
+        if not query_text:
+            return self._search(query_embedding, filters, top_k)
+        return self._hybrid_search(query_embedding, query_text, filters, top_k)
+
+    def _hybrid_search(self,
+                       query_embedding: Union[np.ndarray, List[float]],
+                       query_text: str,
+                       filters: Optional[Dict],
+                       top_k: int) -> List[Dict]:
+        """
+        Vector and BM25 arms run in parallel, each returning HYBRID_CANDIDATES x top_k
+        hits; reciprocal rank fusion picks the final top_k. score is the fused score,
+        vector_score / bm25_score the arms' own scores (None if an arm missed the chunk).
+        """
+        depth = top_k * Settings.HYBRID_CANDIDATES
+        vector_arm = _search_pool.submit(self._search, query_embedding, filters, depth)
+        try:
+            lexical_hits = self.lexical_index.search(query_text, filters, depth)
+        except Exception as e:
+            print(f"Error during lexical search: {e}")
+            lexical_hits = []
+        vector_hits = vector_arm.result()
+
+        # BM25-only hits are re-checked against the stored metadata before fusion
+        by_id = {doc['id']: doc for doc in vector_hits}
+        missing = [doc_id for doc_id, _ in lexical_hits if doc_id not in by_id]
+        if missing:
+            checked = validate_filters(filters)
+            by_id.update({doc['id']: dict(doc, score=None) for doc in self.get_documents(missing)
+                          if matches_filters(doc['metadata'], checked)})
+        lexical_hits = [(doc_id, score) for doc_id, score in lexical_hits if doc_id in by_id]
+
+        fused = reciprocal_rank_fusion([[doc['id'] for doc in vector_hits],
+                                        [doc_id for doc_id, _ in lexical_hits]])[:top_k]
+
+        bm25 = dict(lexical_hits)
+        return [dict(by_id[doc_id], score=score, vector_score=by_id[doc_id]['score'], bm25_score=bm25.get(doc_id))
+                for doc_id, score in fused if doc_id in by_id]
+
+    @abstractmethod
+    def get_documents(self, ids: List[str]) -> List[Dict]:
+        """Stored chunks by ID (id, text, metadata); unknown IDs are skipped"""
+
+    @abstractmethod
+    def _search(self,
+                query_embedding: Union[np.ndarray, List[float]],
+                filters: Optional[Dict],
+                top_k: int) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def search_many(self,
+                    query_embeddings: Union[np.ndarray, List[List[float]]],
+                    filters: Union[Dict, List[Optional[Dict]], None] = None,
+                    top_k: Union[int, List[int]] = 5) -> List[List[Dict]]:
+        """Search for many queries at once (one result list per query, in input order)"""
+
+    def search_recent(self,
+                      query_embedding: Union[np.ndarray, List[float]],
+                      filters: Dict = None,
+                      top_k: int = 5,
+                      half_life_days: Optional[float] = None,
+                      weight: Optional[float] = None,
+                      query_text: Optional[str] = None) -> List[Dict]:
+        """
+        search() with recency decay: over-fetches RECENCY_OVERFETCH x top_k candidates
+        and re-ranks them (see vector_db.recency). A half-life of 0 disables the decay.
+        """
+        half_life_days = Settings.RECENCY_HALF_LIFE_DAYS if half_life_days is None else half_life_days
+        weight = Settings.RECENCY_WEIGHT if weight is None else weight
+        if not half_life_days or not weight:
+            return self.search(query_embedding, filters, top_k, query_text)
+        candidates = self.search(query_embedding, filters, top_k * Settings.RECENCY_OVERFETCH, query_text)
+        return apply_recency_decay(candidates, half_life_days, weight, top_k)
+
+    @staticmethod
+    def _expand_queries(query_embeddings, filters, top_k):
+        """Normalize search_many arguments to a query matrix plus per-query filters and top_k"""
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if query_embeddings.ndim == 1:
+            query_embeddings = query_embeddings.reshape(1, -1)
+        n = len(query_embeddings)
+        filters_list = filters if isinstance(filters, list) else [filters] * n
+        top_k_list = top_k if isinstance(top_k, list) else [top_k] * n
+        if len(filters_list) != n or len(top_k_list) != n:
+            raise ValueError("filters and top_k lists must match the number of queries")
+        return query_embeddings, filters_list, top_k_list
+
+    @abstractmethod
+    def get_stats(self) -> Dict:
+        """Get collection statistics"""
+
+    @abstractmethod
+    def reset_collection(self):
+        """Reset the collection (delete all documents)"""
+
+    # --- Versions (blue/green) --------------------------------------------
+
+    @abstractmethod
+    def _open_version(self, name: str):
+        """Point reads and writes at an existing (or new, empty) version"""
+
+    @abstractmethod
+    def _create_version(self, name: str):
+        """Create an empty version and point writes at it"""
+
+    @abstractmethod
+    def _drop_version(self, name: str):
+        """Delete a version's data"""
+
+    @abstractmethod
+    def _version_count(self, name: str) -> int:
+        """Number of documents in a version"""
+
+    @abstractmethod
+    def _probe_version(self, name: str) -> bool:
+        """Query a version with one of its own vectors; True if it comes back as the nearest hit"""
+
+    def _alias_stamp(self) -> Optional[int]:
+        try:
+            return os.stat(self.alias_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_alias(self) -> Dict:
+        """Alias pointer: active version, previous version (for rollback) and all known versions"""
+        try:
+            with open(self.alias_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Before the first swap the alias resolves to the unversioned collection
+            return {'active': self.alias, 'previous': None, 'versions': []}
+
+    def _write_alias(self, alias: Dict):
+        """Write the pointer file atomically (readers see the old or the new version, never half)"""
+        tmp_path = f"{self.alias_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(alias, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.alias_path)
+
+    def _sync_alias(self):
+        """Follow swaps made by other processes (one stat() per call)"""
+        if self._rebuilding is not None or self._alias_stamp() == self._alias_mtime:
+            return
+        active = self._read_alias()['active']
+        if active != self.collection_name:
+            self._open_version(active)
+            print(f"Switched to collection '{active}'")
+        self._alias_mtime = self._alias_stamp()
+
+    def begin_rebuild(self) -> str:
+        """
+        Create a new versioned shadow collection and direct writes to it.
+        Queries from other managers keep hitting the live version until swap().
+        """
+        name = f"{self.alias}_v{datetime.now().strftime('%Y%m%dT%H%M%S%f')}"
+        self._create_version(name)
+        self._rebuilding = name
+        print(f"Building shadow collection '{name}'")
+        return name
+
+    def abort_rebuild(self):
+        """Drop the shadow collection and go back to the live one"""
+        if self._rebuilding is None:
+            return
+        self._drop_version(self._rebuilding)
+        print(f"Discarded shadow collection '{self._rebuilding}'")
+        self._rebuilding = None
+        self._open_version(self._read_alias()['active'])
+
+    def validate_collection(self, name: str, min_ratio: Optional[float] = None) -> Dict:
+        """
+        Check a rebuilt collection before it goes live: it must hold at least
+        min_ratio of the live document count and answer a probe query with
+        its own nearest neighbour.
+        """
+        min_ratio = Settings.MIN_REBUILD_RATIO if min_ratio is None else min_ratio
+        errors = []
+        count = self._version_count(name)
+
+        live_name = self._read_alias()['active']
+        live_count = 0
+        if live_name != name:
+            try:
+                live_count = self._version_count(live_name)
+            except Exception:
+                live_count = 0
+
+        if count == 0:
+            errors.append("collection is empty")
+        elif count < live_count * min_ratio:
+            errors.append(f"only {count} documents vs {live_count} live (min ratio {min_ratio:.0%})")
+
+        if count > 0 and not self._probe_version(name):
+            errors.append("probe query did not find the probed document")
+
+        return {'ok': not errors, 'collection': name, 'count': count, 'live_count': live_count, 'errors': errors}
+
+    def swap(self, name: Optional[str] = None):
+        """Atomically point the alias at a collection version (default: the shadow being built)"""
+        name = name or self._rebuilding
+        if name is None:
+            raise ValueError("No collection to swap in")
+
+        alias = self._read_alias()
+        if alias['active'] != name:
+            if alias['active'] not in alias['versions']:
+                alias['versions'].insert(0, alias['active'])
+            alias['previous'] = alias['active']
+        alias['active'] = name
+        if name not in alias['versions']:
+            alias['versions'].append(name)
+        self._write_alias(alias)
+
+        self._rebuilding = None
+        self._open_version(name)
+        self._bump_generation()
+        print(f"Alias '{self.alias}' -> '{name}' (previous: {alias['previous']})")
+
+    def rollback(self):
+        """Point the alias back at the previous version"""
+        alias = self._read_alias()
+        if not alias.get('previous'):
+            raise ValueError(f"No previous version of '{self.alias}' to roll back to")
+        self.swap(alias['previous'])
+
+    def prune(self) -> List[str]:
+        """Delete old versions, keeping only the active and previous ones"""
+        alias = self._read_alias()
+        keep = {alias['active'], alias.get('previous')}
+        deleted = []
+        for name in alias['versions']:
+            if name in keep:
+                continue
+            try:
+                self._drop_version(name)
+            except Exception as e:
+                print(f"Error deleting collection '{name}': {e}")
+            deleted.append(name)
+
+        alias['versions'] = [name for name in alias['versions'] if name in keep]
+        self._write_alias(alias)
+        self._alias_mtime = self._alias_stamp()
+        return deleted
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """Vector store selected by Settings.VECTOR_STORE_BACKEND ('chroma' or 'numpy')"""
+    backend = (backend or Settings.VECTOR_STORE_BACKEND).lower()
+    if backend == 'chroma':
+        from .chroma_manager import ChromaDBManager
+        return ChromaDBManager()
+    if backend == 'numpy':
+        from .numpy_store import NumpyVectorStore
+        return NumpyVectorStore()
+    raise ValueError(f"Unknown vector store backend: {backend}")